@@ -1,66 +1,189 @@
-import io
-import time
+import os
+from functools import partial
 from pathlib import Path
 import streamlit as st
-from engine import extract_text_from_pdf, parse_with_supplier
-from exporters import export_excel, export_csv, export_jsonl, export_cin7_html_templates
+from catalog import default_catalog_path, load_catalog
+from jobs import FAILED, QUEUED, JobQueue, WorkerPool
+from utils.cache import ExtractionCache
+from utils.ocr import default_ocr_workers
+from utils.profiling import StageTimings, format_timings
+from exporters import ExportTable, rows_to_dataframe
 
 st.set_page_config(page_title="HDL Door Schedule Extractor V6", page_icon="🚪", layout="wide")
 st.title("HDL Door Schedule Extractor — V6")
 
+# Extraction workers (see get_jobs). Each job may start its own OCR pool, so
+# the OCR workers per job are capped at this process's share of the CPUs.
+job_workers = int(os.environ.get("HDL_JOB_WORKERS", min(4, os.cpu_count() or 1)))
+# Rows already written by running jobs are previewed (up to this many)
+# while later pages are still being parsed.
+PREVIEW_ROWS = 200
+
 with st.sidebar:
     st.header("Options")
     supplier = st.selectbox("Supplier profile", ["auto","allegion","dormakaba","ara","jk"])
     force_ocr = st.toggle("Force OCR (slower)", value=False)
+    layout = st.toggle("Read tables by column", value=False, help="Parse tabular schedules from word positions (header row or cell contents); other pages use the supplier profile.")
+    ocr_cpus = max(1, (os.cpu_count() or 1) // max(1, job_workers))
+    ocr_workers = st.number_input("OCR workers", min_value=1, max_value=ocr_cpus, value=min(default_ocr_workers(), ocr_cpus), help="Scanned pages of each file are OCR'd in parallel on this many processes (files are extracted in parallel too).")
     extended = st.toggle("Extended columns (Description/Colour)", value=True)
+    catalog_path = default_catalog_path()
+    use_catalog = catalog_path is not None and st.toggle("Match codes to catalog", value=True, help=f"Replace misread product codes (look-alike characters only) with their match in {catalog_path.name if catalog_path else 'the catalog'} (HDL_CATALOG).")
+    profile = st.toggle("Profile extraction (cProfile)", value=False, help="Record a Python profile of each extraction; shown under Extraction details.")
     st.caption("Tip: Extended columns help ARA-style schedules.")
 
+@st.cache_resource
+def get_cache() -> ExtractionCache:
+    # one cache per server process; hits and misses are counted per job
+    # (its timings), since process workers each open the cache themselves
+    return ExtractionCache()
+
+@st.cache_resource
+def get_jobs() -> JobQueue:
+    # Extraction runs on background workers, so reruns (widget changes,
+    # downloads) never restart it. Several workers are separate processes,
+    # so uploaded PDFs are extracted in parallel (within HDL_JOB_MEMORY_MB).
+    # HDL_JOB_WORKERS=0 leaves the queue to standalone workers started with
+    # `python jobs.py`.
+    queue = JobQueue(cache=get_cache())
+    if job_workers > 0:
+        WorkerPool(queue, workers=job_workers, processes=job_workers > 1)
+    return queue
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def load_rows(job_id: str):
+    return get_jobs().rows(job_id)
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def get_exports(job_ids: tuple, catalog: str = ""):
+    # One shared table per result set (the finished job ids, in upload
+    # order). It renders each download on first click and keeps the bytes,
+    # so reruns and preview changes don't rebuild any export. With a
+    # catalog, the codes of every file are matched in one batch first;
+    # matches too far from the code as read are kept for review.
+    rows = (row for job_id in job_ids for row in load_rows(job_id))
+    if not catalog:
+        return ExportTable(rows), {}
+    timings = StageTimings()
+    with timings.stage("catalog"):
+        rows, fixed, review = load_catalog(catalog).correct(rows)
+    timings.count("catalog_fixed", fixed)
+    table = ExportTable(rows)
+    table.timings.merge(timings.to_dict())
+    return table, review
+
+cache = get_cache()
+jobs = get_jobs()
+
 uploaded = st.file_uploader("Drop one or more PDF schedules", type=["pdf"], accept_multiple_files=True)
 if not uploaded:
     st.info("Upload PDFs to begin.")
     st.stop()
 
-all_rows = []
-extract_log = []
-
-start = time.time()
+# Each upload is submitted once per set of options: reruns (progress
+# polling, widget changes) find its job id in the session instead of
+# spooling and hashing the file again. Resubmitting an unchanged file with
+# the same options (a new session) returns its existing job.
+submit_options = dict(
+    supplier=None if supplier == "auto" else supplier,
+    force_ocr=force_ocr,
+    profile=profile,
+    layout=layout,
+)
+submitted = st.session_state.setdefault("job_ids", {})
+job_ids = []
 for f in uploaded:
-    data = f.read()
-    text_pages = extract_text_from_pdf(data, force_ocr=force_ocr)
-    rows = parse_with_supplier(text_pages, None if supplier == "auto" else supplier)
-    all_rows.extend(rows)
-    extract_log.append((f.name, len(text_pages), len(rows)))
+    key = (f.file_id, *submit_options.values())
+    if key not in submitted:
+        submitted[key] = jobs.submit(f.name, f, ocr_workers=int(ocr_workers), **submit_options)
+    job_ids.append(submitted[key])
+
+def job_status(job) -> str:
+    if job.status == QUEUED:
+        return f"{job.name}: queued"
+    if job.status == FAILED:
+        return f"{job.name}: failed — {job.error}"
+    pages = f"page {job.pages_done}/{job.page_count}" if job.page_count else "starting"
+    return f"{job.name}: {pages}, {job.ocr_pages} OCR pages, {job.rows_found} rows ({job.elapsed:.0f}s)"
+
+@st.fragment(run_every=1.0)
+def show_progress(job_ids):
+    current = jobs.jobs(job_ids)
+    preview = []
+    for job in current:
+        if job.active:
+            st.progress(job.progress, text=job_status(job))
+        if job.status != FAILED and len(preview) < PREVIEW_ROWS:
+            preview += jobs.partial_rows(job.id, PREVIEW_ROWS - len(preview))
+    if preview:
+        st.dataframe(rows_to_dataframe(preview, extended=extended), use_container_width=True)
+    if not any(job.active for job in current):
+        # everything finished: rerun the whole page to show the results
+        st.rerun()
+
+current = jobs.jobs(job_ids)
+if any(job.active for job in current):
+    show_progress(job_ids)
+for job in current:
+    if job.status == FAILED:
+        # failed jobs are not resubmitted by reruns; retrying is explicit
+        error, retry = st.columns([6, 1])
+        error.error(job_status(job))
+        if retry.button("Retry", key=f"retry-{job.id}") and jobs.retry(job.id):
+            st.rerun()
+
+finished = [job for job in current if job.finished_ok]
+if not finished:
+    st.stop()
+
+table, review = get_exports(tuple(job.id for job in finished), str(catalog_path) if use_catalog else "")
+pending = len(current) - len(finished)
+st.success(
+    f"Parsed {len(finished)} files — {len(table)} rows."
+    + (f" {pending} more still running or failed." if pending else "")
+)
 
-elapsed = time.time() - start
-st.success(f"Parsed {len(uploaded)} files in {elapsed:.2f}s — {sum(r for _,_,r in extract_log)} rows.")
+if review:
+    with st.expander(f"Catalog: {len(review)} codes to review"):
+        st.caption("These codes are close to a catalog code but differ by more than misread characters, so they were left as read.")
+        st.table([{"Code as read": code, "Closest catalog code": m.code, "Score": round(m.score)} for code, m in review.items()])
 
 # PREVIEW
-from exporters import rows_to_dataframe
-preview = rows_to_dataframe(all_rows, extended=extended)
-st.dataframe(preview, use_container_width=True)
+st.dataframe(table.to_dataframe(extended=extended), use_container_width=True)
 
-# DOWNLOADS
-col1, col2, col3, col4 = st.columns(4)
+# DOWNLOADS — each file is rendered when its button is clicked
+col1, col2, col3, col4, col5 = st.columns(5)
 with col1:
-    xlsx = export_excel(all_rows, extended=extended)
-    st.download_button("⬇️ Excel (.xlsx)", data=xlsx, file_name="door_schedule_v6.xlsx", mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+    st.download_button("⬇️ Excel (.xlsx)", data=partial(table.render, "xlsx", extended), file_name="door_schedule_v6.xlsx", mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
 with col2:
-    csv = export_csv(all_rows, extended=extended)
-    st.download_button("⬇️ CSV (.csv)", data=csv, file_name="door_schedule_v6.csv", mime="text/csv")
+    st.download_button("⬇️ CSV (.csv)", data=partial(table.render, "csv", extended), file_name="door_schedule_v6.csv", mime="text/csv")
 with col3:
-    jsonl = export_jsonl(all_rows)
-    st.download_button("⬇️ JSONL (.jsonl)", data=jsonl, file_name="door_schedule_v6.jsonl", mime="application/jsonl")
+    st.download_button("⬇️ JSONL (.jsonl)", data=partial(table.render, "jsonl"), file_name="door_schedule_v6.jsonl", mime="application/jsonl")
 with col4:
-    htmls = export_cin7_html_templates(all_rows)
-    zipped = io.BytesIO()
-    import zipfile
-    with zipfile.ZipFile(zipped, "w", zipfile.ZIP_DEFLATED) as z:
-        for i, h in enumerate(htmls, start=1):
-            z.writestr(f"product_{i:03d}.html", h)
-    st.download_button("⬇️ CIN7 HTML (zip)", data=zipped.getvalue(), file_name="cin7_templates.zip", mime="application/zip")
+    st.download_button("⬇️ Parquet (.parquet)", data=partial(table.render, "parquet"), file_name="door_schedule_v6.parquet", mime="application/vnd.apache.parquet")
+with col5:
+    st.download_button("⬇️ CIN7 HTML (zip)", data=partial(table.render, "cin7"), file_name="cin7_templates.zip", mime="application/zip")
 
 with st.expander("Extraction details"):
-    for name, pages, rows in extract_log:
-        st.write(f"**{name}** — {pages} pages → {rows} rows")
+    cache_counts = StageTimings()
+    for job in finished:
+        detected = f" — detected {job.supplier} ({job.confidence:.0%})" if supplier == "auto" else ""
+        st.write(f"**{job.name}** — {job.page_count} pages ({job.ocr_pages} OCR) → {job.rows_found} rows in {job.elapsed:.1f}s{detected}")
+        timings = jobs.timings(job.id)
+        if timings:
+            cache_counts.merge({"counters": timings.get("counters", {})})
+        if timings and timings["stages"]:
+            st.caption(" · ".join(format_timings(timings)))
+        report = jobs.profile_report(job.id)
+        if report:
+            st.code(report, language=None)
+    if table.timings.stages:
+        st.caption("Exports: " + " · ".join(format_timings(table.timings.to_dict())))
+    stats = cache.stats()
+    counters = cache_counts.counters
+    st.caption(
+        f"Cache: {counters.get('cache_hits', 0)} hits / {counters.get('cache_misses', 0)} misses — "
+        f"{stats['entries']} entries, {stats['bytes'] / 1e6:.1f} MB on disk"
+    )
 
 st.caption("V6 — pdfplumber primary, per‑page OCR fallback. Extend supplier rules in `suppliers/`.")
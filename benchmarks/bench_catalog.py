@@ -0,0 +1,67 @@
+"""
+Benchmark for catalog code matching (catalog.py).
+
+Builds a random catalog of --skus codes, then times index construction and
+matching --queries codes with one or two OCR-style character errors, cold
+and again from the memo:
+
+    python benchmarks/bench_catalog.py [--skus 100000] [--queries 2000]
+"""
+from __future__ import annotations
+import argparse
+import random
+import string
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from catalog import Catalog  # noqa: E402
+
+ALPHABET = string.ascii_uppercase + string.digits + "/-"
+OCR_SWAPS = {"0": "O", "1": "I", "5": "S", "8": "B", "O": "0", "S": "5"}
+
+
+def random_codes(n: int, seed: int = 7) -> List[str]:
+    rnd = random.Random(seed)
+    codes = set()
+    while len(codes) < n:
+        codes.add("".join(rnd.choice(ALPHABET) for _ in range(rnd.randint(5, 12))))
+    return sorted(codes)
+
+
+def misread(code: str, rnd: random.Random) -> str:
+    chars = list(code)
+    for _ in range(rnd.randint(1, 2)):
+        i = rnd.randrange(len(chars))
+        chars[i] = OCR_SWAPS.get(chars[i], rnd.choice(ALPHABET))
+    return "".join(chars)
+
+
+def main(argv: List[str] = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--skus", type=int, default=100_000)
+    ap.add_argument("--queries", type=int, default=2000)
+    args = ap.parse_args(argv)
+
+    rnd = random.Random(11)
+    codes = random_codes(args.skus)
+    queries = [misread(c, rnd) for c in rnd.sample(codes, args.queries)]
+
+    start = time.perf_counter()
+    catalog = Catalog(codes)
+    print(f"index {len(catalog):,} SKUs: {time.perf_counter() - start:.3f}s")
+    start = time.perf_counter()
+    found = catalog.match_codes(queries)
+    cold = time.perf_counter() - start
+    matched = sum(1 for m in found.values() if m is not None)
+    print(f"match {len(queries):,} codes: {cold:.3f}s ({len(queries) / cold:,.0f}/s), {matched:,} matched")
+    start = time.perf_counter()
+    catalog.match_codes(queries)
+    print(f"memoized repeat: {time.perf_counter() - start:.4f}s")
+
+
+if __name__ == "__main__":
+    main()
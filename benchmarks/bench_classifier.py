@@ -0,0 +1,55 @@
+"""
+Micro-benchmark for the per-line supplier heuristics.
+
+Prints lines/second for each supplier's line classifier on its own and for
+the full parse_page loop (classification + ItemRow construction):
+
+    python benchmarks/bench_classifier.py [--lines 50000] [--repeat 5]
+"""
+from __future__ import annotations
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.synthetic import sample_lines  # noqa: E402
+from suppliers.ARA import ARAParser  # noqa: E402
+from suppliers.allegion import AllegionParser  # noqa: E402
+from suppliers.base import ParseState, SupplierBase  # noqa: E402
+from suppliers.dormakaba import DormakabaParser  # noqa: E402
+from suppliers.jk import JKParser  # noqa: E402
+
+
+def best_rate(fn: Callable[[], object], n: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return n / best
+
+
+def main(argv: List[str] = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--lines", type=int, default=50_000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args(argv)
+
+    parsers = [("base", SupplierBase()), ("allegion", AllegionParser()), ("dormakaba", DormakabaParser()),
+               ("ara", ARAParser()), ("jk", JKParser())]
+    print(f"{'supplier':<10} {'classify lines/s':>17} {'parse lines/s':>14} {'rows':>7}")
+    for name, parser in parsers:
+        lines = sample_lines(name, args.lines)
+        page = "\n".join(lines)
+        classify = parser.classifier.classify
+        rows = sum(1 for _ in parser.parse_page(page, ParseState()))
+        classify_rate = best_rate(lambda: [classify(l) for l in lines], len(lines), args.repeat)
+        parse_rate = best_rate(lambda: list(parser.parse_page(page, ParseState())), len(lines), args.repeat)
+        print(f"{name:<10} {classify_rate:>17,.0f} {parse_rate:>14,.0f} {rows:>7}")
+
+
+if __name__ == "__main__":
+    main()
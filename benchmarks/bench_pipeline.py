@@ -0,0 +1,180 @@
+"""
+End-to-end pipeline benchmark on synthetic schedules.
+
+For each supplier profile and size it generates a schedule (see
+benchmarks/synthetic.py) as page texts and as a text-layer PDF, then times
+text extraction, the supplier parser on in-memory pages, the registry's
+extract_items on the PDF, rows_to_dataframe and every exporter. Results
+(seconds, pages/s, rows/s, peak RSS) go to a JSON file; --compare prints
+the change against an earlier results file and exits 1 if any stage got
+slower than --threshold:
+
+    python benchmarks/bench_pipeline.py [--pages 10 100 1000] [--suppliers allegion jk]
+        [--repeat 3] [--out bench-results.json] [--compare baseline.json]
+"""
+from __future__ import annotations
+import argparse
+import io
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.synthetic import SUPPLIERS, make_pdf, schedule_pages  # noqa: E402
+from engine import extract_text_from_pdf  # noqa: E402
+from exporters import (  # noqa: E402
+    export_csv, export_excel, export_jsonl, rows_to_dataframe, write_cin7_zip, write_parquet,
+)
+from suppliers import get_parser  # noqa: E402
+from suppliers.registry import get_supplier_parser  # noqa: E402
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def reset_peak_rss() -> None:
+    # Linux: writing 5 to clear_refs resets VmHWM, so each stage reports its own peak
+    try:
+        with open("/proc/self/clear_refs", "w") as fh:
+            fh.write("5")
+    except OSError:
+        pass
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size since the last reset (process lifetime where that's unsupported)."""
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def measure(fn: Callable[[], object], repeat: int) -> Tuple[float, float]:
+    """(best seconds, peak RSS MB) over `repeat` runs."""
+    best, peak = float("inf"), 0.0
+    for _ in range(repeat):
+        reset_peak_rss()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+        peak = max(peak, peak_rss_mb())
+    return best, peak
+
+
+def git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+def bench_supplier(supplier: str, pages: int, repeat: int) -> List[Dict]:
+    texts = schedule_pages(supplier, pages)
+    pdf = make_pdf(texts)
+    parser = get_parser(supplier, [])
+    rows = parser.parse(texts)
+    stages: List[Tuple[str, Callable[[], object]]] = [
+        ("extract_text_from_pdf", lambda: extract_text_from_pdf(pdf, ocr_workers=1)),
+        ("parse", lambda: parser.parse(texts)),
+        ("extract_items", lambda: get_supplier_parser(supplier)(pdf)),
+        ("rows_to_dataframe", lambda: rows_to_dataframe(rows, extended=True)),
+        ("export_excel", lambda: export_excel(rows, extended=True)),
+        ("export_csv", lambda: export_csv(rows, extended=True)),
+        ("export_jsonl", lambda: export_jsonl(rows)),
+        ("write_parquet", lambda: write_parquet(rows, io.BytesIO())),
+        ("write_cin7_zip", lambda: write_cin7_zip(rows, io.BytesIO())),
+        ("write_cin7_zip_rows", lambda: write_cin7_zip(rows, io.BytesIO(), grouped=False)),
+    ]
+    results = []
+    for stage, fn in stages:
+        seconds, peak = measure(fn, repeat)
+        results.append({
+            "supplier": supplier,
+            "pages": pages,
+            "rows": len(rows),
+            "stage": stage,
+            "seconds": round(seconds, 6),
+            "pages_per_s": round(pages / seconds, 1) if seconds else None,
+            "rows_per_s": round(len(rows) / seconds, 1) if seconds else None,
+            "peak_rss_mb": round(peak, 1),
+        })
+    return results
+
+
+def compare(results: List[Dict], baseline: List[Dict], threshold: float) -> List[str]:
+    """Print seconds now vs baseline per (supplier, pages, stage); returns the regressions."""
+    before = {(r["supplier"], r["pages"], r["stage"]): r for r in baseline}
+    slower = []
+    print(f"\n{'supplier':<10} {'pages':>6} {'stage':<22} {'before s':>10} {'now s':>10} {'ratio':>7}")
+    for r in results:
+        key = (r["supplier"], r["pages"], r["stage"])
+        old = before.get(key)
+        if old is None or not old["seconds"]:
+            continue
+        ratio = r["seconds"] / old["seconds"]
+        flag = "  SLOWER" if ratio > threshold else ""
+        print(f"{key[0]:<10} {key[1]:>6} {key[2]:<22} {old['seconds']:>10.4f} {r['seconds']:>10.4f} {ratio:>6.2f}x{flag}")
+        if flag:
+            slower.append(" / ".join(map(str, key)))
+    return slower
+
+
+def main(argv: List[str] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--pages", type=int, nargs="+", default=[10, 100, 1000])
+    ap.add_argument("--suppliers", nargs="+", choices=SUPPLIERS, default=list(SUPPLIERS))
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--out", type=Path, default=Path("bench-results.json"))
+    ap.add_argument("--compare", type=Path, help="earlier results file to compare against")
+    ap.add_argument("--threshold", type=float, default=1.25, help="flag stages slower than this ratio (default 1.25)")
+    args = ap.parse_args(argv)
+
+    # first calls pay for lazy imports (pyarrow, openpyxl); keep that out of the numbers
+    for supplier in args.suppliers:
+        bench_supplier(supplier, 1, 1)
+
+    results = []
+    print(f"{'supplier':<10} {'pages':>6} {'rows':>7} {'stage':<22} {'seconds':>9} {'pages/s':>10} {'rows/s':>11} {'peak MB':>8}")
+    for supplier in args.suppliers:
+        for pages in args.pages:
+            for r in bench_supplier(supplier, pages, args.repeat):
+                results.append(r)
+                print(
+                    f"{supplier:<10} {pages:>6} {r['rows']:>7} {r['stage']:<22} {r['seconds']:>9.4f} "
+                    f"{r['pages_per_s'] or 0:>10,.1f} {r['rows_per_s'] or 0:>11,.1f} {r['peak_rss_mb']:>8.1f}"
+                )
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    args.out.write_text(json.dumps(report, indent=2))
+    print(f"\nwrote {args.out}")
+
+    if args.compare:
+        slower = compare(results, json.loads(args.compare.read_text())["results"], args.threshold)
+        if slower:
+            print(f"{len(slower)} stage(s) slower than {args.threshold}x: {', '.join(slower)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""
+Synthetic door schedules for benchmarks and tests.
+
+schedule_pages builds page texts shaped like each supplier's schedules
+(title block, area headings, door/code/product/qty lines and the odd note);
+make_pdf turns page texts into a minimal text-layer PDF, one Helvetica
+line per text line, so the same schedule can be fed to the parsers directly
+or through the full PDF path. make_table_pdf lays rows out as cells at fixed
+column positions, like a schedule exported from a spreadsheet.
+"""
+from __future__ import annotations
+import random
+from typing import List, Sequence, Union
+
+SUPPLIERS = ("allegion", "dormakaba", "ara", "jk")
+
+CODES = ["L9D11S", "6649RH/30SSS", "MS2604PT", "TS93 G N AB", "LW1234", "HD400/SC", "OC SSS"]
+PRODUCTS = ["Lever set satin chrome", "Pull handle 300mm", "Door closer silver", "Hinge 100x75 SSS", "Cylinder 5 pin"]
+AREAS = ["Ground Floor", "Level 2", "Basement Car Park", "First Floor", "CLUBHOUSE"]
+
+# per supplier: title line, product codes that look like theirs, area headings
+# (JK doors avoid ARA's ED/ID/IS prefixes so auto-detection can tell them apart)
+DOOR_PREFIXES = {"jk": ["D", "DR"]}
+PROFILES = {
+    "allegion": ("Allegion hardware schedule - Schlage / LCN", ["L9D11S", "6649RH/30SSS", "L9050P", "4040XP"],
+                 ["Ground Floor", "Level 1", "Level 2", "Basement"]),
+    "dormakaba": ("dormakaba door hardware schedule", ["MS2604PT", "TS93 G N AB", "OC SSS", "MS1500S"],
+                  ["Ground Floor", "Level 1", "Level 2", "Basement"]),
+    "ara": ("ARA hardware schedule", ["ARA100", "LW1234", "MN220", "CL45/SS"],
+            ["CLUBHOUSE", "RECEPTION", "VILLAGE"]),
+    "jk": ("JK door hardware schedule", ["JK100", "JK220/SS", "JK45", "HD400/SC"],
+           ["Ground Floor", "First Floor", "Level 2"]),
+}
+
+LINES_PER_PAGE = 40
+
+
+def sample_lines(style: str, n: int, seed: int = 7) -> List[str]:
+    """Lines shaped like the given supplier's schedules."""
+    rnd = random.Random(seed)
+    lines = []
+    for i in range(n):
+        r = rnd.random()
+        door = f"{rnd.choice(['ED', 'ID', 'IS', 'D'])}{i % 900 + 100:03d}"
+        code, product, qty = rnd.choice(CODES), rnd.choice(PRODUCTS), rnd.randint(1, 12)
+        if r < 0.05:
+            lines.append(rnd.choice(AREAS))
+        elif style == "ara":
+            lines.append(door if r < 0.3 else f"{code.split()[0]} ARA {product} {qty}")
+        elif r < 0.85:
+            lines.append(f"{door} {code} {product} {qty}")
+        else:
+            lines.append(f"Notes: supply and fix to {rnd.choice(AREAS).lower()} doors")
+    return lines
+
+
+def schedule_pages(supplier: str, pages: int, lines_per_page: int = LINES_PER_PAGE, seed: int = 7) -> List[str]:
+    """Page texts of a `pages`-page schedule in the given supplier's style."""
+    title, codes, areas = PROFILES[supplier]
+    rnd = random.Random(f"{supplier}:{seed}")
+    door_prefixes = DOOR_PREFIXES.get(supplier, ["ED", "ID", "IS"])
+    out = []
+    door_no = 100
+    for p in range(pages):
+        lines = [title] if p == 0 else []
+        while len(lines) < lines_per_page:
+            r = rnd.random()
+            if r < 0.04:
+                lines.append(rnd.choice(areas))
+                continue
+            if r < 0.08:
+                lines.append("Notes: supply and fix to all doors, fixings by others")
+                continue
+            door_no += 1
+            door = f"{rnd.choice(door_prefixes)}{door_no % 9000 + 100:03d}"
+            items = rnd.randint(1, 4)
+            if supplier == "ara":
+                lines.append(door)
+            for _ in range(items):
+                code, product, qty = rnd.choice(codes), rnd.choice(PRODUCTS), rnd.randint(1, 12)
+                if supplier == "ara":
+                    lines.append(f"{code} {rnd.choice(['ARA', 'LW', 'MN'])} {product} {qty}")
+                else:
+                    lines.append(f"{door} {code} {product} {qty}")
+        out.append("\n".join(lines[:lines_per_page]))
+    return out
+
+
+def make_pdf(pages: List[str]) -> bytes:
+    """Minimal text-layer PDF: one Helvetica line per text line, blank string = empty page."""
+    return _pdf([["BT /F1 10 Tf 12 TL 40 800 Td"] + [f"({_escape(line)}) Tj T*" for line in text.splitlines()] + ["ET"]
+                 for text in pages])
+
+
+TABLE_COLUMNS = (40, 110, 230, 500)
+
+
+def make_table_pdf(pages: List[List[Union[str, Sequence[str]]]], columns: Sequence[float] = TABLE_COLUMNS) -> bytes:
+    """
+    Text-layer PDF of tables: each row is a sequence of cells drawn at the
+    `columns` x positions (empty cells skipped), or a plain string drawn at
+    the left margin (headings, notes). Rows are 14pt apart.
+    """
+    streams = []
+    for rows in pages:
+        ops = ["BT /F1 10 Tf"]
+        for n, row in enumerate(rows):
+            y = 800 - 14 * n
+            cells = [(columns[0], row)] if isinstance(row, str) else zip(columns, row)
+            ops.extend(f"1 0 0 1 {x} {y} Tm ({_escape(cell)}) Tj" for x, cell in cells if cell)
+        ops.append("ET")
+        streams.append(ops)
+    return _pdf(streams)
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _pdf(streams: List[List[str]]) -> bytes:
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for ops in streams:
+        stream = "\n".join(ops)
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{o:010d} 00000 n \n" for o in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def schedule_pdf(supplier: str, pages: int, **options) -> bytes:
+    return make_pdf(schedule_pages(supplier, pages, **options))
@@ -0,0 +1,277 @@
+"""
+Fuzzy matching of extracted product codes against a supplier catalog.
+
+Codes read off scans come back with character errors (L9Dl1S, MS26O4PT,
+6649RH/3OSSS). A Catalog loads a local CSV or Parquet catalog once and
+builds an index for matching:
+
+    exact   codes upper-cased without spaces, with the usual OCR
+            confusions folded (O->0, I/L/|->1); a query that lands on
+            exactly one catalog code this way needs no scoring
+    fuzzy   codes sorted by length: a query is scored only against the
+            slice whose lengths can still reach the cutoff, with one
+            rapidfuzz cdist call per query length (chunked so the score
+            matrix stays small even for ~100k SKUs)
+
+Rows without a code are matched on their product text against the catalog
+descriptions, when it has them. Product text is scored with every word
+counted (token_sort_ratio, so "Lever" doesn't match every lever in the
+catalog) and a match is only taken when it beats the runner-up by
+PRODUCT_MARGIN. Results are memoized on the catalog (up to
+MEMO_SIZE queries), so codes repeated across documents are only scored
+once; load_catalog keeps one catalog per file (reloaded when the file
+changes).
+
+A close score alone doesn't make a misread: 6649RH/30SSS and 6649LH/30SSS
+are both valid codes one letter apart. correct() only replaces a code when
+every difference from its match is an OCR look-alike (0/O/D/Q, 1/I/L/|/7,
+5/S, 8/B, 2/Z, 6/G) and keeps the code it replaced in ItemRow.code_raw;
+other matches are returned for review and leave the row as read.
+"""
+
+from __future__ import annotations
+
+import csv
+import dataclasses
+import os
+import threading
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from itertools import groupby, islice
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from models import ItemRow
+
+DEFAULT_CUTOFF = 85.0
+# queries scored per cdist call; bounds the score matrix at CHUNK x catalog bytes
+CHUNK = 128
+# memoized queries kept per catalog (oldest dropped first)
+MEMO_SIZE = 100_000
+# points a product match must score above the next description to be taken
+PRODUCT_MARGIN = 5.0
+CODE_COLUMNS = ("code", "sku", "product code", "item code", "part number", "part no")
+DESCRIPTION_COLUMNS = ("description", "product", "name", "product name")
+
+_CONFUSABLE = str.maketrans({"O": "0", "I": "1", "L": "1", "|": "1"})
+# characters OCR mistakes for one another; a fuzzy match differing from the
+# query only by these substitutions is taken as a misread
+_LOOKALIKES = ("0ODQ", "1IL|7", "5S", "8B", "2Z", "6G")
+LOOKALIKE_PAIRS = frozenset((a, b) for group in _LOOKALIKES for a in group for b in group if a != b)
+
+
+def normalize_code(code: str) -> str:
+    return "".join(code.upper().split())
+
+
+def fold_code(code: str) -> str:
+    """normalize_code with OCR look-alikes folded to one character."""
+    return normalize_code(code).translate(_CONFUSABLE)
+
+
+def is_misread(read: str, code: str) -> bool:
+    """Whether `read` differs from catalog `code` only by OCR look-alike substitutions."""
+    from rapidfuzz.distance import Levenshtein
+
+    a, b = normalize_code(read), normalize_code(code)
+    if len(a) != len(b):
+        return False
+    return all(op.tag == "replace" and (a[op.src_pos], b[op.dest_pos]) in LOOKALIKE_PAIRS for op in Levenshtein.editops(a, b))
+
+
+@dataclass(frozen=True)
+class CodeMatch:
+    code: str
+    score: float
+    description: Optional[str] = None
+
+
+class Catalog:
+    """
+    Index over catalog codes (and optional descriptions). match_codes and
+    match_products take any number of queries and return {query: CodeMatch
+    or None}; correct() applies the safe ones to rows.
+    """
+
+    def __init__(self, codes: Sequence[str], descriptions: Optional[Sequence[Optional[str]]] = None):
+        entries = sorted(
+            {normalize_code(c): (c, descriptions[i] if descriptions else None) for i, c in enumerate(codes) if c}.items(),
+            key=lambda e: len(e[0]),
+        )
+        self._keys = [k for k, _ in entries]
+        self.codes = [code for _, (code, _) in entries]
+        self.descriptions = [desc for _, (_, desc) in entries]
+        self._lengths = [len(k) for k in self._keys]
+        folded: Dict[str, Optional[int]] = {}
+        for i, key in enumerate(self._keys):
+            f = fold_code(key)
+            # ambiguous once folded: leave it to scoring
+            folded[f] = i if f not in folded else None
+        self._folded = folded
+        self._memo: Dict[Tuple[str, str, float], Optional[CodeMatch]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @classmethod
+    def from_file(cls, path: os.PathLike, code_column: Optional[str] = None, description_column: Optional[str] = None) -> "Catalog":
+        """Load a .csv or .parquet catalog; the code and description columns are found by name when not given."""
+        path = Path(path)
+        if path.suffix.lower() == ".parquet":
+            import pyarrow.parquet as pq
+            table = pq.read_table(path)
+            columns = {name: table.column(name).to_pylist() for name in table.column_names}
+        else:
+            with open(path, newline="", encoding="utf-8-sig") as fp:
+                reader = csv.DictReader(fp)
+                rows = list(reader)
+                columns = {name: [r[name] for r in rows] for name in reader.fieldnames or []}
+        code_column = code_column or _find_column(columns, CODE_COLUMNS)
+        if code_column is None:
+            raise ValueError(f"No code column in {path.name}; expected one of: {', '.join(CODE_COLUMNS)}")
+        description_column = description_column or _find_column(columns, DESCRIPTION_COLUMNS)
+        codes = [str(c).strip() if c is not None else "" for c in columns[code_column]]
+        descriptions = columns[description_column] if description_column else None
+        return cls(codes, descriptions)
+
+    def match_codes(self, queries: Iterable[str], cutoff: float = DEFAULT_CUTOFF) -> Dict[str, Optional[CodeMatch]]:
+        """Best catalog code for each query scoring at least `cutoff` (0-100), else None."""
+        from rapidfuzz import fuzz
+
+        found, todo = self._memoized("code", queries, cutoff)
+        fuzzy = []
+        for query in todo:
+            key = normalize_code(query)
+            i = self._folded.get(fold_code(key)) if key else None
+            if i is not None:
+                found[query] = CodeMatch(self.codes[i], 100.0, self.descriptions[i])
+            elif key:
+                fuzzy.append((key, query))
+            else:
+                found[query] = None
+        # one cdist call per query length, against the codes that length can match
+        keep = 1 - cutoff / 100
+        fuzzy.sort(key=lambda q: len(q[0]))
+        for length, group in groupby(fuzzy, key=lambda q: len(q[0])):
+            lo = bisect_left(self._lengths, length * (1 - keep) / (1 + keep) - 1e-9)
+            hi = bisect_right(self._lengths, length * (1 + keep) / (1 - keep) + 1e-9)
+            for query, match in self._best(list(group), self._keys[lo:hi], lo, fuzz.ratio, cutoff):
+                found[query] = match
+        self._remember("code", found, cutoff)
+        return found
+
+    def match_products(self, queries: Iterable[str], cutoff: float = DEFAULT_CUTOFF) -> Dict[str, Optional[CodeMatch]]:
+        """
+        Catalog entry whose description best matches each product text, if
+        no other description comes within PRODUCT_MARGIN of it (None when
+        ambiguous or without descriptions).
+        """
+        from rapidfuzz import fuzz, utils
+
+        found, todo = self._memoized("product", queries, cutoff)
+        if not any(self.descriptions):
+            found.update((q, None) for q in todo)
+        else:
+            choices = [d or "" for d in self.descriptions]
+            pairs = [(q, q) for q in todo]
+            found.update(self._best(
+                pairs, choices, 0, fuzz.token_sort_ratio, cutoff, processor=utils.default_process, margin=PRODUCT_MARGIN,
+            ))
+        self._remember("product", found, cutoff)
+        return found
+
+    def correct(
+        self, rows: Iterable[ItemRow], cutoff: float = DEFAULT_CUTOFF
+    ) -> Tuple[List[ItemRow], int, Dict[str, CodeMatch]]:
+        """
+        Rows with misread codes replaced by their catalog match, the code as
+        read kept in code_raw (rows without a code take the code of a clear
+        match for their product, with code_raw ""). Returns (rows, rows changed,
+        {code: match} for matches that were not applied because the codes
+        differ by more than look-alike characters, for review). All codes
+        and products of the batch are matched together.
+        """
+        rows = list(rows)
+        codes = self.match_codes({r.code for r in rows if r.code}, cutoff)
+        products = self.match_products({r.product for r in rows if not r.code and r.product}, cutoff)
+        review = {
+            code: match for code, match in codes.items()
+            if match is not None and match.code != code and not is_misread(code, match.code)
+        }
+        out, changed = [], 0
+        for r in rows:
+            match = codes.get(r.code) if r.code else products.get(r.product)
+            if match is not None and match.code != r.code and r.code not in review:
+                r = dataclasses.replace(r, code=match.code, code_raw=r.code)
+                changed += 1
+            out.append(r)
+        return out, changed, review
+
+    def _best(self, pairs, choices, offset, scorer, cutoff, processor=None, margin=0.0):
+        # (query, CodeMatch or None) for each (key, query) pair, CHUNK queries per cdist call;
+        # with a margin, a best score the runner-up comes within `margin` of is no match
+        import numpy as np
+        from rapidfuzz import process
+
+        for start in range(0, len(pairs), CHUNK):
+            chunk = pairs[start:start + CHUNK]
+            if not choices:
+                yield from ((query, None) for _, query in chunk)
+                continue
+            scores = process.cdist(
+                [key for key, _ in chunk], choices, scorer=scorer, processor=processor,
+                score_cutoff=max(0.0, cutoff - margin), dtype=np.uint8, workers=-1,
+            )
+            best = scores.argmax(axis=1)
+            top = scores[np.arange(len(chunk)), best]
+            if margin and len(choices) > 1:
+                runner_up = np.partition(scores, -2, axis=1)[:, -2]
+                top = np.where(top.astype(float) - runner_up > margin, top, 0)
+            for (_, query), j, score in zip(chunk, best, top):
+                i = offset + int(j)
+                yield query, CodeMatch(self.codes[i], float(score), self.descriptions[i]) if score >= cutoff else None
+
+    def _memoized(self, kind: str, queries: Iterable[str], cutoff: float):
+        found, todo = {}, []
+        with self._lock:
+            for q in dict.fromkeys(queries):
+                key = (kind, q, cutoff)
+                if key in self._memo:
+                    found[q] = self._memo[key]
+                else:
+                    todo.append(q)
+        return found, todo
+
+    def _remember(self, kind: str, found: Dict[str, Optional[CodeMatch]], cutoff: float) -> None:
+        with self._lock:
+            self._memo.update(((kind, q, cutoff), m) for q, m in found.items())
+            # dicts keep insertion order: drop the oldest queries past the bound
+            for key in list(islice(self._memo, max(0, len(self._memo) - MEMO_SIZE))):
+                del self._memo[key]
+
+
+def _find_column(columns: Dict[str, list], names: Sequence[str]) -> Optional[str]:
+    by_name = {" ".join(c.lower().replace("_", " ").split()): c for c in columns}
+    return next((by_name[n] for n in names if n in by_name), None)
+
+
+_catalogs: Dict[Path, Tuple[float, Catalog]] = {}
+_catalogs_lock = threading.Lock()
+
+
+def load_catalog(path: os.PathLike) -> Catalog:
+    """The catalog at `path`, loaded once per process and again only when the file changes."""
+    path = Path(path).resolve()
+    mtime = path.stat().st_mtime
+    with _catalogs_lock:
+        cached = _catalogs.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = _catalogs[path] = (mtime, Catalog.from_file(path))
+        return cached[1]
+
+
+def default_catalog_path() -> Optional[Path]:
+    """HDL_CATALOG, when set."""
+    value = os.environ.get("HDL_CATALOG", "").strip()
+    return Path(value) if value else None
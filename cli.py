@@ -0,0 +1,290 @@
+"""
+Headless batch extraction for the HDL Door Schedule Extractor.
+
+    python cli.py schedules/ "archive/2024-*.pdf" --out out/ --format xlsx csv
+    python cli.py archive/ --merge --format jsonl --workers 8
+    python cli.py archive/ --merge --format parquet
+    python cli.py archive/ --catalog catalog.csv --format csv
+
+Inputs are PDF files, directories (searched recursively) or glob patterns.
+Each PDF is extracted with engine.extract_items_from_pdf in a worker process
+and written next to the others in --out, one file per format (or a single
+merged file per format with --merge). Same-named PDFs from different
+directories are prefixed with their directories (see output_stems). A
+per-file timing summary is printed at the end; the exit status is 1 if any
+file failed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from catalog import DEFAULT_CUTOFF, default_catalog_path, load_catalog
+from engine import ExtractionInfo, ItemRow, extract_items_from_pdf
+from exporters import write_csv, write_excel, write_jsonl, write_parquet
+from models import RowStore
+from suppliers.registry import list_suppliers
+from utils.cache import ExtractionCache
+from utils.profiling import StageTimings, format_timings, log_timings
+
+FORMATS = ("xlsx", "csv", "jsonl", "parquet")
+MERGED_STEM = "merged"
+
+
+@dataclass
+class BatchOptions:
+    out_dir: Path
+    formats: Sequence[str] = ("xlsx",)
+    supplier: str = "auto"
+    force_ocr: bool = False
+    ocr_workers: int = 1
+    extended: bool = False
+    merge: bool = False
+    use_cache: bool = True
+    layout: bool = False
+    catalog: Optional[Path] = None
+    catalog_cutoff: float = DEFAULT_CUTOFF
+
+
+@dataclass
+class FileResult:
+    path: Path
+    supplier: str = ""
+    confidence: float = 0.0
+    pages: int = 0
+    rows: int = 0
+    seconds: float = 0.0
+    outputs: List[Path] = field(default_factory=list)
+    error: Optional[str] = None
+    # StageTimings.to_dict() of this file's extraction and output writing
+    timings: Dict = field(default_factory=dict)
+    # only carried back to the parent when outputs are merged
+    items: Optional[List[ItemRow]] = None
+    # code as read -> closest catalog code, for matches left for review
+    review: Dict[str, str] = field(default_factory=dict)
+
+
+def collect_inputs(patterns: Iterable[str]) -> List[Path]:
+    """Expand files, directories and glob patterns into a de-duplicated, ordered list of PDFs."""
+    found: List[Path] = []
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            matches = sorted(p for p in path.rglob("*") if p.suffix.lower() == ".pdf" and p.is_file())
+        elif path.is_file():
+            matches = [path]
+        else:
+            matches = sorted(Path(p) for p in glob.glob(pattern, recursive=True) if Path(p).is_file())
+        found.extend(matches)
+    seen = set()
+    unique = []
+    for p in found:
+        key = p.resolve()
+        if key not in seen:
+            seen.add(key)
+            unique.append(p)
+    return unique
+
+
+def output_stems(paths: Sequence[Path]) -> List[str]:
+    """
+    Output file stem for each input: its file stem, or for files whose stems
+    collide (sched.pdf in two directories) their path below the directories'
+    common parent, joined with "-" (a-sched, b-sched). Whatever still
+    collides gets a numeric suffix.
+    """
+    groups: Dict[str, List[int]] = {}
+    for i, p in enumerate(paths):
+        groups.setdefault(p.stem.lower(), []).append(i)
+    stems = [p.stem for p in paths]
+    for indices in groups.values():
+        if len(indices) < 2:
+            continue
+        resolved = [paths[i].resolve() for i in indices]
+        root = Path(os.path.commonpath([r.parent for r in resolved]))
+        for i, r in zip(indices, resolved):
+            stems[i] = "-".join(r.relative_to(root).with_suffix("").parts)
+    seen: Dict[str, int] = {}
+    for i, stem in enumerate(stems):
+        n = seen[stem.lower()] = seen.get(stem.lower(), 0) + 1
+        if n > 1:
+            stems[i] = f"{stem}-{n}"
+    return stems
+
+
+def write_outputs(rows: Iterable[ItemRow], stem: Path, formats: Sequence[str], extended: bool) -> List[Path]:
+    """Write rows to stem.<fmt> for each requested format; returns the written paths."""
+    written = []
+    for fmt in formats:
+        target = stem.with_suffix(f".{fmt}")
+        if fmt == "xlsx":
+            with open(target, "wb") as fp:
+                write_excel(rows, fp, extended=extended)
+        elif fmt == "csv":
+            with open(target, "w", encoding="utf-8", newline="") as fp:
+                write_csv(rows, fp, extended=extended)
+        elif fmt == "jsonl":
+            with open(target, "w", encoding="utf-8") as fp:
+                write_jsonl(rows, fp)
+        elif fmt == "parquet":
+            with open(target, "wb") as fp:
+                write_parquet(rows, fp)
+        else:
+            raise ValueError(f"Unknown output format: {fmt}")
+        written.append(target)
+    return written
+
+
+def process_file(path: Path, options: BatchOptions, stem: Optional[str] = None) -> FileResult:
+    """Extract one PDF and write its outputs; failures are reported in the result, not raised."""
+    result = FileResult(path=path)
+    start = time.perf_counter()
+    info = ExtractionInfo()
+    try:
+        rows = extract_items_from_pdf(
+            path,
+            supplier=None if options.supplier == "generic" else options.supplier,
+            force_ocr=options.force_ocr,
+            ocr_workers=options.ocr_workers,
+            cache=ExtractionCache() if options.use_cache else None,
+            info=info,
+            layout=options.layout,
+        )
+        if options.catalog is not None:
+            # one catalog per worker process; its memo carries over between files
+            with info.timings.stage("catalog"):
+                rows, fixed, review = load_catalog(options.catalog).correct(rows, options.catalog_cutoff)
+            info.timings.count("catalog_fixed", fixed)
+            info.timings.count("catalog_review", len(review))
+            result.review = {code: match.code for code, match in review.items()}
+        result.supplier, result.confidence = info.supplier, info.confidence
+        result.pages, result.rows = info.pages, len(rows)
+        if options.merge:
+            result.items = rows
+        else:
+            with info.timings.stage("export"):
+                result.outputs = write_outputs(rows, options.out_dir / (stem or path.stem), options.formats, options.extended)
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    result.seconds = time.perf_counter() - start
+    result.timings = info.timings.to_dict()
+    log_timings(
+        "file", info.timings, path=str(path), supplier=result.supplier, pages=result.pages, rows=result.rows,
+        seconds=round(result.seconds, 3), error=result.error,
+    )
+    return result
+
+
+def run_batch(paths: Sequence[Path], options: BatchOptions, workers: int = 1) -> Iterator[FileResult]:
+    """
+    Process PDFs on a pool of `workers` processes, yielding results in input
+    order as they complete. workers=1 runs in-process.
+    """
+    options.out_dir.mkdir(parents=True, exist_ok=True)
+    stems = output_stems(paths)
+    if workers <= 1 or len(paths) <= 1:
+        for path, stem in zip(paths, stems):
+            yield process_file(path, options, stem)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+        yield from pool.map(process_file, paths, [options] * len(paths), stems)
+
+
+def format_summary(results: Sequence[FileResult], elapsed: float) -> str:
+    name_width = max([len(r.path.name) for r in results] + [4])
+    lines = [f"{'File':<{name_width}}  {'Supplier':<10} {'Conf':>5} {'Pages':>6} {'Rows':>7} {'Secs':>8}  Status"]
+    for r in results:
+        status = f"FAILED {r.error}" if r.error else "ok"
+        lines.append(
+            f"{r.path.name:<{name_width}}  {r.supplier:<10} {r.confidence:>5.0%} {r.pages:>6} {r.rows:>7} {r.seconds:>8.2f}  {status}"
+        )
+    pages = sum(r.pages for r in results)
+    failed = sum(1 for r in results if r.error)
+    lines.append(
+        f"{len(results)} files, {failed} failed, {pages} pages, {sum(r.rows for r in results)} rows "
+        f"in {elapsed:.2f}s ({pages / elapsed if elapsed else 0:.1f} pages/s)"
+    )
+    return "\n".join(lines)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Extract door hardware schedules from PDFs in bulk.")
+    parser.add_argument("inputs", nargs="+", help="PDF files, directories or glob patterns")
+    parser.add_argument("-o", "--out", type=Path, default=Path("out"), help="output directory (default: ./out)")
+    parser.add_argument("-f", "--format", nargs="+", choices=FORMATS, default=["xlsx"], dest="formats")
+    parser.add_argument(
+        "-s", "--supplier", default="auto",
+        type=str.lower,
+        choices=["auto", "generic"] + [s.lower() for s in list_suppliers()],
+        help="supplier profile (default: auto-detect)",
+    )
+    parser.add_argument("--merge", action="store_true", help="write one merged file per format instead of one per PDF")
+    parser.add_argument("--extended", action="store_true", help="include Description/Colour columns")
+    parser.add_argument("--force-ocr", action="store_true")
+    parser.add_argument("--layout", action="store_true", help="read tables by column from word positions where found")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1, help="files processed in parallel")
+    parser.add_argument("--ocr-workers", type=int, default=1, help="OCR processes per file (default: 1)")
+    parser.add_argument(
+        "--catalog", type=Path, default=default_catalog_path(),
+        help="CSV/Parquet catalog to correct product codes against (default: HDL_CATALOG)",
+    )
+    parser.add_argument("--catalog-cutoff", type=float, default=DEFAULT_CUTOFF, help="minimum match score, 0-100")
+    parser.add_argument("--no-cache", action="store_true", help="bypass the on-disk extraction cache")
+    parser.add_argument("--timings", action="store_true", help="print time per pipeline stage, summed over all files")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    paths = collect_inputs(args.inputs)
+    if not paths:
+        print("No PDF files matched.", file=sys.stderr)
+        return 2
+
+    options = BatchOptions(
+        out_dir=args.out,
+        formats=args.formats,
+        supplier=args.supplier,
+        force_ocr=args.force_ocr,
+        ocr_workers=args.ocr_workers,
+        extended=args.extended,
+        merge=args.merge,
+        use_cache=not args.no_cache,
+        layout=args.layout,
+        catalog=args.catalog,
+        catalog_cutoff=args.catalog_cutoff,
+    )
+    start = time.perf_counter()
+    results = []
+    merged = RowStore()
+    for r in run_batch(paths, options, workers=args.workers):
+        if r.items is not None:
+            merged.extend(r.items)
+            r.items = None
+        results.append(r)
+        print(f"[{len(results)}/{len(paths)}] {r.path.name}: {'FAILED' if r.error else f'{r.rows} rows'}", file=sys.stderr)
+        for code, suggestion in r.review.items():
+            print(f"    review: {code} (catalog has {suggestion})", file=sys.stderr)
+
+    if args.merge:
+        for p in write_outputs(merged, options.out_dir / MERGED_STEM, options.formats, options.extended):
+            print(f"wrote {p}", file=sys.stderr)
+    print(format_summary(results, time.perf_counter() - start))
+    if args.timings:
+        total = StageTimings()
+        for r in results:
+            total.merge(r.timings)
+        print("\n".join(format_timings(total.to_dict())))
+    return 1 if any(r.error for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
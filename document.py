@@ -0,0 +1,271 @@
+from __future__ import annotations
+import hashlib
+import io
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from utils.io_helpers import PdfSource, is_path, map_file
+from utils.ocr import OCR_DPI, default_ocr_workers, ocr_pdf_pages
+from utils.profiling import StageTimings
+from utils.triage import OCR_PAGE, OCR_REGIONS, SKIP, PageTriage, triage_page
+
+
+# text, x0, x1, top, bottom (PDF points, top measured from the top edge)
+Word = Tuple[str, float, float, float, float]
+
+
+def page_words(page: "pdfplumber.page.Page") -> List[Word]:
+    return [(w["text"], w["x0"], w["x1"], w["top"], w["bottom"]) for w in page.extract_words()]
+
+
+class PdfDocument:
+    """
+    A PDF opened once and shared by text extraction and every supplier parser.
+
+    The text layer of each page is extracted at most once and scored by
+    utils.triage, which decides per page whether to skip OCR, OCR the whole
+    page (at a DPI sized to the sheet) or OCR only the image regions the
+    layer left empty. The decisions are kept in `triage`. Pages that need
+    OCR are rasterized together in batched poppler calls the first time the
+    OCR'd texts are requested.
+
+    page_fingerprint hashes what a page is drawn from (content streams and
+    the fonts/images they use) without extracting anything, so an unchanged
+    page in a new revision of the schedule can be recognised; reuse_text
+    then hands it the text extracted from the earlier revision.
+
+    With words=True the word boxes of each text layer are kept as well
+    (see words()), for layout-aware parsing by suppliers.table.
+
+    The source is the PDF bytes or a path. A file is memory-mapped rather
+    than read, and poppler renders straight from it; bytes that need OCR
+    are written to one temporary file for the document's lifetime. close()
+    (or leaving the `with` block) releases the map and removes that file.
+
+    With more than one OCR worker, the OCR process pool is started on the
+    first page that needs OCR and kept until close(), so each worker loads
+    its OCR engine once per document rather than once per window of pages.
+
+    Time spent opening the file, reading text layers, rasterizing and in
+    tesseract is recorded in `timings` (see utils.profiling).
+    """
+
+    def __init__(
+        self,
+        source: PdfSource,
+        force_ocr: bool = False,
+        ocr_workers: Optional[int] = None,
+        ocr_dpi: int = OCR_DPI,
+        timings: Optional[StageTimings] = None,
+        words: bool = False,
+    ):
+        self.source = source
+        self._stream = None
+        self._spooled: Optional[str] = None
+        self._ocr_pool: Optional[ProcessPoolExecutor] = None
+        self.force_ocr = force_ocr
+        self.ocr_workers = ocr_workers
+        self.ocr_dpi = ocr_dpi
+        self.timings = timings if timings is not None else StageTimings()
+        with self.timings.stage("open"):
+            # imported here so importing this module stays cheap
+            import pdfplumber
+            self._stream = map_file(source) if is_path(source) else io.BytesIO(source)
+            try:
+                self.pdf = pdfplumber.open(self._stream)
+            except Exception:
+                self._stream.close()
+                raise
+        self._layer: List[Optional[str]] = [None] * len(self.pdf.pages)
+        self.keep_words = words
+        self._words: List[Optional[List[Word]]] = [None] * len(self.pdf.pages)
+        self.triage: List[Optional[PageTriage]] = [None] * len(self.pdf.pages)
+        self._texts: Optional[List[str]] = None
+        # index -> (text, was OCR'd) for pages whose text is already known
+        self._known: Dict[int, Tuple[str, bool]] = {}
+        self._digests: Dict[int, bytes] = {}
+
+    def __len__(self) -> int:
+        return len(self._layer)
+
+    def __enter__(self) -> "PdfDocument":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._stream is None:
+            return
+        if self._ocr_pool is not None:
+            self._ocr_pool.shutdown(cancel_futures=True)
+            self._ocr_pool = None
+        self.pdf.close()
+        self._stream.close()
+        self._stream = None
+        if self._spooled is not None:
+            os.remove(self._spooled)
+            self._spooled = None
+
+    def ocr_source(self) -> PdfSource:
+        """What poppler renders from: the file, or the bytes spooled to a temporary file once."""
+        if is_path(self.source):
+            return self.source
+        if self._spooled is None:
+            fd, self._spooled = tempfile.mkstemp(prefix="hdl-pdf-", suffix=".pdf")
+            with os.fdopen(fd, "wb") as fp:
+                fp.write(self.source)
+        return self._spooled
+
+    def layer_text(self, index: int) -> str:
+        """pdfplumber text of page `index` (0-based), extracted once."""
+        text = self._layer[index]
+        if text is None:
+            with self.timings.stage("text_layer"):
+                page = self.pdf.pages[index]
+                text = self._layer[index] = page.extract_text() or ""
+                self.triage[index] = triage_page(
+                    text,
+                    float(page.width),
+                    float(page.height),
+                    images=[(im["x0"], im["top"], im["x1"], im["bottom"]) for im in page.images],
+                    chars=[((c["x0"] + c["x1"]) / 2, (c["top"] + c["bottom"]) / 2) for c in page.chars],
+                    force_ocr=self.force_ocr,
+                    dpi=self.ocr_dpi,
+                )
+                if self.keep_words:
+                    self._words[index] = page_words(page)
+                # drop pdfplumber's per-page object cache; the text is all we keep
+                page.close()
+        return text
+
+    def words(self, index: int) -> List[Word]:
+        """Word boxes (text, x0, x1, top, bottom) of page `index`'s text layer, extracted once."""
+        words = self._words[index]
+        if words is None:
+            if self.keep_words and self._layer[index] is None:
+                self.layer_text(index)
+                return self._words[index]
+            with self.timings.stage("text_layer"):
+                page = self.pdf.pages[index]
+                words = self._words[index] = page_words(page)
+                page.close()
+        return words
+
+    def page_fingerprint(self, index: int) -> str:
+        """Content hash of page `index`: its streams, resources, media box and rotation."""
+        page = self.pdf.pages[index].page_obj
+        h = hashlib.sha256()
+        h.update(repr((page.mediabox, page.rotate)).encode())
+        for stream in page.contents:
+            h.update(self._digest(stream))
+        h.update(self._digest(page.resources))
+        return h.hexdigest()
+
+    def fingerprints(self) -> List[str]:
+        return [self.page_fingerprint(i) for i in range(len(self))]
+
+    def _digest(self, obj: Any) -> bytes:
+        # Objects shared between pages (fonts, images) are hashed once per
+        # document, keyed by object id; streams hash their stored bytes.
+        from pdfminer.pdftypes import PDFObjRef, PDFStream
+        from pdfminer.psparser import PSLiteral
+        if isinstance(obj, PDFObjRef):
+            digest = self._digests.get(obj.objid)
+            if digest is None:
+                self._digests[obj.objid] = b"cycle"
+                digest = self._digests[obj.objid] = self._digest(obj.resolve())
+            return digest
+        h = hashlib.sha256()
+        if isinstance(obj, PDFStream):
+            h.update(b"stream")
+            h.update(self._digest(obj.attrs))
+            h.update(obj.rawdata if obj.rawdata is not None else obj.data or b"")
+        elif isinstance(obj, dict):
+            for key in sorted(obj):
+                if key != "Parent":
+                    h.update(str(key).encode())
+                    h.update(self._digest(obj[key]))
+        elif isinstance(obj, (list, tuple)):
+            h.update(b"[")
+            for item in obj:
+                h.update(self._digest(item))
+        elif isinstance(obj, PSLiteral):
+            h.update(b"/" + str(obj.name).encode())
+        else:
+            h.update(repr(obj).encode())
+        return h.digest()
+
+    def reuse_text(self, index: int, text: str, ocr: bool = False) -> None:
+        """Use `text` for page `index` instead of extracting (or OCR'ing) it again."""
+        self._known[index] = (text, ocr)
+
+    def reused(self, index: int) -> bool:
+        return index in self._known
+
+    def page_triage(self, index: int) -> PageTriage:
+        self.layer_text(index)
+        return self.triage[index]
+
+    def needs_ocr(self, index: int) -> bool:
+        if index in self._known:
+            return self._known[index][1]
+        return self.page_triage(index).decision != SKIP
+
+    def triage_summary(self) -> Dict[str, int]:
+        """Number of pages per OCR decision (skip / ocr_page / ocr_regions)."""
+        return dict(Counter(self.page_triage(i).decision for i in range(len(self))))
+
+    def texts(self) -> List[str]:
+        """Text of every page in order, with OCR applied where needed."""
+        if self._texts is None:
+            self._texts = list(self.iter_texts(window=len(self)))
+        return self._texts
+
+    def iter_texts(self, window: Optional[int] = None) -> Iterator[str]:
+        """
+        Yield page texts in order as they become available. Pages are
+        processed in windows (default: 4 pages per OCR worker) so OCR still
+        runs batched and in parallel while the first pages reach the parser.
+        """
+        if self._texts is not None:
+            yield from self._texts
+            return
+        workers = default_ocr_workers() if self.ocr_workers is None else self.ocr_workers
+        window = max(1, window or workers * 4)
+        for start in range(0, len(self), window):
+            indices = range(start, min(start + window, len(self)))
+            texts = {i: self._known[i][0] if i in self._known else self.layer_text(i) for i in indices}
+            jobs = {
+                i + 1: (self.triage[i].dpi, self.triage[i].regions)
+                for i in indices
+                if i not in self._known and self.triage[i].decision in (OCR_PAGE, OCR_REGIONS)
+            }
+            if jobs:
+                if workers > 1 and self._ocr_pool is None:
+                    self._ocr_pool = ProcessPoolExecutor(max_workers=workers)
+                pages = ocr_pdf_pages(self.ocr_source(), jobs, workers=workers, timings=self.timings, pool=self._ocr_pool)
+                for page_number, text in pages.items():
+                    i = page_number - 1
+                    if self.triage[i].decision == OCR_REGIONS:
+                        text = "\n".join(t for t in (texts[i], text) if t.strip())
+                    texts[i] = text
+            for i in indices:
+                yield texts[i]
+
+
+@contextmanager
+def open_document(source: Union[bytes, PdfDocument], **options) -> Iterator[PdfDocument]:
+    """
+    Yield a PdfDocument for raw bytes (opened and closed here) or pass an
+    already-open document through untouched so its caller keeps ownership.
+    """
+    if isinstance(source, PdfDocument):
+        yield source
+        return
+    with PdfDocument(source, **options) as doc:
+        yield doc
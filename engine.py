@@ -1,28 +1,49 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import List, Optional
-import pdfplumber
-import io
+from dataclasses import asdict, dataclass, field
+from itertools import chain, islice
+from typing import Any, Iterable, Iterator, List, Optional, Tuple, Union
 import re
 
 from utils.parsing import normalize_spaces, looks_like_table, best_area_name
-from utils.io_helpers import bytes_to_images
-from utils.ocr import ocr_page_to_text
+from utils.cache import ExtractionCache, sha256_source
+from utils.io_helpers import PdfSource
+from utils.ocr import OCR_DPI
+from utils.ocr_engines import OcrOptions
+from utils.profiling import StageTimings
+from document import PdfDocument, open_document
+from suppliers import detect_supplier, get_parser, parser_for
+from suppliers.base import ParseState, SupplierBase
+from suppliers.detect import sample_indices
 from suppliers.registry import get_supplier_parser
+from models import ItemRow, intern_row  # re-exported: engine.ItemRow is models.ItemRow
+
+# Bump whenever text extraction or supplier parsing changes output, so
+# cached results from older code are not served.
+PARSER_VERSION = "6.5"
+
+# Supplier auto-detection reads the first DETECT_PAGES pages, then up to
+# DETECT_SAMPLES evenly spaced later pages (text layer only) if still unsure.
+DETECT_PAGES = 3
+DETECT_SAMPLES = 4
 
 
 # ---------------------------------------------------------------------
 # Data model
 # ---------------------------------------------------------------------
 @dataclass
-class ItemRow:
-    area: str
-    door: str
-    code: str
-    quantity: int
-    product: str
-    description: Optional[str] = None
-    colour: Optional[str] = None
+class ExtractionInfo:
+    """What iter_page_rows learned about a document, filled in as it runs."""
+    supplier: str = ""
+    confidence: float = 0.0
+    pages: int = 0
+    rows: int = 0
+    page_count: int = 0
+    ocr_pages: int = 0
+    # pages whose text came from an earlier revision (see iter_page_rows)
+    reused_pages: int = 0
+    # wall/CPU seconds per stage (open, text_layer, rasterize, tesseract,
+    # detect, parse) and counters (ocr_pages, lines)
+    timings: StageTimings = field(default_factory=StageTimings)
 
 
 # ---------------------------------------------------------------------
@@ -45,35 +66,233 @@ DOOR_RE = re.compile(
 # ---------------------------------------------------------------------
 # Core extraction logic
 # ---------------------------------------------------------------------
-def extract_text_from_pdf(data: bytes, force_ocr: bool = False) -> str:
+def extract_pages_from_pdf(
+    data: PdfSource,
+    force_ocr: bool = False,
+    ocr_workers: Optional[int] = None,
+    ocr_dpi: int = OCR_DPI,
+    cache: Optional[ExtractionCache] = None,
+) -> List[str]:
+    """
+    Extract the text of every page of a PDF, in page order.
+    Pages without a text layer (or every page when force_ocr=True) are
+    OCR'd with Tesseract; ocr_workers > 1 spreads that OCR over a process
+    pool (default: HDL_OCR_WORKERS or one worker per CPU).
+    """
+    if cache is not None:
+        key = _cache_key(sha256_source(data), "pages", force_ocr, ocr_dpi)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    with PdfDocument(data, force_ocr=force_ocr, ocr_workers=ocr_workers, ocr_dpi=ocr_dpi) as doc:
+        text_output = doc.texts()
+
+    if cache is not None:
+        cache.put(key, text_output)
+    return text_output
+
+
+def extract_text_from_pdf(
+    data: PdfSource,
+    force_ocr: bool = False,
+    ocr_workers: Optional[int] = None,
+) -> str:
     """
     Extract text from a PDF file.
     Falls back to OCR (Tesseract) if no text layer is found or force_ocr=True.
     """
-    text_output = []
+    return "\n".join(extract_pages_from_pdf(data, force_ocr=force_ocr, ocr_workers=ocr_workers))
+
+
+def _cache_key(pdf_hash: str, kind: str, force_ocr: bool, ocr_dpi: int, **extra) -> str:
+    return ExtractionCache.key(
+        pdf_hash, kind, force_ocr=force_ocr, ocr_dpi=ocr_dpi, ocr=OcrOptions.from_env().cache_tag(),
+        parser=PARSER_VERSION, **extra
+    )
+
+
+def _lookup(cache: ExtractionCache, key: str, timings: StageTimings) -> Optional[Any]:
+    # cache.get, counted per extraction: the cache's own counters are per
+    # process and job workers each have their own
+    value = cache.get(key)
+    timings.count("cache_hits" if value is not None else "cache_misses")
+    return value
+
+
+def iter_page_rows(
+    data: PdfSource,
+    supplier: Optional[str] = None,
+    force_ocr: bool = False,
+    ocr_workers: Optional[int] = None,
+    ocr_dpi: int = OCR_DPI,
+    cache: Optional[ExtractionCache] = None,
+    info: Optional[ExtractionInfo] = None,
+    layout: bool = False,
+) -> Iterator[Tuple[str, List[ItemRow]]]:
+    """
+    Stream (page_text, rows) for each page of a PDF, in page order.
+    Rows are parsed with the given supplier profile (auto-detected when
+    None, see DETECT_PAGES; "generic" for GenericParser), with area/door
+    context carried across pages.
+    `info`, when given, receives the parser used, detection confidence and
+    running page/row/OCR-page counts. A fully consumed stream is stored in
+    `cache`; a cached document is replayed without opening the PDF. With a
+    cache, each page's text and rows are also stored under the page's
+    content fingerprint, so a new revision of a schedule only extracts and
+    parses the pages that changed (counted in info.reused_pages otherwise).
+    layout=True reads tables by column from the word positions of each
+    page's text layer (suppliers.table); pages where no table is found, and
+    OCR'd pages, go through the supplier's text parser as usual.
+    """
+    info = info if info is not None else ExtractionInfo()
+    # layout parsing changes the rows, so it is part of every rows key
+    mode = {"layout": True} if layout else {}
+    if cache is not None:
+        pdf_hash = sha256_source(data)
+        pages_key = _cache_key(pdf_hash, "pages", force_ocr, ocr_dpi)
+        rows_key = _cache_key(pdf_hash, "rows", force_ocr, ocr_dpi, supplier=supplier or "auto", **mode)
+        pages = _lookup(cache, pages_key, info.timings)
+        cached = _lookup(cache, rows_key, info.timings) if pages is not None else None
+        if cached is not None:
+            info.supplier, info.confidence = cached["supplier"], cached["confidence"]
+            info.page_count, info.ocr_pages = len(pages), cached.get("ocr_pages", 0)
+            for text, rows in zip(pages, cached["rows"]):
+                info.pages += 1
+                info.rows += len(rows)
+                yield text, [intern_row(ItemRow(**r)) for r in rows]
+            return
+
+    # with a cache, each page's rows are kept once, as the dicts its
+    # page-rows entry holds; the document entry lists the same dicts
+    pages, page_dicts = [], []
+    page_entries = {}
+    timings = info.timings
+    table = None
+    if layout:
+        from suppliers.table import TableLayout  # NumPy only loads for layout parsing
+        table = TableLayout()
+    with PdfDocument(
+        data, force_ocr=force_ocr, ocr_workers=ocr_workers, ocr_dpi=ocr_dpi, timings=timings, words=layout
+    ) as doc:
+        # Pages of an earlier revision are cached under their content
+        # fingerprint, so only pages that changed are extracted again.
+        fingerprints = doc.fingerprints() if cache is not None else []
+        for i, fingerprint in enumerate(fingerprints):
+            hit = _lookup(cache, _cache_key(fingerprint, "page", force_ocr, ocr_dpi), timings)
+            if hit is not None:
+                doc.reuse_text(i, hit["text"], hit["ocr"])
+        texts = doc.iter_texts()
+        head = list(islice(texts, DETECT_PAGES))
+        if supplier:
+            parser = GenericParser() if supplier == GenericParser.name else get_parser(supplier, head)
+            info.confidence = 1.0
+        else:
+            sample = (doc.layer_text(i) for i in sample_indices(len(doc), len(head), DETECT_SAMPLES))
+            with timings.stage("detect"):
+                detection = detect_supplier(head, sample)
+            parser = parser_for(detection)
+            info.confidence = detection.confidence
+        info.supplier = parser.name
+        info.page_count = len(doc)
+        state = ParseState()
+        for i, text in enumerate(chain(head, texts)):
+            rows = None
+            if fingerprints:
+                reused = doc.reused(i)
+                if not reused:
+                    page_entries[_cache_key(fingerprints[i], "page", force_ocr, ocr_dpi)] = {
+                        "text": text, "ocr": doc.needs_ocr(i)
+                    }
+                # a page's rows depend on the area/door carried in from the
+                # page before and, reading tables, on the column template
+                # learned so far, which the entry carries on to the next page
+                carried = {f"state_{k}": v for k, v in asdict(state).items()}
+                if table is not None:
+                    carried["table"] = table.template_key()
+                page_rows_key = _cache_key(
+                    fingerprints[i], "page-rows", force_ocr, ocr_dpi, supplier=parser.name, **mode, **carried,
+                )
+                hit = _lookup(cache, page_rows_key, timings) if reused else None
+                if hit is not None:
+                    dicts = hit["rows"]
+                    rows = [intern_row(ItemRow(**r)) for r in dicts]
+                    state = ParseState(**hit["state"])
+                    if table is not None:
+                        table.restore(hit["table"])
+                info.reused_pages += reused
+            if rows is None:
+                with timings.stage("parse"):
+                    if table is not None and not doc.needs_ocr(i):
+                        rows = table.parse_page(doc.words(i), state)
+                        timings.count("table_pages", rows is not None)
+                    if rows is None:
+                        rows = list(parser.parse_page(text, state))
+                    # rows enter the pipeline here: intern their text once
+                    rows = [intern_row(row) for row in rows]
+                timings.count("lines", text.count("\n") + 1 if text else 0)
+                if fingerprints:
+                    dicts = [r.to_dict() for r in rows]
+                    page_entries[page_rows_key] = {"rows": dicts, "state": asdict(state)}
+                    if table is not None:
+                        page_entries[page_rows_key]["table"] = table.snapshot()
+            pages.append(text)
+            if fingerprints:
+                page_dicts.append(dicts)
+            info.ocr_pages += doc.needs_ocr(i)
+            info.pages += 1
+            info.rows += len(rows)
+            yield text, rows
 
-    with pdfplumber.open(io.BytesIO(data)) as pdf:
-        for page in pdf.pages:
-            text = page.extract_text() or ""
-            if force_ocr or not text.strip():
-                # Convert the page to an image for OCR fallback
-                image = bytes_to_images(data, page_numbers=[page.page_number - 1])[0]
-                text = ocr_page_to_text(image)
-            text_output.append(text)
+    if cache is not None:
+        page_entries[pages_key] = pages
+        page_entries[rows_key] = {
+            "supplier": info.supplier,
+            "confidence": info.confidence,
+            "ocr_pages": info.ocr_pages,
+            "rows": page_dicts,
+        }
+        cache.put_many(page_entries)
 
-    return "\n".join(text_output)
+
+def process_pdf(
+    data: PdfSource,
+    supplier: Optional[str] = None,
+    force_ocr: bool = False,
+    ocr_workers: Optional[int] = None,
+    ocr_dpi: int = OCR_DPI,
+    cache: Optional[ExtractionCache] = None,
+    info: Optional[ExtractionInfo] = None,
+    layout: bool = False,
+) -> Tuple[List[str], List[ItemRow]]:
+    """
+    Extract the page texts of a PDF and parse them with the given supplier
+    profile (auto-detected when None), by table layout where possible with
+    layout=True. Returns (pages, rows); both are served from cache when one
+    is given and already holds this document.
+    """
+    pages: List[str] = []
+    rows: List[ItemRow] = []
+    for text, page_rows in iter_page_rows(
+        data, supplier=supplier, force_ocr=force_ocr, ocr_workers=ocr_workers, ocr_dpi=ocr_dpi, cache=cache, info=info,
+        layout=layout,
+    ):
+        pages.append(text)
+        rows.extend(page_rows)
+    return pages, rows
 
 
 # ---------------------------------------------------------------------
 # Parse with supplier
 # ---------------------------------------------------------------------
-def parse_with_supplier(supplier_name: str, pdf_bytes: bytes) -> List[ItemRow]:
+def parse_with_supplier(supplier_name: str, source: Union[PdfSource, PdfDocument]) -> List[ItemRow]:
     """
     Use the correct supplier parser from the registry to extract structured data.
+    `source` is the PDF bytes or path, or an open PdfDocument shared with other stages.
     """
     parser = get_supplier_parser(supplier_name)
     try:
-        items = parser(pdf_bytes)
+        items = parser(source)
     except Exception as e:
         raise RuntimeError(f"❌ Failed to parse supplier '{supplier_name}': {e}")
 
@@ -86,59 +305,74 @@ def parse_with_supplier(supplier_name: str, pdf_bytes: bytes) -> List[ItemRow]:
 # ---------------------------------------------------------------------
 # Fallback parser (if supplier not identified)
 # ---------------------------------------------------------------------
-def parse_generic_pdf(pdf_bytes: bytes) -> List[ItemRow]:
+def parse_generic_pdf(source: Union[PdfSource, PdfDocument]) -> List[ItemRow]:
     """
     A generic parser for PDFs with tabular layouts or plain text when supplier is unknown.
     """
-    items: List[ItemRow] = []
-    current_area = "General"
-    current_door = None
-
-    with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
-        for page in pdf.pages:
-            text = page.extract_text() or ""
-            lines = [normalize_spaces(l) for l in text.splitlines() if l.strip()]
-
-            for line in lines:
-                # Try to detect area names (if your utils.best_area_name handles this)
-                area_candidate = best_area_name(line)
-                if area_candidate:
-                    current_area = area_candidate
-                    continue
-
-                # Detect door
-                door_match = DOOR_RE.search(line)
-                if door_match:
-                    current_door = door_match.group(1).upper()
-                    continue
-
-                # Detect code and quantity pattern (simple fallback)
-                match = re.match(r"^([A-Z0-9/.-]+)\s+(.+?)\s+(\d+)\s*$", line)
-                if match and current_door:
-                    code, desc, qty = match.groups()
-                    items.append(
-                        ItemRow(
-                            area=current_area,
-                            door=current_door,
-                            code=code.strip(),
-                            description=desc.strip(),
-                            colour=None,
-                            quantity=int(qty),
-                            product=desc.strip(),
-                        )
-                    )
-    return items
+    with open_document(source) as doc:
+        return list(iter_generic_rows(doc.iter_texts()))
+
+
+def iter_generic_rows(pages: Iterable[str]) -> Iterator[ItemRow]:
+    """Streaming form of parse_generic_pdf over page texts."""
+    return GenericParser().iter_rows(pages)
+
+
+class GenericParser(SupplierBase):
+    """The generic fallback as a page parser, so iter_page_rows can run it (supplier="generic")."""
+
+    name = "generic"
+
+    def parse_page(self, page: str, state: ParseState) -> Iterator[ItemRow]:
+        lines = [normalize_spaces(l) for l in page.splitlines() if l.strip()]
+
+        for line in lines:
+            # Try to detect area names (if your utils.best_area_name handles this)
+            area_candidate = best_area_name(line)
+            if area_candidate:
+                state.area = area_candidate
+                continue
+
+            # Detect door
+            door_match = DOOR_RE.search(line)
+            if door_match:
+                state.door = door_match.group(1).upper()
+                continue
+
+            # Detect code and quantity pattern (simple fallback)
+            match = re.match(r"^([A-Z0-9/.-]+)\s+(.+?)\s+(\d+)\s*$", line)
+            if match and state.door:
+                code, desc, qty = match.groups()
+                yield ItemRow(
+                    area=state.area or "General",
+                    door=state.door,
+                    code=code.strip(),
+                    description=desc.strip(),
+                    colour=None,
+                    quantity=int(qty),
+                    product=desc.strip(),
+                )
 
 
 # ---------------------------------------------------------------------
 # Entry point utility
 # ---------------------------------------------------------------------
-def extract_items_from_pdf(pdf_bytes: bytes, supplier: Optional[str] = None, force_ocr: bool = False) -> List[ItemRow]:
+def extract_items_from_pdf(
+    pdf_bytes: PdfSource,
+    supplier: Optional[str] = None,
+    force_ocr: bool = False,
+    ocr_workers: Optional[int] = None,
+    cache: Optional[ExtractionCache] = None,
+    info: Optional[ExtractionInfo] = None,
+    layout: bool = False,
+) -> List[ItemRow]:
     """
     Top-level function that selects the correct parser or uses a generic fallback.
+    supplier="auto" detects the supplier profile (see iter_page_rows) and
+    None uses the generic parser; every path runs through process_pdf, so
+    it honours `cache` and fills `info`.
     """
-    if supplier:
-        return parse_with_supplier(supplier, pdf_bytes)
-    else:
-        # fallback if supplier not specified or unknown
-        return parse_generic_pdf(pdf_bytes)
+    return process_pdf(
+        pdf_bytes, supplier=None if supplier == "auto" else supplier or GenericParser.name, force_ocr=force_ocr,
+        ocr_workers=ocr_workers, cache=cache, info=info, layout=layout,
+    )[1]
@@ -1,45 +1,238 @@
 from __future__ import annotations
-import pandas as pd
-from typing import List
-from engine import ItemRow
-from utils.excel import df_to_excel_bytes
+import csv
+import html
+import io
+import json
+import threading
+import time
+import zipfile
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import IO, TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from models import ItemRow, RowStore
+from utils.excel import write_xlsx
+from utils.profiling import StageTimings, log_timings
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 COLUMNS_DEFAULT = ["Area","Door","Code","Quantity","Product"]
 COLUMNS_EXTENDED = ["Area","Door","Code","Description","Colour","Quantity","Product"]
 
-def rows_to_dataframe(rows: List[ItemRow], extended: bool=False) -> pd.DataFrame:
+def _row_values(r: ItemRow, extended: bool) -> list:
     if extended:
-        data = [ [r.area, r.door, r.code, r.description or "", r.colour or "", r.quantity, r.product] for r in rows ]
-        cols = COLUMNS_EXTENDED
-    else:
-        data = [ [r.area, r.door, r.code, r.quantity, r.product] for r in rows ]
-        cols = COLUMNS_DEFAULT
-    df = pd.DataFrame(data, columns=cols)
-    return df
-
-def export_excel(rows: List[ItemRow], extended: bool=False, sheet_name: str="Doors with Hardware") -> bytes:
-    df = rows_to_dataframe(rows, extended=extended)
-    return df_to_excel_bytes(df, sheet_name=sheet_name)
+        return [r.area, r.door, r.code, r.description or "", r.colour or "", r.quantity, r.product]
+    return [r.area, r.door, r.code, r.quantity, r.product]
+
+def rows_to_dataframe(rows: Iterable[ItemRow], extended: bool=False) -> pd.DataFrame:
+    # text columns come back as categoricals over the store's distinct values
+    store = rows if isinstance(rows, RowStore) else RowStore(rows)
+    cols = COLUMNS_EXTENDED if extended else COLUMNS_DEFAULT
+    return store.to_dataframe({c: c.lower() for c in cols})
+
+def export_excel(rows: Iterable[ItemRow], extended: bool=False, sheet_name: str="Doors with Hardware") -> bytes:
+    buf = io.BytesIO()
+    write_excel(rows, buf, extended=extended, sheet_name=sheet_name)
+    return buf.getvalue()
 
 def export_csv(rows: List[ItemRow], extended: bool=False) -> str:
-    df = rows_to_dataframe(rows, extended=extended)
-    return df.to_csv(index=False)
+    return "".join(iter_csv(rows, extended=extended))
 
 def export_jsonl(rows: List[ItemRow]) -> str:
-    import json
-    return "\n".join([ json.dumps(r.__dict__, ensure_ascii=False) for r in rows ])
+    return "\n".join(iter_jsonl(rows))
+
+# Incremental exporters: consume any row iterable (e.g. engine.iter_page_rows
+# output) and emit one chunk per row, so nothing is held beyond the current row.
+def iter_csv(rows: Iterable[ItemRow], extended: bool=False) -> Iterator[str]:
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
 
-# Stub for CIN7 HTML product templates (per-product separated). Extend as needed.
-def export_cin7_html_templates(rows: List[ItemRow]) -> List[str]:
-    templates = []
+    def take() -> str:
+        chunk = buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+        return chunk
+
+    writer.writerow(COLUMNS_EXTENDED if extended else COLUMNS_DEFAULT)
+    yield take()
+    for r in rows:
+        writer.writerow(_row_values(r, extended))
+        yield take()
+
+def iter_jsonl(rows: Iterable[ItemRow]) -> Iterator[str]:
     for r in rows:
-        html = f"""<div class='product-template'>
-  <h3>{r.code} — {r.product}</h3>
+        yield json.dumps(r.to_dict(), ensure_ascii=False)
+
+def write_csv(rows: Iterable[ItemRow], fp: IO[str], extended: bool=False) -> int:
+    """Stream rows to a text file; returns the number of rows written."""
+    n = -1
+    for n, chunk in enumerate(iter_csv(rows, extended=extended)):
+        fp.write(chunk)
+    return n
+
+def write_jsonl(rows: Iterable[ItemRow], fp: IO[str]) -> int:
+    """Stream rows to a text file, one JSON object per line; returns the row count."""
+    n = 0
+    for n, line in enumerate(iter_jsonl(rows), start=1):
+        fp.write(line + "\n")
+    return n
+
+def write_excel(rows: Iterable[ItemRow], fp: IO[bytes], extended: bool=False, sheet_name: str="Doors with Hardware") -> int:
+    """Stream rows to an .xlsx file in one pass (see utils.excel.write_xlsx); returns the row count."""
+    header = COLUMNS_EXTENDED if extended else COLUMNS_DEFAULT
+    return write_xlsx(fp, header, (_row_values(r, extended) for r in rows), sheet_name=sheet_name)
+
+# Parquet: every ItemRow field, text columns dictionary-encoded, so merged
+# schedules load back (read_parquet) without re-parsing the PDFs.
+def write_parquet(rows: Iterable[ItemRow], fp: Union[str, IO[bytes]]) -> int:
+    """Write rows to a Parquet file (path or binary file); returns the row count."""
+    import pyarrow.parquet as pq
+    store = rows if isinstance(rows, RowStore) else RowStore(rows)
+    pq.write_table(store.to_arrow(), fp, compression="zstd")
+    return len(store)
+
+def read_parquet(source: Union[str, IO[bytes]]) -> RowStore:
+    """Load rows written by write_parquet (or any table with the ItemRow columns)."""
+    import pyarrow.parquet as pq
+    return RowStore.from_arrow(pq.read_table(source))
+
+# CIN7 HTML product templates. A product code repeats on hundreds of doors,
+# so by default rows are grouped per (code, product) and each product gets
+# one template listing its areas and doors with the quantities summed.
+# Templates are rendered from hashable groups through an LRU cache, so a
+# product seen before (another export of the same schedule, a revision) is
+# not rendered again, and zip entries are written one at a time.
+CIN7_CACHE_SIZE = 4096
+
+@dataclass(frozen=True)
+class ProductGroup:
+    code: str
+    product: str
+    quantity: int
+    areas: Tuple[str, ...]
+    doors: Tuple[str, ...]
+    description: Optional[str] = None
+    colour: Optional[str] = None
+
+    @classmethod
+    def of_row(cls, r: ItemRow) -> "ProductGroup":
+        return cls(r.code, r.product, r.quantity, (r.area,), (r.door,), r.description, r.colour)
+
+def group_products(rows: Iterable[ItemRow]) -> List[ProductGroup]:
+    """One ProductGroup per (code, product), in order of first appearance."""
+    groups: Dict[Tuple[str, str], list] = {}
+    for r in rows:
+        g = groups.get((r.code, r.product))
+        if g is None:
+            # quantity, areas, doors (ordered sets), description, colour
+            g = groups[(r.code, r.product)] = [0, {}, {}, r.description, r.colour]
+        g[0] += r.quantity
+        g[1][r.area] = None
+        g[2][r.door] = None
+        g[3] = g[3] or r.description
+        g[4] = g[4] or r.colour
+    return [
+        ProductGroup(code, product, qty, tuple(areas), tuple(doors), description, colour)
+        for (code, product), (qty, areas, doors, description, colour) in groups.items()
+    ]
+
+@lru_cache(maxsize=CIN7_CACHE_SIZE)
+def render_cin7_template(group: ProductGroup) -> str:
+    e = html.escape
+    extra = "".join(
+        f"\n    <li>{label}: {e(value)}</li>"
+        for label, value in (("Description", group.description), ("Colour", group.colour)) if value
+    )
+    return f"""<div class='product-template'>
+  <h3>{e(group.code)} — {e(group.product)}</h3>
   <ul>
-    <li>Area: {r.area}</li>
-    <li>Door: {r.door}</li>
-    <li>Qty: {r.quantity}</li>
+    <li>{"Areas" if len(group.areas) > 1 else "Area"}: {e(", ".join(group.areas))}</li>
+    <li>{"Doors" if len(group.doors) > 1 else "Door"}: {e(", ".join(group.doors))}</li>
+    <li>Qty: {group.quantity}</li>{extra}
   </ul>
 </div>"""
-        templates.append(html)
-    return templates
+
+def iter_cin7_templates(rows: Iterable[ItemRow], grouped: bool=True) -> Iterator[Tuple[str, str]]:
+    """(file name, HTML) per template: one per product, or one per row with grouped=False."""
+    groups = group_products(rows) if grouped else map(ProductGroup.of_row, rows)
+    for n, group in enumerate(groups, start=1):
+        yield f"product_{n:03d}.html", render_cin7_template(group)
+
+def export_cin7_html_templates(rows: Iterable[ItemRow], grouped: bool=True) -> List[str]:
+    return [page for _, page in iter_cin7_templates(rows, grouped=grouped)]
+
+def write_cin7_zip(rows: Iterable[ItemRow], fp: IO[bytes], grouped: bool=True) -> int:
+    """Zip the CIN7 templates as product_001.html, ...; returns the template count."""
+    n = 0
+    with zipfile.ZipFile(fp, "w", zipfile.ZIP_DEFLATED) as z:
+        for n, (name, page) in enumerate(iter_cin7_templates(rows, grouped=grouped), start=1):
+            z.writestr(name, page)
+    return n
+
+# ---------------------------------------------------------------------
+# Shared export table
+# ---------------------------------------------------------------------
+# One columnar copy of a result set (a RowStore), built once; each download
+# format is rendered the first time it's asked for and its bytes kept for
+# later requests. Formats that ignore `extended` share one entry. Render
+# times are kept in `timings` (stage "export_<fmt>") and logged.
+
+EXPORT_FORMATS = ("xlsx", "csv", "jsonl", "parquet", "cin7")
+
+class ExportTable:
+    def __init__(self, rows: Iterable[ItemRow]):
+        self.store = rows if isinstance(rows, RowStore) else RowStore(rows)
+        self._rendered: Dict[Tuple[str, bool], bytes] = {}
+        self._frames: Dict[bool, pd.DataFrame] = {}
+        self._lock = threading.Lock()
+        self.timings = StageTimings()
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def rows(self) -> Iterator[ItemRow]:
+        return iter(self.store)
+
+    def to_dataframe(self, extended: bool=False) -> pd.DataFrame:
+        """rows_to_dataframe of the result set, built once per `extended`."""
+        with self._lock:
+            df = self._frames.get(extended)
+            if df is None:
+                df = self._frames[extended] = rows_to_dataframe(self.store, extended=extended)
+            return df
+
+    def render(self, fmt: str, extended: bool=False) -> bytes:
+        """Bytes of one download format ("xlsx", "csv", "jsonl", "parquet" or "cin7" zip), rendered once per key."""
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format {fmt!r}; expected one of {', '.join(EXPORT_FORMATS)}")
+        key = (fmt, extended if fmt in ("xlsx", "csv") else False)
+        # one lock for the table: concurrent clicks on the same download
+        # wait for the first render instead of repeating it
+        with self._lock:
+            data = self._rendered.get(key)
+            if data is None:
+                start = time.perf_counter()
+                with self.timings.stage(f"export_{fmt}"):
+                    data = self._rendered[key] = self._render(fmt, extended)
+                log_timings(
+                    "export", format=fmt, extended=key[1], rows=len(self), bytes=len(data),
+                    seconds=round(time.perf_counter() - start, 3),
+                )
+            return data
+
+    def _render(self, fmt: str, extended: bool) -> bytes:
+        if fmt == "xlsx":
+            buf = io.BytesIO()
+            write_excel(self.rows(), buf, extended=extended)
+            return buf.getvalue()
+        if fmt == "parquet":
+            buf = io.BytesIO()
+            write_parquet(self.store, buf)
+            return buf.getvalue()
+        if fmt == "cin7":
+            buf = io.BytesIO()
+            write_cin7_zip(self.rows(), buf)
+            return buf.getvalue()
+        if fmt == "csv":
+            return "".join(iter_csv(self.rows(), extended=extended)).encode("utf-8")
+        return export_jsonl(self.rows()).encode("utf-8")
@@ -0,0 +1,519 @@
+"""
+Background extraction jobs backed by a local SQLite queue.
+
+Submitting a PDF spools it to disk and returns a job id straight away;
+worker threads (started by the app, or standalone with `python jobs.py`)
+claim queued jobs, run them through engine.iter_page_rows and record
+progress (pages done, OCR pages, rows found) after every page. Parsed rows
+are streamed to a JSONL result file next to the database, so partial_rows()
+can preview a running job's rows while later pages are still parsed. Resubmitting the
+same PDF with the same options returns the existing job instead of
+starting another one, whatever its status: a failed job keeps its upload
+and is only run again through retry().
+
+Workers are threads, or with WorkerPool(processes=True) separate processes
+so several PDFs are extracted in parallel. Jobs are claimed oldest first,
+and a memory budget (HDL_JOB_MEMORY_MB) holds back a job while the
+estimated footprint of the jobs already running would push past it.
+
+Each job's per-stage timings (see utils.profiling) are kept next to its
+result and logged as JSON; a job submitted with profile=True also records
+a cProfile dump.
+"""
+
+from __future__ import annotations
+
+import argparse
+import atexit
+import cProfile
+import io
+import json
+import multiprocessing
+import pstats
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing, contextmanager
+from dataclasses import dataclass, fields
+from itertools import islice
+from pathlib import Path
+from typing import IO, Dict, Iterator, List, Optional, Sequence, Union
+
+from engine import ExtractionInfo, iter_page_rows
+from exporters import write_jsonl
+from models import ItemRow, RowStore
+from utils.cache import DEFAULT_CACHE_DIR, ExtractionCache, sha256_bytes
+from utils.io_helpers import spool
+from utils.ocr import default_ocr_workers
+from utils.profiling import log_timings
+
+DEFAULT_JOBS_DIR = DEFAULT_CACHE_DIR / "jobs"
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+# a running job whose progress hasn't moved for this long is assumed orphaned
+# (its worker died with the server process) and is put back on the queue
+STALE_AFTER = 600.0
+# finished jobs and their files are purged after this many seconds
+MAX_AGE = 7 * 24 * 3600.0
+# rough peak memory of one extraction, for the memory budget: a fixed
+# overhead (pdfplumber, a rendered 300 dpi page), a multiple of the PDF size
+# and one OCR process (tesseract, a rendered page) per OCR worker it may start
+JOB_BASE_MB = 150
+JOB_MEMORY_PER_PDF_BYTE = 4
+JOB_MB_PER_OCR_WORKER = 100
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    pdf_hash TEXT NOT NULL,
+    options TEXT NOT NULL,
+    ocr_workers INTEGER,
+    status TEXT NOT NULL,
+    supplier TEXT NOT NULL DEFAULT '',
+    confidence REAL NOT NULL DEFAULT 0,
+    page_count INTEGER NOT NULL DEFAULT 0,
+    pages_done INTEGER NOT NULL DEFAULT 0,
+    ocr_pages INTEGER NOT NULL DEFAULT 0,
+    rows_found INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created REAL NOT NULL,
+    started REAL,
+    updated REAL,
+    finished REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created);
+CREATE INDEX IF NOT EXISTS jobs_hash ON jobs (pdf_hash, options);
+"""
+
+
+@dataclass
+class Job:
+    id: str
+    name: str
+    pdf_hash: str
+    options: str
+    ocr_workers: Optional[int]
+    status: str
+    supplier: str = ""
+    confidence: float = 0.0
+    page_count: int = 0
+    pages_done: int = 0
+    ocr_pages: int = 0
+    rows_found: int = 0
+    error: Optional[str] = None
+    created: float = 0.0
+    started: Optional[float] = None
+    updated: Optional[float] = None
+    finished: Optional[float] = None
+
+    @property
+    def finished_ok(self) -> bool:
+        return self.status == DONE
+
+    @property
+    def active(self) -> bool:
+        return self.status in (QUEUED, RUNNING)
+
+    @property
+    def progress(self) -> float:
+        if self.status == DONE:
+            return 1.0
+        return self.pages_done / self.page_count if self.page_count else 0.0
+
+    @property
+    def elapsed(self) -> float:
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+
+_COLUMNS = [f.name for f in fields(Job)]
+
+
+class JobQueue:
+    """
+    SQLite-backed job queue rooted at `root` (default HDL_JOBS_DIR, else
+    ~/.cache/hdl-door-extractor/jobs). Safe to share between threads and
+    processes; every call opens its own connection. `memory_budget_mb`
+    (default HDL_JOB_MEMORY_MB, 0 = unlimited) caps the estimated memory of
+    concurrently running jobs; a job on its own always runs.
+    """
+
+    def __init__(
+        self,
+        root: Optional[os.PathLike] = None,
+        cache: Optional[ExtractionCache] = None,
+        memory_budget_mb: Optional[int] = None,
+    ):
+        self.root = Path(root or os.environ.get("HDL_JOBS_DIR") or DEFAULT_JOBS_DIR)
+        self.cache = cache
+        if memory_budget_mb is None:
+            memory_budget_mb = int(os.environ.get("HDL_JOB_MEMORY_MB", 0) or 0)
+        self.memory_budget_mb = memory_budget_mb
+        self.uploads = self.root / "uploads"
+        self.results = self.root / "results"
+        self.uploads.mkdir(parents=True, exist_ok=True)
+        self.results.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.root / "jobs.sqlite3"
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        db = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        try:
+            yield db
+        finally:
+            db.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Connection holding the write lock until the block exits (rolled back on error)."""
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+
+    @staticmethod
+    def _job(row: sqlite3.Row) -> Job:
+        return Job(**{k: row[k] for k in _COLUMNS})
+
+    def _upload_path(self, job_id: str) -> Path:
+        return self.uploads / f"{job_id}.pdf"
+
+    def _result_path(self, job_id: str) -> Path:
+        return self.results / f"{job_id}.jsonl"
+
+    def _timings_path(self, job_id: str) -> Path:
+        return self.results / f"{job_id}.timings.json"
+
+    def _profile_path(self, job_id: str) -> Path:
+        return self.results / f"{job_id}.prof"
+
+    # -----------------------------------------------------------------
+    # Client side
+    # -----------------------------------------------------------------
+    def submit(
+        self,
+        name: str,
+        data: Union[bytes, IO[bytes]],
+        supplier: Optional[str] = None,
+        force_ocr: bool = False,
+        ocr_workers: Optional[int] = None,
+        profile: bool = False,
+        layout: bool = False,
+    ) -> str:
+        """
+        Queue a PDF for extraction and return its job id (an existing one for
+        a repeat submission, even if it failed: see retry). profile=True runs the job under cProfile; it
+        only matches earlier jobs that were profiled too. layout=True parses
+        tables by column (see engine.iter_page_rows). `data` is the PDF bytes
+        or a binary stream (an upload), which is spooled to disk in chunks
+        rather than read into memory.
+        """
+        job_id = uuid.uuid4().hex
+        # spool before queueing so a worker never claims a job without its PDF
+        path = self._upload_path(job_id)
+        tmp = path.with_suffix(".part")
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            tmp.write_bytes(data)
+            pdf_hash = sha256_bytes(bytes(data))
+        else:
+            pdf_hash = spool(data, tmp)
+        os.replace(tmp, path)
+        # only options that change the result (or, for profiling, what is
+        # recorded about it) take part in de-duplication
+        options = {"supplier": supplier, "force_ocr": force_ocr}
+        if profile:
+            options["profile"] = True
+        if layout:
+            options["layout"] = True
+        options = json.dumps(options, sort_keys=True)
+        with self._transaction() as db:
+            row = db.execute(
+                "SELECT id FROM jobs WHERE pdf_hash = ? AND options = ? ORDER BY created DESC LIMIT 1",
+                (pdf_hash, options),
+            ).fetchone()
+            if row is None:
+                db.execute(
+                    "INSERT INTO jobs (id, name, pdf_hash, options, ocr_workers, status, created) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, name, pdf_hash, options, ocr_workers, QUEUED, time.time()),
+                )
+        if row is not None:
+            path.unlink()
+            return row["id"]
+        return job_id
+
+    def retry(self, job_id: str) -> bool:
+        """Put a failed job back on the queue; False if it isn't failed (or its upload is gone)."""
+        if not self._upload_path(job_id).exists():
+            return False
+        with self._connect() as db:
+            cur = db.execute(
+                "UPDATE jobs SET status = ?, error = NULL, pages_done = 0, ocr_pages = 0, rows_found = 0, "
+                "finished = NULL, updated = ? WHERE id = ? AND status = ?",
+                (QUEUED, time.time(), job_id, FAILED),
+            )
+            return cur.rowcount > 0
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._connect() as db:
+            row = db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._job(row) if row is not None else None
+
+    def jobs(self, job_ids: Sequence[str]) -> List[Job]:
+        """Jobs for the given ids, in the same order (unknown ids are dropped)."""
+        if not job_ids:
+            return []
+        with self._connect() as db:
+            rows = db.execute(
+                f"SELECT * FROM jobs WHERE id IN ({','.join('?' * len(job_ids))})", list(job_ids)
+            ).fetchall()
+        by_id: Dict[str, Job] = {r["id"]: self._job(r) for r in rows}
+        return [by_id[i] for i in job_ids if i in by_id]
+
+    def rows(self, job_id: str) -> RowStore:
+        """Parsed rows of a finished job."""
+        with open(self._result_path(job_id), encoding="utf-8") as fp:
+            return RowStore(ItemRow(**json.loads(line)) for line in fp if line.strip())
+
+    def partial_rows(self, job_id: str, limit: int) -> List[ItemRow]:
+        """Up to `limit` rows a job has written so far (all of them once it has finished)."""
+        out: List[ItemRow] = []
+        for path in (self._result_path(job_id).with_suffix(".part"), self._result_path(job_id)):
+            try:
+                with open(path, encoding="utf-8") as fp:
+                    for line in islice(fp, limit):
+                        # the worker may be part-way through writing the last line
+                        if not line.endswith("\n"):
+                            break
+                        out.append(ItemRow(**json.loads(line)))
+            except FileNotFoundError:
+                continue
+            return out
+        return out
+
+    def timings(self, job_id: str) -> Optional[Dict]:
+        """Per-stage timings of a finished job (StageTimings.to_dict()), if recorded."""
+        try:
+            return json.loads(self._timings_path(job_id).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def profile_report(self, job_id: str, limit: int = 30) -> Optional[str]:
+        """Top `limit` functions by cumulative time for a profiled job."""
+        path = self._profile_path(job_id)
+        if not path.exists():
+            return None
+        out = io.StringIO()
+        pstats.Stats(str(path), stream=out).sort_stats("cumulative").print_stats(limit)
+        return out.getvalue()
+
+    # -----------------------------------------------------------------
+    # Worker side
+    # -----------------------------------------------------------------
+    def estimated_mb(self, job_id: str, ocr_workers: Optional[int] = None) -> float:
+        """Rough peak memory of running a job, from the size of its spooled PDF and its OCR pool."""
+        try:
+            size = self._upload_path(job_id).stat().st_size
+        except OSError:
+            size = 0
+        ocr = ocr_workers or default_ocr_workers()
+        return JOB_BASE_MB + size * JOB_MEMORY_PER_PDF_BYTE / (1024 * 1024) + ocr * JOB_MB_PER_OCR_WORKER
+
+    def claim(self) -> Optional[Job]:
+        """
+        Atomically take the oldest queued job and mark it running. Returns
+        None when the queue is empty or the job would exceed the memory budget
+        alongside the jobs already running.
+        """
+        now = time.time()
+        with self._transaction() as db:
+            row = db.execute("SELECT * FROM jobs WHERE status = ? ORDER BY created LIMIT 1", (QUEUED,)).fetchone()
+            if row is not None and self.memory_budget_mb > 0:
+                running = db.execute("SELECT id, ocr_workers FROM jobs WHERE status = ?", (RUNNING,)).fetchall()
+                in_use = sum(self.estimated_mb(r["id"], r["ocr_workers"]) for r in running)
+                if running and in_use + self.estimated_mb(row["id"], row["ocr_workers"]) > self.memory_budget_mb:
+                    row = None
+            if row is not None:
+                db.execute(
+                    "UPDATE jobs SET status = ?, started = ?, updated = ? WHERE id = ?",
+                    (RUNNING, now, now, row["id"]),
+                )
+        if row is None:
+            return None
+        job = self._job(row)
+        job.status, job.started, job.updated = RUNNING, now, now
+        return job
+
+    def _update(self, job_id: str, **values) -> None:
+        values["updated"] = time.time()
+        with self._connect() as db:
+            db.execute(
+                f"UPDATE jobs SET {', '.join(f'{k} = ?' for k in values)} WHERE id = ?",
+                [*values.values(), job_id],
+            )
+
+    def _record(self, job_id: str, info: ExtractionInfo, **values) -> None:
+        self._update(
+            job_id,
+            supplier=info.supplier,
+            confidence=info.confidence,
+            page_count=info.page_count,
+            pages_done=info.pages,
+            ocr_pages=info.ocr_pages,
+            rows_found=info.rows,
+            **values,
+        )
+
+    def run(self, job: Job) -> None:
+        """Extract a claimed job, recording progress after every page."""
+        options = json.loads(job.options)
+        profiler = cProfile.Profile() if options.pop("profile", False) else None
+        info = ExtractionInfo()
+        result = self._result_path(job.id)
+        tmp = result.with_suffix(".part")
+        start = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            # the worker maps the spooled upload rather than reading it in;
+            # closing the pages releases the map before the file is removed
+            pages = iter_page_rows(
+                self._upload_path(job.id), ocr_workers=job.ocr_workers, cache=self.cache, info=info, **options
+            )
+            with closing(pages), open(tmp, "w", encoding="utf-8") as fp:
+                for _, rows in pages:
+                    write_jsonl(rows, fp)
+                    # page by page, so partial_rows() sees whole pages
+                    fp.flush()
+                    self._record(job.id, info)
+            os.replace(tmp, result)
+        except Exception as e:
+            tmp.unlink(missing_ok=True)
+            status, error = FAILED, f"{type(e).__name__}: {e}"
+        else:
+            status, error = DONE, None
+            # a failed job keeps its PDF for retry() until it is purged
+            self._upload_path(job.id).unlink(missing_ok=True)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(str(self._profile_path(job.id)))
+        self._timings_path(job.id).write_text(json.dumps(info.timings.to_dict()), encoding="utf-8")
+        log_timings(
+            "job", info.timings, job=job.id, name=job.name, status=status, supplier=info.supplier,
+            pages=info.pages, rows=info.rows, ocr_pages=info.ocr_pages, reused_pages=info.reused_pages,
+            seconds=round(time.perf_counter() - start, 3), error=error,
+        )
+        self._record(job.id, info, status=status, error=error, finished=time.time())
+
+    def work(self, stop: threading.Event, poll: float = 0.5) -> None:
+        """Process jobs until `stop` is set, sleeping `poll` seconds when the queue is empty."""
+        while not stop.is_set():
+            job = self.claim()
+            if job is None:
+                stop.wait(poll)
+            else:
+                self.run(job)
+
+    def requeue_stale(self, older_than: float = STALE_AFTER) -> int:
+        """Put running jobs whose progress stalled (dead worker) back on the queue."""
+        with self._connect() as db:
+            cur = db.execute(
+                "UPDATE jobs SET status = ?, pages_done = 0, ocr_pages = 0, rows_found = 0 "
+                "WHERE status = ? AND updated < ?",
+                (QUEUED, RUNNING, time.time() - older_than),
+            )
+            return cur.rowcount
+
+    def purge(self, older_than: float = MAX_AGE) -> int:
+        """Delete finished jobs (and their files) older than `older_than` seconds."""
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT id FROM jobs WHERE status IN (?, ?) AND finished < ?",
+                (DONE, FAILED, time.time() - older_than),
+            ).fetchall()
+            for row in rows:
+                for path in (self._result_path, self._timings_path, self._profile_path, self._upload_path):
+                    path(row["id"]).unlink(missing_ok=True)
+                db.execute("DELETE FROM jobs WHERE id = ?", (row["id"],))
+        return len(rows)
+
+
+def _work_in_process(root: str, cache_root: Optional[str], memory_budget_mb: int, stop) -> None:
+    # entry point of a WorkerPool process: a queue of its own on the same directory
+    cache = ExtractionCache(cache_root) if cache_root is not None else None
+    JobQueue(root, cache=cache, memory_budget_mb=memory_budget_mb).work(stop)
+
+
+class WorkerPool:
+    """
+    Workers draining a JobQueue until stop() is called: daemon threads, or
+    with processes=True spawned processes, one PDF each at a time, so
+    extraction runs in parallel across files. Process workers are stopped
+    at interpreter exit, after finishing the job in hand.
+    """
+
+    def __init__(self, queue: JobQueue, workers: int = 1, processes: bool = False):
+        self.queue = queue
+        queue.requeue_stale()
+        queue.purge()
+        count = max(1, workers)
+        if processes:
+            ctx = multiprocessing.get_context("spawn")
+            self._stop = ctx.Event()
+            cache_root = str(queue.cache.root) if queue.cache is not None else None
+            # not daemonic: a job may start its own OCR process pool
+            self.workers = [
+                ctx.Process(
+                    target=_work_in_process,
+                    args=(str(queue.root), cache_root, queue.memory_budget_mb, self._stop),
+                    name=f"hdl-job-worker-{i}",
+                )
+                for i in range(count)
+            ]
+            atexit.register(self.stop)
+        else:
+            self._stop = threading.Event()
+            self.workers = [
+                threading.Thread(target=queue.work, args=(self._stop,), name=f"hdl-job-worker-{i}", daemon=True)
+                for i in range(count)
+            ]
+        for w in self.workers:
+            w.start()
+
+    def alive(self) -> bool:
+        return any(w.is_alive() for w in self.workers)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        for w in self.workers:
+            w.join(timeout)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run extraction job workers outside the Streamlit app.")
+    parser.add_argument("-j", "--workers", type=int, default=1, help="PDFs extracted in parallel (worker processes)")
+    parser.add_argument("--root", type=Path, default=None, help="job directory (default: HDL_JOBS_DIR)")
+    parser.add_argument("--memory-mb", type=int, default=None, help="memory budget for running jobs (default: HDL_JOB_MEMORY_MB)")
+    args = parser.parse_args(argv)
+    queue = JobQueue(args.root, cache=ExtractionCache(), memory_budget_mb=args.memory_mb)
+    pool = WorkerPool(queue, workers=args.workers, processes=args.workers > 1)
+    try:
+        while pool.alive():
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pool.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,16 @@
+from array import array
 from dataclasses import dataclass
-from typing import Optional
+from sys import intern
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 import re
 
-@dataclass
+ROW_FIELDS = ("area", "door", "code", "quantity", "product", "description", "colour", "code_raw")
+# optional text columns: None when absent from a loaded table
+OPTIONAL_FIELDS = ("description", "colour", "code_raw")
+# fields holding text; the rest (quantity) is an int
+STRING_FIELDS = tuple(f for f in ROW_FIELDS if f != "quantity")
+
+@dataclass(slots=True)
 class ItemRow:
     area: str
     door: str
@@ -11,6 +19,193 @@ class ItemRow:
     product: str
     description: Optional[str] = None
     colour: Optional[str] = None
+    # the code as read from the PDF, when catalog matching replaced it
+    code_raw: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in ROW_FIELDS}
+
+
+def intern_row(row: ItemRow) -> ItemRow:
+    """
+    Intern a row's text in place. The same area/door/code/product text
+    repeats on hundreds of rows; parsers intern rows as they create them so
+    those rows share one string object (RowStore interns its dictionary).
+    Rows built from already-interned strings need nothing.
+    """
+    for name in STRING_FIELDS:
+        value = getattr(row, name)
+        if type(value) is str:
+            setattr(row, name, intern(value))
+    return row
+
+
+class RowStore:
+    """
+    Compact, append-only columnar container for parsed rows.
+
+    Each text column is dictionary-encoded: its distinct values are kept
+    once, in first-seen order, and every row stores a 32-bit index into
+    them; quantities live in a 64-bit array. Iterating or indexing yields
+    ItemRow objects, so code written against lists of rows keeps working.
+    to_dataframe builds pandas categoricals straight from the encoded
+    columns without touching the strings; to_arrow does the same with
+    Arrow dictionary arrays.
+    """
+
+    __slots__ = ("_values", "_index", "_codes", "_quantity")
+
+    def __init__(self, rows: Iterable[ItemRow] = ()):
+        self._values: Dict[str, List[Optional[str]]] = {name: [] for name in STRING_FIELDS}
+        self._index: Dict[str, Dict[Optional[str], int]] = {name: {} for name in STRING_FIELDS}
+        self._codes: Dict[str, array] = {name: array("i") for name in STRING_FIELDS}
+        self._quantity = array("q")
+        self.extend(rows)
+
+    def append(self, row: ItemRow) -> None:
+        for name in STRING_FIELDS:
+            value = getattr(row, name)
+            index = self._index[name]
+            code = index.get(value)
+            if code is None:
+                code = index[value] = len(self._values[name])
+                self._values[name].append(intern(value) if type(value) is str else value)
+            self._codes[name].append(code)
+        self._quantity.append(row.quantity)
+
+    def extend(self, rows: Iterable[ItemRow]) -> None:
+        for row in rows:
+            self.append(row)
+
+    def __len__(self) -> int:
+        return len(self._quantity)
+
+    def __getitem__(self, i: int) -> ItemRow:
+        v, c = self._values, self._codes
+        return ItemRow(
+            area=v["area"][c["area"][i]],
+            door=v["door"][c["door"][i]],
+            code=v["code"][c["code"][i]],
+            quantity=self._quantity[i],
+            product=v["product"][c["product"][i]],
+            description=v["description"][c["description"][i]],
+            colour=v["colour"][c["colour"][i]],
+            code_raw=v["code_raw"][c["code_raw"][i]],
+        )
+
+    def __iter__(self) -> Iterator[ItemRow]:
+        v, c = self._values, self._codes
+        columns = [[v[name][k] for k in c[name]] for name in ("area", "door", "code")]
+        quantity = self._quantity
+        rest = [[v[name][k] for k in c[name]] for name in ("product", "description", "colour", "code_raw")]
+        for area, door, code, qty, product, description, colour, code_raw in zip(*columns, quantity, *rest):
+            yield ItemRow(area, door, code, qty, product, description, colour, code_raw)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (RowStore, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def column(self, name: str) -> list:
+        """Decoded values of one column (quantity included), in row order."""
+        if name == "quantity":
+            return self._quantity.tolist()
+        values = self._values[name]
+        return [values[k] for k in self._codes[name]]
+
+    def categories(self, name: str) -> List[Optional[str]]:
+        """Distinct values of a text column, in first-seen order."""
+        return list(self._values[name])
+
+    def __getstate__(self):
+        return self._values, self._codes, self._quantity
+
+    def __setstate__(self, state):
+        self._values, self._codes, self._quantity = state
+        self._index = {name: {v: i for i, v in enumerate(values)} for name, values in self._values.items()}
+
+    @classmethod
+    def from_arrow(cls, table) -> "RowStore":
+        """
+        Inverse of to_arrow. Text columns may be plain or dictionary-encoded
+        strings; a missing description/colour/code_raw column reads as None.
+        """
+        import numpy as np
+        import pyarrow as pa
+        store = cls()
+        for name in STRING_FIELDS:
+            if name not in table.column_names:
+                if name in OPTIONAL_FIELDS:
+                    store._values[name] = [None]
+                    store._index[name] = {None: 0}
+                    store._codes[name] = array("i", bytes(4 * table.num_rows))
+                    continue
+                raise ValueError(f"Row table has no {name!r} column")
+            column = table.column(name)
+            if not pa.types.is_dictionary(column.type):
+                column = column.dictionary_encode()
+            column = column.unify_dictionaries().combine_chunks()
+            values = column.dictionary.to_pylist()
+            indices = column.indices
+            if indices.null_count:
+                indices = indices.fill_null(len(values))
+                values.append(None)
+            store._values[name] = values
+            store._index[name] = {v: i for i, v in enumerate(values)}
+            store._codes[name] = array("i", indices.to_numpy().astype(np.int32).tobytes())
+        quantity = table.column("quantity").to_numpy().astype(np.int64)
+        store._quantity = array("q", quantity.tobytes())
+        return store
+
+    def _encoded(self, name: str):
+        """(codes, values, null_mask) for a text column with None taken out of `values`."""
+        import numpy as np
+        codes = np.frombuffer(self._codes[name], dtype=np.int32).copy()
+        values = self._values[name]
+        none = self._index[name].get(None)
+        if none is None:
+            return codes, values, None
+        mask = codes == none
+        codes[mask] = 0
+        codes[codes > none] -= 1
+        return codes, values[:none] + values[none + 1:], mask
+
+    def to_dataframe(self, columns: Dict[str, str]):
+        """
+        DataFrame with the given {header: field} columns, in that order.
+        Text columns become categoricals over the stored values (None shows
+        as ""); quantity is int64.
+        """
+        import numpy as np
+        import pandas as pd
+        data = {}
+        for header, name in columns.items():
+            if name == "quantity":
+                data[header] = np.frombuffer(self._quantity, dtype=np.int64).copy()
+                continue
+            codes, values, mask = self._encoded(name)
+            if mask is not None:
+                if "" not in self._index[name]:
+                    values = values + [""]
+                codes[mask] = values.index("")
+            data[header] = pd.Categorical.from_codes(codes, categories=pd.Index(values, dtype=object))
+        return pd.DataFrame(data, columns=list(columns))
+
+    def to_arrow(self):
+        """pyarrow Table with one dictionary-encoded column per text field; None becomes null."""
+        import numpy as np
+        import pyarrow as pa
+        arrays = []
+        for name in ROW_FIELDS:
+            if name == "quantity":
+                arrays.append(pa.array(np.frombuffer(self._quantity, dtype=np.int64).copy()))
+                continue
+            codes, values, mask = self._encoded(name)
+            arrays.append(pa.DictionaryArray.from_arrays(
+                pa.array(codes, mask=mask), pa.array(values, type=pa.string())
+            ))
+        return pa.table(arrays, names=list(ROW_FIELDS))
+
 
 DOOR_RE = re.compile(r"""(?xi)
     \b(
@@ -0,0 +1,93 @@
+"""
+Row-level differences between two revisions of a door schedule.
+
+Suppliers re-issue schedules (revision B, C, ...) with a handful of pages
+edited. compare_revisions extracts both PDFs through the shared cache, so
+pages of the new revision whose content fingerprint matches a page already
+seen are neither extracted nor parsed again (see engine.iter_page_rows),
+and then matches rows on (area, door, code): rows only in the new revision
+are added, rows only in the old one removed, and matched rows whose
+quantity, product, description or colour differ are changed.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from engine import ExtractionInfo, process_pdf
+from models import ItemRow
+from utils.cache import ExtractionCache
+from utils.io_helpers import PdfSource
+from utils.ocr import OCR_DPI
+
+KEY_FIELDS = ("area", "door", "code")
+VALUE_FIELDS = ("quantity", "product", "description", "colour")
+
+
+@dataclass
+class RowDiff:
+    added: List[ItemRow] = field(default_factory=list)
+    removed: List[ItemRow] = field(default_factory=list)
+    # (old, new) pairs
+    changed: List[Tuple[ItemRow, ItemRow]] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    def summary(self) -> str:
+        return f"{len(self.added)} added, {len(self.removed)} removed, {len(self.changed)} changed"
+
+
+def row_key(row: ItemRow) -> Tuple[str, ...]:
+    return tuple(getattr(row, name) for name in KEY_FIELDS)
+
+
+def diff_rows(old: Iterable[ItemRow], new: Iterable[ItemRow]) -> RowDiff:
+    """
+    Compare two row sets. Rows sharing a key are paired in order, so a code
+    listed twice on a door in both revisions is matched twice; unmatched
+    extras count as added or removed.
+    """
+    previous: Dict[Tuple[str, ...], List[ItemRow]] = defaultdict(list)
+    for row in old:
+        previous[row_key(row)].append(row)
+    diff = RowDiff()
+    taken: Dict[Tuple[str, ...], int] = defaultdict(int)
+    for row in new:
+        key = row_key(row)
+        candidates = previous.get(key, ())
+        i = taken[key]
+        if i >= len(candidates):
+            diff.added.append(row)
+            continue
+        taken[key] = i + 1
+        before = candidates[i]
+        if any(getattr(before, name) != getattr(row, name) for name in VALUE_FIELDS):
+            diff.changed.append((before, row))
+    for key, rows in previous.items():
+        diff.removed.extend(rows[taken.get(key, 0):])
+    return diff
+
+
+def compare_revisions(
+    old_pdf: PdfSource,
+    new_pdf: PdfSource,
+    supplier: Optional[str] = None,
+    force_ocr: bool = False,
+    ocr_workers: Optional[int] = None,
+    ocr_dpi: int = OCR_DPI,
+    cache: Optional[ExtractionCache] = None,
+    info: Optional[ExtractionInfo] = None,
+) -> Tuple[List[ItemRow], RowDiff]:
+    """
+    Extract the new revision, reusing the old revision's unchanged pages,
+    and diff its rows against the old one. Returns (new rows, diff); `info`
+    receives the new revision's extraction details, including reused_pages.
+    """
+    cache = cache if cache is not None else ExtractionCache()
+    options = dict(supplier=supplier, force_ocr=force_ocr, ocr_workers=ocr_workers, ocr_dpi=ocr_dpi, cache=cache)
+    _, old_rows = process_pdf(old_pdf, **options)
+    _, new_rows = process_pdf(new_pdf, info=info, **options)
+    return new_rows, diff_rows(old_rows, new_rows)
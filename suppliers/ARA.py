@@ -1,54 +1,56 @@
 from __future__ import annotations
-import re
-from typing import List
-import pdfplumber
-from engine import ItemRow
+from typing import Iterator
+from models import ItemRow
+from suppliers.base import ParseState, SupplierBase
+from suppliers.classifier import LineClassifier, any_case
+from suppliers.detect import Signature
 from utils.parsing import normalize_spaces
 
-DOOR_RE = re.compile(r"\b(?:ED|IBF|ID|IDS|IDW|IFD|IS)\d{2,4}(?:[A-Z]|-[A-Z])?\b", re.IGNORECASE)
-AREA_RE = re.compile(r"\b(CLUBHOUSE|RECEPTION|VILLAGE|COMMUNITY CENTRE)\b", re.IGNORECASE)
-CODE_LINE_RE = re.compile(r"^([A-Z0-9/.-]+)\s+(.+?)\s+(\d+)\s*$")
+DOOR_PREFIXES = ["ED", "IBF", "ID", "IDS", "IDW", "IFD", "IS"]
+AREA_WORDS = ["CLUBHOUSE", "RECEPTION", "VILLAGE", "COMMUNITY CENTRE"]
+DESC_PREFIXES = ["ARA", "LW", "MN", "CL", "FT", "TS"]
 
-class ARAParser:
-    """Compatible wrapper so legacy import still works"""
-    @staticmethod
-    def extract_items(pdf_bytes: bytes) -> List[ItemRow]:
-        items: List[ItemRow] = []
-        current_area = ""
-        current_door = ""
+# ARA lines are one of, in priority order: a single-word area heading, a
+# door heading, or "CODE [ARA|LW|MN|CL|FT|TS] description QTY"
+CLASSIFIER = LineClassifier(
+    rf"(?:(?=\S+$).*?\b(?P<area>{'|'.join(map(any_case, AREA_WORDS))})\b"
+    rf"|.*?(?P<door>\b(?:{'|'.join(map(any_case, DOOR_PREFIXES))})\d{{2,4}}(?:[A-Za-z]|-[A-Za-z])?\b)"
+    rf"|(?P<code>[A-Z0-9/.-]+)\s+(?:(?:{'|'.join(map(any_case, DESC_PREFIXES))})\s+)?(?P<product>.+?)\s+(?P<qty>\d+)\s*$)"
+)
 
-        with pdfplumber.open(pdf_bytes) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text() or ""
-                lines = [normalize_spaces(l) for l in text.splitlines() if l.strip()]
+# "ARA" only counts in upper case (ara is a common word and place-name part);
+# code lines with ARA's description prefixes and its door prefix set
+SIGNATURE = Signature(
+    "ara",
+    codes=[r"\bARA\b", rf"^[A-Z0-9/.-]+ +(?:{'|'.join(DESC_PREFIXES)}) "],
+    doors=[rf"\b(?:{'|'.join(DOOR_PREFIXES)})\d{{2,4}}(?:[A-Z]|-[A-Z])?\b"],
+)
 
-                for line in lines:
-                    if AREA_RE.search(line) and len(line.split()) == 1:
-                        current_area = AREA_RE.search(line).group(1).title()
-                        continue
+class ARAParser(SupplierBase):
+    """Compatible wrapper so legacy import still works"""
+    name = "ara"
+    classifier = CLASSIFIER
 
-                    door_match = DOOR_RE.search(line)
-                    if door_match:
-                        current_door = door_match.group(0).upper()
-                        continue
+    def parse_page(self, page: str, state: ParseState) -> Iterator[ItemRow]:
+        lines = [normalize_spaces(l) for l in page.splitlines() if l.strip()]
+        classify = self.classifier.classify
 
-                    code_match = CODE_LINE_RE.match(line)
-                    if code_match and current_door:
-                        code, desc, qty = (
-                            code_match.group(1).strip(),
-                            code_match.group(2).strip(),
-                            code_match.group(3).strip(),
-                        )
-                        desc = re.sub(r"^(ARA|LW|MN|CL|FT|TS)\s+", "", desc, flags=re.IGNORECASE)
-                        items.append(
-                            ItemRow(
-                                area=current_area or "General",
-                                door=current_door,
-                                code=code,
-                                description=desc,
-                                colour=None,
-                                quantity=int(qty) if qty.isdigit() else 1,
-                                product=desc,
-                            )
-                        )
-        return items
+        for line in lines:
+            m = classify(line)
+            if m is None:
+                continue
+            if m["area"]:
+                state.area = m["area"].title()
+            elif m["door"]:
+                state.door = m["door"].upper()
+            elif state.door:
+                desc = m["product"]
+                yield ItemRow(
+                    area=state.area or "General",
+                    door=state.door,
+                    code=m["code"],
+                    description=desc,
+                    colour=None,
+                    quantity=int(m["qty"]),
+                    product=desc,
+                )
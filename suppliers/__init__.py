@@ -1,26 +1,29 @@
 from __future__ import annotations
-from typing import List, Optional, Type
+from typing import Iterable, List, Optional
 from suppliers.base import SupplierBase
-from suppliers.allegion import AllegionParser
-from suppliers.dormakaba import DormakabaParser
-from suppliers.ara import ARAParser
-from suppliers.jk import JKParser
+from suppliers.detect import MIN_CONFIDENCE, Detection, SignatureIndex
+from suppliers.registry import SUPPLIERS, load_parser, load_signatures
 
-PARSERS = [ARAParser, AllegionParser, DormakabaParser, JKParser]
+_signatures: Optional[SignatureIndex] = None
 
-def get_parser(hint: Optional[str], pages: List[str]) -> SupplierBase:
-    if hint:
-        for P in PARSERS:
-            if getattr(P, "name", "").lower() == hint.lower():
-                return P()
-    # naive auto-detect: keyword sniffing
-    joined = "\n".join(pages).lower()
-    if "allegion" in joined:
-        return AllegionParser()
-    if "dormakaba" in joined or "dorma kaba" in joined or "dk" in joined:
-        return DormakabaParser()
-    if "ara" in joined:
-        return ARAParser()
-    if "jk" in joined:
-        return JKParser()
+def signature_index() -> SignatureIndex:
+    """Every supplier's detection signature, loaded (and compiled) on first use."""
+    global _signatures
+    if _signatures is None:
+        _signatures = SignatureIndex(load_signatures())
+    return _signatures
+
+def detect_supplier(pages: Iterable[str], sample: Iterable[str] = ()) -> Detection:
+    """Score the given pages, then the (lazily produced) sample pages, until one supplier leads clearly."""
+    from itertools import chain
+    return signature_index().detect(chain(pages, sample))
+
+def parser_for(detection: Detection) -> SupplierBase:
+    if detection.supplier and detection.confidence >= MIN_CONFIDENCE:
+        return get_parser(detection.supplier, [])
     return SupplierBase()
+
+def get_parser(hint: Optional[str], pages: List[str], sample: Iterable[str] = ()) -> SupplierBase:
+    if hint and hint.strip().lower() in (name.lower() for name in SUPPLIERS):
+        return load_parser(hint)()
+    return parser_for(detect_supplier(pages, sample))
@@ -1,36 +1,42 @@
 from __future__ import annotations
-from typing import List
-from models import ItemRow, DOOR_RE
-import re
+from typing import Iterator
+from models import ItemRow
+from suppliers.base import ParseState, SupplierBase
+from suppliers.classifier import line_classifier
+from suppliers.detect import Signature
 
-class AllegionParser:
+# Allegion lines often "DOOR CODE ... Qty"; code pattern like "L9D11S" or "6649RH/30SSS"
+CLASSIFIER = line_classifier(
+    ["Ground", "Level", "Floor", "Basement"],
+    code=r"[A-Z0-9]{3,}(?:/[A-Z0-9]+)?",
+)
+
+# Allegion group brands in title blocks; lever/lock series like L9xxx and
+# handed trim codes like 6649RH/30SSS
+SIGNATURE = Signature(
+    "allegion",
+    phrases=["Allegion", "Schlage", "Von Duprin", "LCN", "Legge", "Briton"],
+    codes=[r"\bL9[0-9A-Z]{2,5}\b", r"\b\d{4}(?:RH|LH)/\d+[A-Z]*\b"],
+)
+
+class AllegionParser(SupplierBase):
     name = "allegion"
+    classifier = CLASSIFIER
 
-    def parse(self, pages: List[str]) -> List[ItemRow]:
-        rows: List[ItemRow] = []
-        current_area = None
-        for page in pages:
-            for line in page.split("\n"):
-                line = line.strip()
-                if not line:
-                    continue
-                if re.search(r"\b(Ground|Level|Floor|Basement)\b", line, re.I):
-                    current_area = line.title()
-                m = DOOR_RE.search(line)
-                if not m:
-                    continue
-                door = m.group(1)
-                # Allegion lines often "CODE  Qty  Product ..."
-                # Try to capture "CODE" followed by qty near end
-                code = ""
-                qty = 1
-                # code pattern like "L9D11S" or "6649RH/30SSS"
-                cm = re.search(r"([A-Z0-9]{3,}(?:/[A-Z0-9]+)?)", line[m.end():])
-                if cm:
-                    code = cm.group(1)
-                qms = re.findall(r"(\d+)\s*$", line)
-                if qms:
-                    qty = int(qms[-1])
-                product = re.sub(rf".*?{re.escape(code)}", "", line).strip(" -:")
-                rows.append(ItemRow(area=current_area or "Unspecified", door=door, code=code, quantity=qty, product=product))
-        return rows
+    def parse_page(self, page: str, state: ParseState) -> Iterator[ItemRow]:
+        classify = self.classifier.classify
+        for line in page.split("\n"):
+            line = line.strip()
+            if not line:
+                continue
+            m = classify(line)
+            if m["area"]:
+                state.area = line.title()
+            door = m["door"]
+            if not door:
+                continue
+            code = m["code"] or ""
+            qty = int(m["qty"]) if m["qty"] else 1
+            # product is whatever follows the code
+            product = line[m.end("code"):].strip(" -:") if code else ""
+            yield ItemRow(area=state.area or "Unspecified", door=door, code=code, quantity=qty, product=product)
@@ -1,42 +1,62 @@
 from __future__ import annotations
-from typing import List
-from engine import ItemRow, DOOR_RE
-import re
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Union
+from document import PdfDocument, open_document
+from utils.io_helpers import PdfSource
+from models import ItemRow, intern_row
+from suppliers.classifier import QTY_LAST, line_classifier
+
+# area keyword, first door, last integer, ALLCAPS+digits code after the door
+CLASSIFIER = line_classifier(
+    ["Ground", "First", "Second", "Third", "Basement", "Level", "Clubhouse", "Floor"],
+    code=r"[A-Z0-9]{3,}[A-Z0-9/\-]*",
+    qty=QTY_LAST,
+)
+
+
+@dataclass
+class ParseState:
+    """Area/door context carried from one page to the next while parsing."""
+    area: Optional[str] = None
+    door: Optional[str] = None
+
 
 class SupplierBase:
     name = "base"
+    classifier = CLASSIFIER
 
-    def parse(self, pages: List[str]) -> List[ItemRow]:
-        # default generic parser: find rows with door code + qty + product/code tokens
-        rows: List[ItemRow] = []
-        current_area = None
+    @classmethod
+    def extract_items(cls, source: Union[PdfSource, PdfDocument]) -> List[ItemRow]:
+        # registry entry point: text-based parsers work on the document's page texts
+        with open_document(source) as doc:
+            return cls().parse(doc.iter_texts())
+
+    def parse(self, pages: Iterable[str]) -> List[ItemRow]:
+        return list(self.iter_rows(pages))
+
+    def iter_rows(self, pages: Iterable[str]) -> Iterator[ItemRow]:
+        """Yield rows page by page; pages may be a lazy iterator."""
+        state = ParseState()
         for page in pages:
-            for line in page.split("\n"):
-                line = line.strip()
-                if not line:
-                    continue
-                # area detection (weak)
-                if re.search(r"\b(Ground|First|Second|Third|Basement|Level|Clubhouse|Floor)\b", line, re.I):
-                    current_area = line.title()
-                # door
-                m = DOOR_RE.search(line)
-                if not m:
-                    continue
-                door = m.group(1)
-                # quantity (last integer on line if present)
-                q = 1
-                qm = re.findall(r"(\d+)", line)
-                if qm:
-                    try:
-                        q = int(qm[-1])
-                    except:
-                        q = 1
-                # product code token heuristic: first ALLCAPS+digits chunk after door
-                tail = line[m.end():].strip(" -:")
-                code = ""
-                cm = re.search(r"([A-Z0-9]{3,}[A-Z0-9/\-]*)", tail)
-                if cm:
-                    code = cm.group(1)
-                product = tail
-                rows.append(ItemRow(area=current_area or "Unspecified", door=door, code=code, quantity=q, product=product))
-        return rows
+            yield from map(intern_row, self.parse_page(page, state))
+
+    def parse_page(self, page: str, state: ParseState) -> Iterator[ItemRow]:
+        # default generic parser: find rows with door code + qty + product/code tokens
+        classify = self.classifier.classify
+        for line in page.split("\n"):
+            line = line.strip()
+            if not line:
+                continue
+            m = classify(line)
+            # area detection (weak)
+            if m["area"]:
+                state.area = line.title()
+            door = m["door"]
+            if not door:
+                continue
+            # quantity: last integer on line if present
+            q = int(m["qty"]) if m["qty"] else 1
+            # product code token heuristic: first ALLCAPS+digits chunk after door
+            code = m["code"] or ""
+            product = line[m.end("door"):].strip(" -:")
+            yield ItemRow(area=state.area or "Unspecified", door=door, code=code, quantity=q, product=product)
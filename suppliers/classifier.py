@@ -0,0 +1,69 @@
+"""
+Precompiled per-supplier line classifiers.
+
+Each supplier describes its line heuristics once (area keywords, door and
+code patterns, where the quantity sits) and gets back a single fused,
+precompiled pattern. classify() then makes one match call per line and every
+field comes out of named groups:
+
+    area     area keyword (the whole line becomes the area name)
+    door     door number
+    code     product code after the door
+    qty      quantity
+    product  product text (where the supplier's layout defines one)
+
+The stdlib `re` engine is used rather than the `regex` package: on these
+patterns `regex` matched at roughly half the speed (benchmarks/bench_classifier.py).
+"""
+from __future__ import annotations
+from typing import Iterable, Optional
+
+import re
+
+# same shape as models.DOOR_RE, e.g. ED0202, ID11A, IS03-1B. Patterns here
+# spell out both cases ([A-Za-z], any_case()) rather than using (?i:...),
+# which matches noticeably slower.
+DOOR_PATTERN = r"\b[A-Za-z]{1,4}\d{2,4}[A-Za-z]?(?:-\d{1,2})?[A-Za-z]?\b"
+
+# where the quantity is taken from; the greedy .* backtracks from the end
+# of the line, so only the tail of the line is examined
+QTY_TRAILING = r".*(?<!\d)(?P<qty>\d+)\s*$"    # integer the line ends with
+QTY_LAST = r".*(?<!\d)(?P<qty>\d+)"             # last integer anywhere on the line
+
+
+def any_case(word: str) -> str:
+    """Case-insensitive literal as explicit classes: "Level" -> [Ll][Ee][Vv][Ee][Ll]."""
+    return "".join(f"[{c.upper()}{c.lower()}]" if c.isalpha() else re.escape(c) for c in word)
+
+
+class LineClassifier:
+    """A compiled fused pattern; classify() returns its match (or None)."""
+
+    def __init__(self, pattern: str):
+        self.pattern = re.compile(pattern)
+
+    def classify(self, line: str) -> Optional[re.Match]:
+        return self.pattern.match(line)
+
+
+def line_classifier(
+    area_words: Iterable[str],
+    code: str,
+    qty: str = QTY_TRAILING,
+    door: str = DOOR_PATTERN,
+    code_follows_door: bool = False,
+) -> LineClassifier:
+    """
+    Classifier for "door code ... qty" schedules: an area keyword anywhere
+    on the line, the first door number, the first `code` match after it
+    (or, with code_follows_door, only directly after it) and the quantity.
+    Area, quantity and code are zero-width lookaheads, so all groups come
+    from one match anchored at the start of the line.
+    """
+    areas = "|".join(any_case(w) for w in area_words)
+    code_lead = r"[\s\-:]*" if code_follows_door else ".*?"
+    return LineClassifier(
+        rf"(?:(?=.*?\b(?P<area>{areas})\b))?"
+        rf"(?:(?={qty}))?"
+        rf"(?:.*?(?P<door>{door})(?:(?={code_lead}(?P<code>{code})))?)?"
+    )
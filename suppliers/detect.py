@@ -0,0 +1,103 @@
+"""
+Supplier auto-detection against a signature index.
+
+Every supplier module declares a Signature: header phrases (brand names
+that appear in title blocks), code patterns lifted from its parser, and
+door-number patterns. detect_supplier() scores pages one at a time, reading
+the first pages of a document and then a sample of later ones, and stops as
+soon as one supplier is clearly ahead.
+"""
+from __future__ import annotations
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence
+
+PHRASE_POINTS = 5.0      # per header phrase hit
+CODE_POINTS = 1.0        # per supplier-specific code hit
+DOOR_POINTS = 0.25       # per supplier-specific door number
+MAX_HITS_PER_PAGE = 20   # cap per pattern per page, so one long table can't dominate
+
+DECISIVE_SCORE = 10.0    # stop reading once the leader has this many points ...
+DECISIVE_LEAD = 2.0      # ... and this many times the runner-up
+MIN_CONFIDENCE = 0.4     # below this get_parser falls back to the generic parser
+
+
+@dataclass(frozen=True)
+class Signature:
+    name: str
+    phrases: Sequence[str] = ()   # case-insensitive, whole words
+    codes: Sequence[str] = ()     # case-sensitive regexes, matched per line (re.M)
+    doors: Sequence[str] = ()     # case-sensitive regexes for door numbers
+
+
+@dataclass
+class Detection:
+    supplier: Optional[str]
+    confidence: float
+    scores: Dict[str, float] = field(default_factory=dict)
+    pages_read: int = 0
+
+
+class SignatureIndex:
+    """Compiled signatures; score() rates one page of text against all of them."""
+
+    def __init__(self, signatures: Iterable[Signature]):
+        self.entries = []
+        for sig in signatures:
+            compiled = []
+            if sig.phrases:
+                words = "|".join(re.escape(p).replace(r"\ ", r"\s+") for p in sig.phrases)
+                compiled.append((re.compile(rf"\b(?:{words})\b", re.I), PHRASE_POINTS))
+            compiled += [(re.compile(p, re.M), CODE_POINTS) for p in sig.codes]
+            compiled += [(re.compile(p), DOOR_POINTS) for p in sig.doors]
+            self.entries.append((sig.name, compiled))
+
+    def score(self, text: str) -> Dict[str, float]:
+        scores = {}
+        for name, patterns in self.entries:
+            total = 0.0
+            for pattern, points in patterns:
+                hits = 0
+                for _ in pattern.finditer(text):
+                    hits += 1
+                    if hits >= MAX_HITS_PER_PAGE:
+                        break
+                total += hits * points
+            scores[name] = total
+        return scores
+
+    def detect(self, pages: Iterable[str]) -> Detection:
+        totals = {name: 0.0 for name, _ in self.entries}
+        read = 0
+        for text in pages:
+            read += 1
+            for name, points in self.score(text).items():
+                totals[name] += points
+            top, second = _top_two(totals)
+            if top >= DECISIVE_SCORE and top >= DECISIVE_LEAD * second:
+                break
+        return _detection(totals, read)
+
+
+def _top_two(totals: Dict[str, float]) -> List[float]:
+    ranked = sorted(totals.values(), reverse=True) + [0.0, 0.0]
+    return ranked[:2]
+
+
+def _detection(totals: Dict[str, float], read: int) -> Detection:
+    top, second = _top_two(totals)
+    if top <= 0:
+        return Detection(None, 0.0, totals, read)
+    leader = max(totals, key=totals.get)
+    # share of the two-way contest, discounted while the evidence is thin
+    confidence = top / (top + second) * min(1.0, top / DECISIVE_SCORE)
+    return Detection(leader, round(confidence, 3), totals, read)
+
+
+def sample_indices(page_count: int, head: int, samples: int) -> List[int]:
+    """Evenly spaced 0-based page indices after the first `head` pages."""
+    rest = page_count - head
+    if rest <= 0 or samples <= 0:
+        return []
+    step = rest / min(samples, rest)
+    return sorted({head + int(i * step + step / 2) for i in range(min(samples, rest))})
@@ -1,33 +1,41 @@
 from __future__ import annotations
-from typing import List
-from models import ItemRow, DOOR_RE
-import re
+from typing import Iterator
+from models import ItemRow
+from suppliers.base import ParseState, SupplierBase
+from suppliers.classifier import line_classifier
+from suppliers.detect import Signature
 
-class DormakabaParser:
+# DK codes like "MS2604PT", "OC SSS", "TS93 G N AB EN1-5 SIL"
+# Heuristic: quantity is the last integer; code is the first token after the door
+CLASSIFIER = line_classifier(
+    ["Ground", "Level", "Floor", "Basement"],
+    code=r"[^\s\-:]\S*?(?=[ \-:]*$|\s)",
+    code_follows_door=True,
+)
+
+SIGNATURE = Signature(
+    "dormakaba",
+    phrases=["dormakaba", "dorma kaba", "dorma", "kaba"],
+    codes=[r"\bMS\d{4}[A-Z]*\b", r"\bTS ?9\d\b", r"\bOC SSS\b"],
+)
+
+class DormakabaParser(SupplierBase):
     name = "dormakaba"
+    classifier = CLASSIFIER
 
-    def parse(self, pages: List[str]) -> List[ItemRow]:
-        rows: List[ItemRow] = []
-        current_area = None
-        for page in pages:
-            for line in page.split("\n"):
-                line = line.strip()
-                if not line:
-                    continue
-                if re.search(r"\b(Ground|Level|Floor|Basement)\b", line, re.I):
-                    current_area = line.title()
-                m = DOOR_RE.search(line)
-                if not m:
-                    continue
-                door = m.group(1)
-                # DK codes like "MS2604PT", "OC SSS", "TS93 G N AB EN1-5 SIL"
-                # Heuristic: quantity is the last integer; code is the first token group after door
-                qty = 1
-                qms = re.findall(r"(\d+)\s*$", line)
-                if qms:
-                    qty = int(qms[-1])
-                tail = line[m.end():].strip(" -:")
-                code = tail.split()[0] if tail else ""
-                product = tail
-                rows.append(ItemRow(area=current_area or "Unspecified", door=door, code=code, quantity=qty, product=product))
-        return rows
+    def parse_page(self, page: str, state: ParseState) -> Iterator[ItemRow]:
+        classify = self.classifier.classify
+        for line in page.split("\n"):
+            line = line.strip()
+            if not line:
+                continue
+            m = classify(line)
+            if m["area"]:
+                state.area = line.title()
+            door = m["door"]
+            if not door:
+                continue
+            qty = int(m["qty"]) if m["qty"] else 1
+            code = m["code"] or ""
+            product = line[m.end("door"):].strip(" -:")
+            yield ItemRow(area=state.area or "Unspecified", door=door, code=code, quantity=qty, product=product)
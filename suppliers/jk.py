@@ -1,32 +1,38 @@
 from __future__ import annotations
-from typing import List
-from models import ItemRow, DOOR_RE
-import re
+from typing import Iterator
+from models import ItemRow
+from suppliers.base import ParseState, SupplierBase
+from suppliers.classifier import line_classifier
+from suppliers.detect import Signature
 
-class JKParser:
+CLASSIFIER = line_classifier(
+    ["Ground", "First", "Second", "Level", "Floor"],
+    code=r"[A-Z0-9]{3,}(?:/[A-Z0-9]+)?",
+)
+
+SIGNATURE = Signature(
+    "jk",
+    phrases=["JK door hardware", "JK hardware", "JK Doors"],
+    codes=[r"\bJK\d+(?:/[A-Z]+)?\b"],
+)
+
+class JKParser(SupplierBase):
     name = "jk"
+    classifier = CLASSIFIER
 
-    def parse(self, pages: List[str]) -> List[ItemRow]:
-        rows = []
-        current_area = None
-        for page in pages:
-            for line in page.split("\n"):
-                line = line.strip()
-                if not line:
-                    continue
-                if re.search(r"\b(Ground|First|Second|Level|Floor)\b", line, re.I):
-                    current_area = line.title()
-                m = DOOR_RE.search(line)
-                if not m:
-                    continue
-                door = m.group(1)
-                qty = 1
-                qms = re.findall(r"(\d+)\s*$", line)
-                if qms: qty = int(qms[-1])
-                tail = line[m.end():].strip(" -:")
-                code = ""
-                cm = re.search(r"([A-Z0-9]{3,}(?:/[A-Z0-9]+)?)", tail)
-                if cm: code = cm.group(1)
-                product = tail
-                rows.append(ItemRow(area=current_area or "Unspecified", door=door, code=code, quantity=qty, product=product))
-        return rows
+    def parse_page(self, page: str, state: ParseState) -> Iterator[ItemRow]:
+        classify = self.classifier.classify
+        for line in page.split("\n"):
+            line = line.strip()
+            if not line:
+                continue
+            m = classify(line)
+            if m["area"]:
+                state.area = line.title()
+            door = m["door"]
+            if not door:
+                continue
+            qty = int(m["qty"]) if m["qty"] else 1
+            code = m["code"] or ""
+            product = line[m.end("door"):].strip(" -:")
+            yield ItemRow(area=state.area or "Unspecified", door=door, code=code, quantity=qty, product=product)
@@ -1,48 +1,71 @@
 """
 Registry of all supplier parsers used by the HDL Door Schedule Extractor.
-Each supplier parser must expose a .extract_items(pdf_bytes: bytes) -> List[ItemRow] function.
-"""
 
-from suppliers.allegion import AllegionParser
-from suppliers.dormakaba import DormakabaParser
-from suppliers.ARA import ARAParser
-from suppliers.jk import JKParser
+Suppliers are declared by name with the module and class implementing them;
+a parser module is only imported the first time its supplier is used (or
+when auto-detection needs every supplier's signature). Each parser class
+exposes .extract_items(source) -> List[ItemRow] (see SupplierBase), where
+source is the PDF bytes or path, or an already-open document.PdfDocument, and its
+module defines the SIGNATURE used for auto-detection.
+"""
+from __future__ import annotations
+import importlib
+from types import ModuleType
+from typing import TYPE_CHECKING, Callable, Dict, List, Type
 
-# Optional base class if your parsers inherit from SupplierBase
-# (you can safely remove this import if not used)
-from suppliers.base import SupplierBase
+if TYPE_CHECKING:
+    from suppliers.base import SupplierBase
+    from suppliers.detect import Signature
 
 
 # ---------------------------------------------------------------------
-# Supplier registry dictionary
+# Supplier declarations: name -> "module:ParserClass"
+# (declaration order breaks ties in auto-detection)
 # ---------------------------------------------------------------------
-registry = {
-    "Allegion": AllegionParser.extract_items,
-    "Dormakaba": DormakabaParser.extract_items,
-    "ARA": ARAParser.extract_items,
-    "JK": JKParser.extract_items,
+SUPPLIERS: Dict[str, str] = {
+    "ARA": "suppliers.ARA:ARAParser",
+    "Allegion": "suppliers.allegion:AllegionParser",
+    "Dormakaba": "suppliers.dormakaba:DormakabaParser",
+    "JK": "suppliers.jk:JKParser",
 }
 
+_KEYS = {name.lower(): name for name in SUPPLIERS}
+_modules: Dict[str, ModuleType] = {}
+
+
+def _module(name: str) -> ModuleType:
+    key = _KEYS.get(name.strip().lower())
+    if key is None:
+        raise ValueError(f"❌ Unknown supplier: {name}. Available: {', '.join(SUPPLIERS)}")
+    module = _modules.get(key)
+    if module is None:
+        module = _modules[key] = importlib.import_module(SUPPLIERS[key].split(":")[0])
+    return module
+
+
+def load_parser(name: str) -> Type[SupplierBase]:
+    """Parser class for a supplier name (any case), importing its module on first use."""
+    return getattr(_module(name), SUPPLIERS[_KEYS[name.strip().lower()]].split(":")[1])
+
+
+def load_signatures() -> List[Signature]:
+    """Detection signatures of every supplier, in declaration order."""
+    return [_module(name).SIGNATURE for name in SUPPLIERS]
+
 
 # ---------------------------------------------------------------------
 # Helper function to get the correct parser dynamically
 # ---------------------------------------------------------------------
-def get_supplier_parser(name: str):
+def get_supplier_parser(name: str) -> Callable:
     """
     Retrieve the extract_items function for a given supplier name.
     Example:
         parser = get_supplier_parser("ARA")
         items = parser(pdf_bytes)
     """
-    key = name.strip().title()
-    if key not in registry:
-        raise ValueError(f"❌ Unknown supplier: {name}. Available: {', '.join(registry.keys())}")
-    return registry[key]
+    return load_parser(name).extract_items
 
 
-# ---------------------------------------------------------------------
-# Optional: function to list all available suppliers
-# ---------------------------------------------------------------------
 def list_suppliers() -> list[str]:
-    """Return a list of registered supplier names."""
-    return list(registry.keys())
+    """Return a list of registered supplier names (nothing is imported)."""
+    return list(SUPPLIERS)
@@ -0,0 +1,265 @@
+"""
+Layout-aware parsing of tabular schedules from word positions.
+
+The text parsers see a page as flattened lines and recover code, quantity
+and product with regexes, which misreads rows whose codes contain spaces or
+whose product text carries numbers. TableLayout works on the page's word
+boxes instead (PdfDocument.words):
+
+    lines    words grouped by their top edge
+    columns  x-ranges most lines put words in, found by binning the extent
+             of every word across the page with NumPy; gaps narrower than
+             MIN_GUTTER (spaces inside a cell) don't split a column
+    fields   Area/Door/Code/Qty/Product/Description/Colour, from a header
+             row ("Door No", "Qty", ...) or, without one, from what the
+             cells look like (door numbers, integers, upper-case codes)
+
+The column template is kept for the rest of the document, so pages after
+the header page parse with it, as long as the page still fits it (its
+multi-cell lines hold door numbers in the door column). parse_page returns
+None for pages without words (OCR'd), without a recognisable table or not
+fitting the template, so the caller can fall back to its text parser.
+"""
+from __future__ import annotations
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from document import Word
+from models import ItemRow
+from suppliers.base import ParseState
+from suppliers.classifier import DOOR_PATTERN
+
+BIN = 1.0               # column binning resolution, PDF points
+MIN_GUTTER = 6.0        # narrower gaps are word spaces inside a cell
+GUTTER_NOISE = 0.15     # a bin stays a gutter while at most this share of lines covers it
+LINE_TOLERANCE = 3.0    # words whose tops differ by less are on the same line
+MIN_TABLE_LINES = 3     # lines with two or more filled cells needed to infer a table
+MIN_SCORE = 0.6         # share of a column's cells that must look like the field
+MAX_HEADING_WORDS = 4
+
+# header cell text (lower case, punctuation dropped) -> field
+HEADERS = {
+    name: field
+    for field, names in {
+        "area": ["area", "location", "zone"],
+        "door": ["door", "door no", "door number", "door ref", "door id", "mark"],
+        "code": ["code", "product code", "item code", "part no", "part number", "cat no", "catalogue no"],
+        "qty": ["qty", "quantity", "no off", "count"],
+        "product": ["product", "item", "hardware", "product description", "item description"],
+        "description": ["description", "desc"],
+        "colour": ["colour", "color", "finish"],
+    }.items()
+    for name in names
+}
+
+DOOR_RE = re.compile(DOOR_PATTERN)
+CODE_RE = re.compile(r"[A-Z0-9][A-Z0-9/.\-]*(?: [A-Z0-9/.\-]+){0,3}")
+QTY_RE = re.compile(r"\d+")
+_HEADER_STRIP_RE = re.compile(r"[^a-z ]+")
+
+
+@dataclass
+class ColumnTemplate:
+    """Column boundaries of a table and the field read from each column."""
+    bounds: np.ndarray       # x where column i ends and i + 1 starts (len = columns - 1)
+    fields: Dict[str, int]   # field -> column index
+
+    def cell(self, cells: Sequence[str], field: str) -> str:
+        i = self.fields.get(field)
+        return cells[i] if i is not None else ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"bounds": [float(b) for b in self.bounds], "fields": dict(self.fields)}
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "ColumnTemplate":
+        return cls(np.asarray(d["bounds"], dtype=float), dict(d["fields"]))
+
+
+def _header_field(text: str) -> Optional[str]:
+    return HEADERS.get(" ".join(_HEADER_STRIP_RE.sub("", text.lower()).split()))
+
+
+def find_columns(x0: np.ndarray, x1: np.ndarray, lines: int) -> np.ndarray:
+    """
+    (left, right) x-ranges of the columns: runs of bins covered by words on
+    more than GUTTER_NOISE of the lines, joined across gaps under MIN_GUTTER.
+    Words on one line don't overlap, so a bin's count is its number of lines.
+    """
+    start = np.floor(x0 / BIN).astype(np.int64)
+    stop = np.maximum(np.ceil(x1 / BIN).astype(np.int64), start + 1)
+    size = int(stop.max()) + 1
+    coverage = np.cumsum(np.bincount(start, minlength=size) - np.bincount(stop, minlength=size))
+    busy = np.concatenate(([0], (coverage > GUTTER_NOISE * lines).astype(np.int8), [0]))
+    edges = np.flatnonzero(np.diff(busy))
+    lefts, rights = edges[0::2], edges[1::2]
+    if not len(lefts):
+        return np.empty((0, 2))
+    starts = np.flatnonzero(np.concatenate(([True], lefts[1:] - rights[:-1] >= MIN_GUTTER / BIN)))
+    return np.column_stack((lefts[starts], np.maximum.reduceat(rights, starts))) * BIN
+
+
+def page_cells(words: Sequence[Word], bounds: Optional[np.ndarray] = None) -> tuple:
+    """
+    Group words into lines and cells in one pass over the word arrays:
+    returns (cells per line, bounds). Columns are found on the page unless
+    `bounds` (where each column ends) is given.
+    """
+    texts = [w[0] for w in words]
+    x0, x1, top = (np.fromiter((w[k] for w in words), dtype=float, count=len(words)) for k in (1, 2, 3))
+    order = np.argsort(top, kind="stable")
+    line = np.empty(len(words), dtype=np.int64)
+    line[order] = np.concatenate(([0], np.cumsum(np.diff(top[order]) > LINE_TOLERANCE)))
+    if bounds is None:
+        # only lines broken into cells (a gap of MIN_GUTTER or more between
+        # two words) place columns; headings and notes run across the gutters
+        by_x = np.lexsort((x0, line))
+        gap = x0[by_x][1:] - x1[by_x][:-1]
+        split = np.unique(line[by_x][1:][(gap >= MIN_GUTTER) & (np.diff(line[by_x]) == 0)])
+        rows = np.isin(line, split)
+        if not rows.any():
+            return [[" ".join(texts[i] for i in by_x[line[by_x] == n])] for n in range(int(line.max()) + 1)], np.empty(0)
+        columns = find_columns(x0[rows], x1[rows], len(split))
+        bounds = (columns[1:, 0] + columns[:-1, 1]) / 2
+    column = np.searchsorted(bounds, (x0 + x1) / 2)
+    lines: List[List[str]] = []
+    current = -1
+    for i in np.lexsort((x0, column, line)).tolist():
+        if line[i] != current:
+            current = line[i]
+            lines.append([""] * (len(bounds) + 1))
+        cells, c = lines[-1], column[i]
+        cells[c] = f"{cells[c]} {texts[i]}" if cells[c] else texts[i]
+    return lines, bounds
+
+
+def header_fields(cells: Sequence[str]) -> Optional[Dict[str, int]]:
+    """Field per column when the line is a header row naming the door or code column."""
+    fields: Dict[str, int] = {}
+    for i, text in enumerate(cells):
+        field = _header_field(text) if text else None
+        if field and field not in fields:
+            fields[field] = i
+    if len(fields) >= 2 and ("door" in fields or "code" in fields):
+        return fields
+    return None
+
+
+def infer_fields(lines: Sequence[Sequence[str]]) -> Optional[Dict[str, int]]:
+    """Fields from cell contents: door numbers, integer quantities, codes, then the longest text."""
+    rows = [cells for cells in lines if sum(1 for c in cells if c) >= 2]
+    if len(rows) < MIN_TABLE_LINES:
+        return None
+    columns = list(zip(*rows))
+
+    def score(pattern: re.Pattern, i: int) -> float:
+        filled = [c for c in columns[i] if c]
+        return sum(1 for c in filled if pattern.fullmatch(c)) / len(filled) if filled else 0.0
+
+    fields: Dict[str, int] = {}
+    door = max(range(len(columns)), key=lambda i: score(DOOR_RE, i))
+    if score(DOOR_RE, door) < MIN_SCORE:
+        return None
+    fields["door"] = door
+    rest = [i for i in range(len(columns)) if i != door]
+    qty = [i for i in rest if score(QTY_RE, i) >= MIN_SCORE]
+    if qty:
+        fields["qty"] = qty[-1]
+        rest.remove(qty[-1])
+    code = [i for i in rest if score(CODE_RE, i) >= MIN_SCORE]
+    if code:
+        fields["code"] = code[0]
+        rest.remove(code[0])
+    if rest:
+        fields["product"] = max(rest, key=lambda i: sum(len(c) for c in columns[i]))
+    return fields if ("code" in fields or "product" in fields) else None
+
+
+class TableLayout:
+    """Parses the pages of one document by column; keeps the column template between pages."""
+
+    def __init__(self):
+        self.template: Optional[ColumnTemplate] = None
+
+    # the template as JSON, so callers caching parsed pages can key entries
+    # by it and restore it when a page is served from cache
+    def snapshot(self) -> Optional[Dict[str, Any]]:
+        return self.template.to_dict() if self.template is not None else None
+
+    def restore(self, snapshot: Optional[Dict[str, Any]]) -> None:
+        self.template = ColumnTemplate.from_dict(snapshot) if snapshot is not None else None
+
+    def template_key(self) -> str:
+        return json.dumps(self.snapshot(), sort_keys=True)
+
+    def parse_page(self, words: Sequence[Word], state: ParseState) -> Optional[List[ItemRow]]:
+        if not words:
+            return None
+        # a known template skips column finding; a header row on the page
+        # still updates which field each column holds
+        lines, bounds = page_cells(words, self.template.bounds if self.template is not None else None)
+        header = next(((i, f) for i, f in enumerate(map(header_fields, lines)) if f), None)
+        if header is not None:
+            self.template = ColumnTemplate(bounds, header[1])
+            lines = lines[header[0] + 1:]
+        elif self.template is None:
+            fields = infer_fields(lines)
+            if fields is None:
+                return None
+            self.template = ColumnTemplate(bounds, fields)
+        elif not self.fits(lines):
+            return None
+        return list(self.iter_rows(lines, state))
+
+    def fits(self, lines: Sequence[Sequence[str]]) -> bool:
+        """
+        Whether a page without a header row is a table in the template's
+        columns: most of its lines fill two or more cells, and most of
+        those have a door number (or nothing) in the door column. Free text
+        cut at the template's bounds fails both.
+        """
+        filled = [cells for cells in lines if any(cells)]
+        rows = [cells for cells in filled if sum(1 for c in cells if c) >= 2]
+        if not rows or len(rows) < MIN_SCORE * len(filled):
+            return False
+        if "door" not in self.template.fields:
+            return True
+        doors = [d for d in (self.template.cell(cells, "door") for cells in rows) if d]
+        return sum(1 for d in doors if DOOR_RE.fullmatch(d)) >= MIN_SCORE * len(doors)
+
+    def iter_rows(self, lines: Sequence[Sequence[str]], state: ParseState) -> Iterator[ItemRow]:
+        template = self.template
+        for cells in lines:
+            door = template.cell(cells, "door")
+            qty = QTY_RE.fullmatch(template.cell(cells, "qty"))
+            filled = [c for c in cells if c]
+            is_door = bool(door) and DOOR_RE.fullmatch(door) is not None
+            if len(filled) == 1 and not qty and not is_door:
+                # a heading (area) or a note running across the columns
+                text = filled[0]
+                if len(text.split()) <= MAX_HEADING_WORDS and ":" not in text:
+                    state.area = text.title()
+                continue
+            if door and not is_door:
+                # stray text in the door column of a multi-cell line
+                continue
+            if door:
+                state.door = door.upper()
+            code = template.cell(cells, "code")
+            description = template.cell(cells, "description") or None
+            product = template.cell(cells, "product") or description or ""
+            if not state.door or not (code or product):
+                continue
+            yield ItemRow(
+                area=template.cell(cells, "area").title() or state.area or "Unspecified",
+                door=state.door,
+                code=code,
+                description=description,
+                colour=template.cell(cells, "colour") or None,
+                quantity=int(qty.group()) if qty else 1,
+                product=product,
+            )
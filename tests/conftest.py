@@ -0,0 +1,8 @@
+import pytest
+
+from benchmarks.synthetic import make_pdf
+
+
+@pytest.fixture
+def pdf_factory():
+    return make_pdf
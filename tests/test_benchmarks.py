@@ -0,0 +1,27 @@
+import json
+
+import pytest
+
+from benchmarks import bench_pipeline
+from benchmarks.synthetic import SUPPLIERS, schedule_pages
+from suppliers import detect_supplier, get_parser
+
+
+@pytest.mark.parametrize("supplier", SUPPLIERS)
+def test_synthetic_schedules_parse_with_their_profile(supplier):
+    pages = schedule_pages(supplier, 3)
+    assert len(pages) == 3 and schedule_pages(supplier, 3) == pages
+    assert detect_supplier(pages).supplier == supplier
+    rows = get_parser(supplier, []).parse(pages)
+    assert len(rows) > 50 and all(r.door and r.code for r in rows)
+
+
+def test_pipeline_benchmark_writes_and_compares_results(tmp_path, capsys):
+    out = tmp_path / "bench.json"
+    assert bench_pipeline.main(["--pages", "1", "--suppliers", "jk", "--repeat", "1", "--out", str(out)]) == 0
+    results = json.loads(out.read_text())["results"]
+    assert {r["stage"] for r in results} >= {"extract_text_from_pdf", "parse", "export_excel", "write_parquet"}
+    assert all(r["pages"] == 1 and r["rows"] > 0 and r["peak_rss_mb"] > 0 for r in results)
+    faster = [dict(r, seconds=r["seconds"] / 10) for r in results]
+    assert bench_pipeline.compare(results, faster, 1.25)
+    assert not bench_pipeline.compare(results, results, 1.25)
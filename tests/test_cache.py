@@ -0,0 +1,94 @@
+import os
+
+from models import ItemRow
+from utils import cache as cache_module
+from utils.cache import ExtractionCache, sha256_bytes
+
+
+def test_cache_roundtrip_and_counters(tmp_path):
+    cache = ExtractionCache(tmp_path)
+    key = ExtractionCache.key(sha256_bytes(b"%PDF"), "pages", force_ocr=False, ocr_dpi=300, parser="1")
+    assert cache.get(key) is None
+    cache.put(key, ["page one", "page two"])
+    assert cache.get(key) == ["page one", "page two"]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cache_key_depends_on_options():
+    digest = sha256_bytes(b"%PDF")
+    a = ExtractionCache.key(digest, "pages", force_ocr=False, ocr_dpi=300, parser="1")
+    b = ExtractionCache.key(digest, "pages", force_ocr=True, ocr_dpi=300, parser="1")
+    c = ExtractionCache.key(digest, "pages", force_ocr=False, ocr_dpi=300, parser="2")
+    assert len({a, b, c}) == 3
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = ExtractionCache(tmp_path, max_bytes=13_000)
+    keys = [ExtractionCache.key(str(i), "rows") for i in range(4)]
+    for i, k in enumerate(keys):
+        cache.put(k, ["x" * 3000])
+        path = cache._path(k)
+        os.utime(path, (i, i))
+    cache.get(keys[0])  # most recently used now
+    cache.put(ExtractionCache.key("new", "rows"), ["x" * 3000])
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[1]) is None
+    assert cache.stats()["bytes"] <= 13_000
+
+
+def test_cache_keeps_running_totals_and_only_scans_past_the_limit(tmp_path, monkeypatch):
+    cache = ExtractionCache(tmp_path, max_bytes=1_000_000)
+    cache.put(ExtractionCache.key("a", "rows"), ["x" * 100])
+    scans = []
+    entries = cache._entries
+    monkeypatch.setattr(cache, "_entries", lambda: scans.append(1) or entries())
+    for i in range(5):
+        cache.put(ExtractionCache.key(str(i), "rows"), ["x" * 100])
+    cache.put(ExtractionCache.key("a", "rows"), ["y" * 200])  # overwrite: same entry, bigger
+    assert not scans
+    assert cache._totals == (6, sum(p.stat().st_size for p in tmp_path.glob("*/*.json")))
+    assert cache.stats()["entries"] == 6 and scans == [1]
+    cache.max_bytes = 500
+    cache.put(ExtractionCache.key("b", "rows"), ["x" * 100])
+    assert scans == [1, 1] and cache.stats()["bytes"] <= 500
+
+
+def test_caches_sharing_a_directory_stay_within_the_limit(tmp_path, monkeypatch):
+    # each CLI file / job worker opens its own cache on the same directory
+    monkeypatch.setattr(cache_module, "RESCAN_EVERY", 4)
+    caches = [ExtractionCache(tmp_path, max_bytes=5_000) for _ in range(3)]
+    for i in range(30):
+        caches[i % 3].put(ExtractionCache.key(str(i), "rows"), ["x" * 300])
+    size = sum(p.stat().st_size for p in tmp_path.glob("*/*.json"))
+    # at most RESCAN_EVERY unseen entries per other cache
+    assert size <= 5_000 + 2 * 4 * 320
+    assert ExtractionCache(tmp_path).stats()["bytes"] == size
+
+
+def test_process_pdf_serves_rows_from_cache(tmp_path, monkeypatch, pdf_factory):
+    import engine
+    cache = ExtractionCache(tmp_path)
+    data = pdf_factory(["Ground Floor\nED01 L9D11S Lever set 2"])
+    pages, first = engine.process_pdf(data, supplier="allegion", cache=cache)
+    assert first and isinstance(first[0], ItemRow)
+
+    def boom(*args, **kwargs):
+        raise AssertionError("cache miss")
+
+    monkeypatch.setattr(engine, "PdfDocument", boom)
+    monkeypatch.setattr(engine, "get_parser", boom)
+    assert engine.process_pdf(data, supplier="allegion", cache=cache) == (pages, first)
+
+
+def test_cached_document_shares_its_pages_row_dicts(tmp_path, monkeypatch, pdf_factory):
+    import engine
+    cache = ExtractionCache(tmp_path)
+    stored = {}
+    monkeypatch.setattr(cache, "put_many", stored.update)
+    data = pdf_factory(["Ground Floor\nED01 L9D11S Lever set 2", "ED02 6649RH/30SSS Pull handle 1"])
+    engine.process_pdf(data, supplier="allegion", cache=cache)
+    document = next(v for v in stored.values() if isinstance(v, dict) and "supplier" in v)
+    page_rows = [v["rows"] for v in stored.values() if isinstance(v, dict) and "state" in v]
+    # the rows are held once: the document entry lists the page entries' dicts
+    assert len(document["rows"]) == len(page_rows) == 2
+    assert all(any(rows is page for page in page_rows) for rows in document["rows"])
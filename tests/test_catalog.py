@@ -0,0 +1,96 @@
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+import catalog as catalog_module
+from catalog import Catalog, load_catalog
+from models import ItemRow
+
+CODES = ["L9D11S", "MS2604PT", "6649RH/30SSS", "TS93 G N AB", "LW1234", "LW1284"]
+DESCRIPTIONS = ["Lever set satin chrome", "Door closer", "Pull handle 300mm", "Overhead closer", "Hinge", "Hinge SSS"]
+
+
+def test_ocr_errors_match_through_folding_and_fuzzy_scoring():
+    cat = Catalog(CODES, DESCRIPTIONS)
+    found = cat.match_codes(["L9Dl1S", "MS26O4PT", "6649RH/3OSS", "ts93 gnab", "XYZ", ""])
+    assert found["L9Dl1S"].code == "L9D11S" and found["L9Dl1S"].score == 100.0
+    assert found["MS26O4PT"].code == "MS2604PT"
+    assert found["6649RH/3OSS"].code == "6649RH/30SSS" and 85 <= found["6649RH/3OSS"].score < 100
+    assert found["ts93 gnab"].code == "TS93 G N AB" and found["ts93 gnab"].description == "Overhead closer"
+    assert found["XYZ"] is None and found[""] is None
+
+
+def test_cutoff_and_memo(monkeypatch):
+    cat = Catalog(CODES)
+    assert cat.match_codes(["LW12X4"], cutoff=90)["LW12X4"] is None
+    assert cat.match_codes(["LW12X4"], cutoff=80)["LW12X4"].code in ("LW1234", "LW1284")
+    # repeated queries (e.g. from another document) are answered from the memo
+    monkeypatch.setattr(Catalog, "_best", lambda *a, **k: pytest.fail("scored again"))
+    assert cat.match_codes(["LW12X4"], cutoff=80)["LW12X4"] is not None
+
+
+def test_correct_rows_fills_codes_from_products():
+    cat = Catalog(CODES, DESCRIPTIONS)
+    rows = [
+        ItemRow(area="A", door="ED01", code="L9D1lS", quantity=2, product="Lever"),
+        ItemRow(area="A", door="ED01", code="", quantity=1, product="pull handle 300mm"),
+        ItemRow(area="A", door="ED02", code="NOPE99", quantity=1, product="Thing"),
+        # only part of a description: no code is made up for it
+        ItemRow(area="A", door="ED03", code="", quantity=1, product="Lever"),
+    ]
+    fixed, changed, review = cat.correct(rows)
+    assert [r.code for r in fixed] == ["L9D11S", "6649RH/30SSS", "NOPE99", ""] and changed == 2
+    assert [r.code_raw for r in fixed] == ["L9D1lS", "", None, None] and not review
+    assert fixed[0].door == "ED01" and rows[0].code == "L9D1lS"
+
+
+def test_correct_leaves_codes_empty_for_partial_or_ambiguous_products():
+    cat = Catalog(
+        ["A100", "B200", "C300"],
+        ["Lever handle satin chrome", "Lever handle black", "Lever handle satin chrome 2"],
+    )
+    rows = [
+        # a subset of both descriptions' words
+        ItemRow(area="G", door="D1", code="", quantity=1, product="Lever"),
+        # close to two descriptions
+        ItemRow(area="G", door="D2", code="", quantity=1, product="lever handle satin chrome"),
+        ItemRow(area="G", door="D3", code="", quantity=1, product="LEVER HANDLE BLACK"),
+    ]
+    fixed, changed, review = cat.correct(rows)
+    assert [r.code for r in fixed] == ["", "", "B200"] and changed == 1 and not review
+
+
+def test_correct_leaves_valid_looking_codes_for_review():
+    # one letter from a catalog code, but not a look-alike: a different
+    # (valid) handing, not a misread
+    cat = Catalog(CODES)
+    rows = [
+        ItemRow(area="A", door="ED01", code="6649LH/30SSS", quantity=1, product="Pull"),
+        ItemRow(area="A", door="ED02", code="MS26O4PT", quantity=1, product="Closer"),
+        ItemRow(area="A", door="ED03", code="TS93 GNA8", quantity=1, product="Closer"),
+    ]
+    fixed, changed, review = cat.correct(rows)
+    assert [(r.code, r.code_raw) for r in fixed] == [("6649LH/30SSS", None), ("MS2604PT", "MS26O4PT"), ("TS93 G N AB", "TS93 GNA8")]
+    assert changed == 2 and {code: m.code for code, m in review.items()} == {"6649LH/30SSS": "6649RH/30SSS"}
+
+
+def test_memo_is_bounded(monkeypatch):
+    monkeypatch.setattr(catalog_module, "MEMO_SIZE", 3)
+    cat = Catalog(CODES)
+    cat.match_codes(["A1", "B2", "C3", "D4", "E5"])
+    assert [q for _, q, _ in cat._memo] == ["C3", "D4", "E5"]
+
+
+def test_load_catalog_from_csv_and_parquet_is_cached_per_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(catalog_module, "_catalogs", {})
+    csv_path = tmp_path / "catalog.csv"
+    csv_path.write_text("Product Code,Name\n" + "".join(f"{c},{d}\n" for c, d in zip(CODES, DESCRIPTIONS)))
+    parquet_path = tmp_path / "catalog.parquet"
+    pq.write_table(pa.table({"sku": CODES, "description": DESCRIPTIONS}), parquet_path)
+    for path in (csv_path, parquet_path):
+        cat = load_catalog(path)
+        assert len(cat) == len(CODES) and load_catalog(path) is cat
+        assert cat.match_codes(["MS26O4PT"])["MS26O4PT"].description == "Door closer"
+    (tmp_path / "bad.csv").write_text("a,b\n1,2\n")
+    with pytest.raises(ValueError, match="No code column"):
+        load_catalog(tmp_path / "bad.csv")
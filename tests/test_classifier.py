@@ -0,0 +1,64 @@
+import random
+import re
+
+from models import DOOR_RE
+from suppliers.ARA import ARAParser
+from suppliers.allegion import AllegionParser
+from suppliers.base import ParseState, SupplierBase
+from suppliers.dormakaba import DormakabaParser
+
+
+def test_fused_classifier_fields():
+    m = AllegionParser.classifier.classify("Level 1 ID11A 6649RH/30SSS Pull handle 14")
+    assert (m["area"], m["door"], m["code"], m["qty"]) == ("Level", "ID11A", "6649RH/30SSS", "14")
+    m = AllegionParser.classifier.classify("Notes: supply only")
+    assert (m["area"], m["door"], m["qty"]) == (None, None, None)
+
+
+def test_quantity_modes():
+    # base takes the last integer anywhere; suppliers only a trailing one
+    line = "ED01 L9D11S x 23 satin"
+    assert SupplierBase.classifier.classify(line)["qty"] == "23"
+    assert AllegionParser.classifier.classify(line)["qty"] is None
+
+
+def test_dormakaba_code_is_first_token_after_door():
+    rows = list(DormakabaParser().parse_page("Ground Floor\nED01 - TS93 G N AB EN1-5 SIL 2", ParseState()))
+    assert [(r.area, r.door, r.code, r.quantity, r.product) for r in rows] == [
+        ("Ground Floor", "ED01", "TS93", 2, "TS93 G N AB EN1-5 SIL 2")
+    ]
+
+
+def _dormakaba_baseline(lines):
+    # the per-line regex parser the fused classifier replaced
+    area = None
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if re.search(r"\b(Ground|Level|Floor|Basement)\b", line, re.I):
+            area = line.title()
+        m = DOOR_RE.search(line)
+        if not m:
+            continue
+        qms = re.findall(r"(\d+)\s*$", line)
+        tail = line[m.end():].strip(" -:")
+        yield (area or "Unspecified", m.group(1), tail.split()[0] if tail else "", int(qms[-1]) if qms else 1, tail)
+
+
+def test_dormakaba_matches_baseline_parser_including_separators():
+    tokens = ["ED01", "ID11A", "-", ":", " - ", "::", "-X", "x-", "a:b", "MS2604PT", "TS93", "G N AB", "EN1-5", "2", "14", "Level 1", "closer"]
+    rnd = random.Random(6)
+    lines = [" ".join(rnd.choice(tokens) for _ in range(rnd.randint(1, 6))) for _ in range(5000)]
+    lines += ["ED01 -", "ED01 : 2", "ED01 MS2604PT -", "ED01 - MS: closer 1"]
+    rows = DormakabaParser().parse_page("\n".join(lines), ParseState())
+    assert [(r.area, r.door, r.code, r.quantity, r.product) for r in rows] == list(_dormakaba_baseline(lines))
+
+
+def test_ara_line_types_in_priority_order():
+    page = "CLUBHOUSE\nED0202\nL9D11S ARA Lever set 2\nMS2604PT closer body 1"
+    rows = ARAParser().parse([page])
+    assert [(r.area, r.door, r.code, r.product, r.quantity) for r in rows] == [
+        ("Clubhouse", "ED0202", "L9D11S", "Lever set", 2),
+        ("Clubhouse", "ED0202", "MS2604PT", "closer body", 1),
+    ]
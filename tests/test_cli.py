@@ -0,0 +1,89 @@
+import json
+
+import pandas as pd
+
+import cli
+from exporters import read_parquet
+
+ALLEGION = ["Ground Floor\nED01 L9D11S Lever set 2", "ED02 6649RH/30SSS Pull handle 1"]
+JK = ["Level 1\nID11A JK100 Hinge 3"]
+
+
+def _write_pdfs(tmp_path, pdf_factory):
+    src = tmp_path / "in"
+    (src / "nested").mkdir(parents=True)
+    (src / "a.pdf").write_bytes(pdf_factory(ALLEGION))
+    (src / "nested" / "b.pdf").write_bytes(pdf_factory(JK))
+    (src / "broken.pdf").write_bytes(b"not a pdf")
+    (src / "notes.txt").write_text("ignored")
+    return src
+
+
+def test_collect_inputs_expands_dirs_and_globs_once(tmp_path, pdf_factory):
+    src = _write_pdfs(tmp_path, pdf_factory)
+    paths = cli.collect_inputs([str(src), str(src / "*.pdf")])
+    assert [p.name for p in paths] == ["a.pdf", "broken.pdf", "b.pdf"]
+
+
+def test_per_file_outputs_and_summary(tmp_path, pdf_factory, capsys):
+    src = _write_pdfs(tmp_path, pdf_factory)
+    out = tmp_path / "out"
+    code = cli.main([str(src), "-o", str(out), "-f", "csv", "jsonl", "-j", "2", "-s", "allegion", "--no-cache"])
+    assert code == 1  # broken.pdf is reported, not raised
+    assert pd.read_csv(out / "a.csv")["Door"].tolist() == ["ED01", "ED02"]
+    assert len((out / "a.jsonl").read_text().splitlines()) == 2
+    assert not (out / "broken.csv").exists()
+    summary = capsys.readouterr().out
+    assert "FAILED" in summary and "3 files, 1 failed" in summary
+
+
+def test_same_named_files_in_different_directories_get_their_own_outputs(tmp_path, pdf_factory):
+    src = tmp_path / "in"
+    for sub, pages in (("a", ALLEGION), ("b", JK), ("c/a", JK)):
+        (src / sub).mkdir(parents=True)
+        (src / sub / "sched.pdf").write_bytes(pdf_factory(pages))
+    (src / "a-sched.pdf").write_bytes(pdf_factory(JK))
+    paths = cli.collect_inputs([str(src)])
+    assert cli.output_stems(paths) == ["a-sched", "a-sched-2", "b-sched", "c-a-sched"]
+    out = tmp_path / "out"
+    assert cli.main([str(src), "-o", str(out), "-f", "jsonl", "-j", "2", "--no-cache"]) == 0
+    assert sorted(p.name for p in out.iterdir()) == ["a-sched-2.jsonl", "a-sched.jsonl", "b-sched.jsonl", "c-a-sched.jsonl"]
+    assert len((out / "a-sched.jsonl").read_text().splitlines()) == 2
+
+
+def test_merged_outputs_keep_input_order(tmp_path, pdf_factory):
+    src = _write_pdfs(tmp_path, pdf_factory)
+    (src / "broken.pdf").unlink()
+    out = tmp_path / "out"
+    assert cli.main([str(src), "-o", str(out), "-f", "xlsx", "jsonl", "parquet", "--merge", "-j", "2", "--no-cache"]) == 0
+    doors = [json.loads(l)["door"] for l in (out / "merged.jsonl").read_text().splitlines()]
+    assert doors == ["ED01", "ED02", "ID11A"]
+    df = pd.read_excel(out / "merged.xlsx", sheet_name="Doors with Hardware")
+    assert df["Door"].tolist() == doors
+    assert [r.door for r in read_parquet(out / "merged.parquet")] == doors
+
+
+def test_catalog_corrects_misread_codes(tmp_path, pdf_factory):
+    src = tmp_path / "in"
+    src.mkdir()
+    (src / "scan.pdf").write_bytes(pdf_factory(["Ground Floor\nED01 L9DI1S Lever set 2\nED02 6649RH/3OSSS Pull handle 1"]))
+    catalog = tmp_path / "catalog.csv"
+    catalog.write_text("SKU,Description\nL9D11S,Lever set\n6649RH/30SSS,Pull handle\n")
+    out = tmp_path / "out"
+    assert cli.main([str(src), "-o", str(out), "-f", "jsonl", "-s", "allegion", "--no-cache", "--catalog", str(catalog)]) == 0
+    codes = [json.loads(l)["code"] for l in (out / "scan.jsonl").read_text().splitlines()]
+    assert codes == ["L9D11S", "6649RH/30SSS"]
+
+
+def test_named_and_generic_suppliers_use_the_cache(tmp_path, pdf_factory, monkeypatch):
+    path = tmp_path / "a.pdf"
+    path.write_bytes(pdf_factory(ALLEGION))
+    for supplier in ("allegion", "generic"):
+        monkeypatch.setenv("HDL_CACHE_DIR", str(tmp_path / "cache" / supplier))
+        options = cli.BatchOptions(out_dir=tmp_path / supplier, formats=("jsonl",), supplier=supplier)
+        first, second = cli.process_file(path, options), cli.process_file(path, options)
+        assert first.rows == second.rows and first.supplier == second.supplier == supplier
+        assert "cache_hits" not in first.timings["counters"] and first.timings["stages"]["text_layer"]
+        assert second.timings["counters"]["cache_hits"] == 2 and "text_layer" not in second.timings["stages"]
+    no_cache = cli.BatchOptions(out_dir=tmp_path / "none", formats=("jsonl",), supplier="allegion", use_cache=False)
+    assert "cache_hits" not in cli.process_file(path, no_cache).timings["counters"]
@@ -0,0 +1,54 @@
+import engine
+from benchmarks.synthetic import schedule_pages
+from suppliers import detect_supplier, get_parser
+from suppliers.base import SupplierBase
+from suppliers.detect import MIN_CONFIDENCE, sample_indices
+
+
+def test_plain_english_no_longer_triggers_a_supplier():
+    # the old substring sniffing picked Dormakaba for "dk" and ARA for "ara"
+    pages = ["Standard hardware schedule for the park pavilion, dark grey finish"]
+    assert isinstance(get_parser(None, pages), SupplierBase)
+    assert detect_supplier(pages).supplier is None
+
+
+def test_scores_brand_phrases_and_code_families():
+    pages = ["dormakaba door hardware schedule", "ED01 MS2604PT closer 1\nED02 TS93 G N AB 1\nED03 OC SSS 2"]
+    d = detect_supplier(pages)
+    assert d.supplier == "dormakaba" and d.confidence > 0.5
+    assert get_parser(None, pages).name == "dormakaba"
+
+
+def test_stops_reading_once_one_supplier_is_clearly_ahead():
+    read = []
+
+    def pages():
+        for text in ["Allegion schedule\nED01 L9D11S lever 2\nSchlage"] * 10:
+            read.append(text)
+            yield text
+
+    d = detect_supplier(pages())
+    assert d.supplier == "allegion" and d.pages_read == len(read) < 10
+
+
+def test_sample_pages_are_only_read_when_needed():
+    sampled = []
+    sample = (sampled.append(i) or "JK hardware" for i in range(5))
+    detect_supplier(["Allegion Schlage Legge LCN\nL9D11S L9D11S"], sample)
+    assert sampled == []
+    assert sample_indices(200, 3, 4) == [27, 76, 126, 175]
+
+
+def test_iter_page_rows_reports_detected_supplier(pdf_factory):
+    page = "CLUBHOUSE\n" + "\n".join(f"ED02{i:02d}\nL9D11S ARA Lever set 2\nHD400 LW Pull 1" for i in range(3))
+    data = pdf_factory([page, "IDW01\nMS2604PT ARA closer 1"])
+    info = engine.ExtractionInfo()
+    rows = [r for _, page_rows in engine.iter_page_rows(data, info=info) for r in page_rows]
+    assert info.supplier == "ara" and info.confidence > 0.5
+    assert info.pages == 2 and info.rows == len(rows) == 7
+
+
+def test_detects_jk_from_its_header_and_code_family():
+    d = detect_supplier(schedule_pages("jk", 3))
+    assert d.supplier == "jk" and d.confidence >= MIN_CONFIDENCE
+    assert get_parser(None, schedule_pages("jk", 1)).name == "jk"
@@ -0,0 +1,72 @@
+import os
+
+import document
+import engine
+
+
+def test_document_extracts_each_page_once(pdf_factory, monkeypatch):
+    data = pdf_factory(["Ground Floor\nED01 L9D11S Lever set 2", "ED02 MS2604PT Closer 1"])
+    with document.PdfDocument(data) as doc:
+        calls = []
+        original = doc.pdf.pages[0].__class__.extract_text
+        monkeypatch.setattr(doc.pdf.pages[0].__class__, "extract_text", lambda self, **kw: calls.append(1) or original(self, **kw))
+        assert doc.texts() == doc.texts()
+        assert doc.layer_text(0).startswith("Ground Floor")
+        assert len(calls) == 2
+
+
+def test_document_ocrs_only_pages_without_text(pdf_factory, monkeypatch):
+    seen = []
+
+    def fake_ocr(data, page_numbers, workers=1, dpi=300, timings=None, pool=None):
+        seen.append(list(page_numbers))
+        return {n: f"ocr {n}" for n in page_numbers}
+
+    monkeypatch.setattr(document, "ocr_pdf_pages", fake_ocr)
+    data = pdf_factory(["ED01 L9D11S 2", "", "ED03 X 1", ""])
+    assert engine.extract_pages_from_pdf(data, ocr_workers=1) == ["ED01 L9D11S 2", "ocr 2", "ED03 X 1", "ocr 4"]
+    assert seen == [[2, 4]]
+
+
+def test_registry_parser_reads_shared_document(pdf_factory):
+    data = pdf_factory(["Clubhouse", "ED01", "L9D11S ARA Lever set 2"])
+    with document.PdfDocument(data) as doc:
+        rows = engine.parse_with_supplier("ara", doc)
+        assert not doc.pdf.stream.closed
+    assert [(r.area, r.door, r.code, r.quantity) for r in rows] == [("Clubhouse", "ED01", "L9D11S", 2)]
+
+
+def test_document_maps_file_and_spools_bytes_only_for_ocr(pdf_factory, tmp_path, monkeypatch):
+    seen = []
+    monkeypatch.setattr(document, "ocr_pdf_pages", lambda source, pages, **kw: seen.append(source) or {n: "ocr" for n in pages})
+    path = tmp_path / "a.pdf"
+    path.write_bytes(pdf_factory(["ED01 L9D11S 2", ""]))
+    with document.PdfDocument(path) as doc:
+        assert doc.texts() == ["ED01 L9D11S 2", "ocr"]
+    assert seen == [path]
+
+    with document.PdfDocument(path.read_bytes()) as doc:
+        doc.texts()
+        spooled = seen[-1]
+        assert spooled != path and os.path.exists(spooled)
+    assert not os.path.exists(spooled)
+
+
+def test_document_keeps_one_ocr_pool_until_closed(pdf_factory, monkeypatch):
+    pools, seen = [], []
+
+    class FakePool:
+        def __init__(self, max_workers):
+            self.max_workers, self.closed = max_workers, False
+            pools.append(self)
+
+        def shutdown(self, cancel_futures=False):
+            self.closed = True
+
+    monkeypatch.setattr(document, "ProcessPoolExecutor", FakePool)
+    monkeypatch.setattr(document, "ocr_pdf_pages", lambda source, pages, pool=None, **kw: seen.append(pool) or {n: "ocr" for n in pages})
+    with document.PdfDocument(pdf_factory([""] * 10), ocr_workers=2) as doc:
+        assert list(doc.iter_texts()) == ["ocr"] * 10
+        # two windows of 8 pages, one pool
+        assert len(seen) == 2 and seen[0] is seen[1] is pools[0] and not pools[0].closed
+    assert len(pools) == 1 and pools[0].closed and pools[0].max_workers == 2
@@ -0,0 +1,70 @@
+import io
+import zipfile
+
+import pyarrow.parquet as pq
+
+from exporters import (
+    ExportTable, export_cin7_html_templates, export_csv, export_excel, export_jsonl, read_parquet,
+    render_cin7_template, rows_to_dataframe, write_cin7_zip, write_parquet,
+)
+from models import ItemRow
+from suppliers.allegion import AllegionParser
+
+PAGES = ["Ground Floor\nED01 L9D11S Lever set 2", "ED02 6649RH/30SSS Pull handle 1"]
+
+
+def test_export_table_matches_row_exporters():
+    rows = AllegionParser().parse(PAGES)
+    table = ExportTable(iter(rows))
+    assert len(table) == 2 and list(table.rows()) == rows
+    for extended in (False, True):
+        assert table.to_dataframe(extended).equals(rows_to_dataframe(rows, extended=extended))
+        assert table.render("csv", extended) == export_csv(rows, extended=extended).encode()
+        assert len(table.render("xlsx", extended)) == len(export_excel(rows, extended=extended))
+    assert table.render("jsonl") == export_jsonl(rows).encode()
+    names = zipfile.ZipFile(io.BytesIO(table.render("cin7"))).namelist()
+    assert names == ["product_001.html", "product_002.html"]
+
+
+def test_export_table_renders_each_key_once(monkeypatch):
+    table = ExportTable(AllegionParser().parse(PAGES))
+    calls = []
+    render = table._render
+    monkeypatch.setattr(table, "_render", lambda fmt, ext: calls.append((fmt, ext)) or render(fmt, ext))
+    first = table.render("csv", True)
+    assert table.render("csv", True) is first
+    table.render("csv", False)
+    table.render("jsonl", True)
+    table.render("jsonl", False)
+    assert calls == [("csv", True), ("csv", False), ("jsonl", True)]
+
+
+def test_parquet_round_trip_is_dictionary_encoded(tmp_path):
+    rows = AllegionParser().parse(PAGES)
+    rows[1].description = "Pull"
+    path = tmp_path / "rows.parquet"
+    assert write_parquet(iter(rows), str(path)) == 2
+    assert list(read_parquet(str(path))) == rows
+    schema = pq.read_schema(path)
+    assert all(str(schema.field(name).type).startswith("dictionary") for name in ("area", "door", "code"))
+    assert list(read_parquet(io.BytesIO(ExportTable(rows).render("parquet")))) == rows
+
+
+def test_cin7_export_renders_one_template_per_product():
+    rows = [
+        ItemRow("Ground Floor", "ED01", "L9D11S", 2, "Lever set"),
+        ItemRow("Ground Floor", "ED02", "L9D11S", 1, "Lever set", colour="SSS"),
+        ItemRow("Level 1", "ED03", "L9D11S", 2, "Lever set"),
+        ItemRow("Level 1", "ED03", "MS2604PT", 1, "Closer & arm"),
+    ]
+    lever, closer = export_cin7_html_templates(rows)
+    assert "Areas: Ground Floor, Level 1" in lever and "Doors: ED01, ED02, ED03" in lever
+    assert "Qty: 5" in lever and "Colour: SSS" in lever
+    assert "Closer &amp; arm" in closer and "Door: ED03" in closer
+    assert len(export_cin7_html_templates(rows, grouped=False)) == 4
+
+    render_cin7_template.cache_clear()
+    for _ in range(2):
+        assert write_cin7_zip(rows * 50, io.BytesIO()) == 2
+    info = render_cin7_template.cache_info()
+    assert (info.misses, info.hits) == (2, 2)
@@ -1,3 +1,42 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# libraries only the code paths that need them may import
+HEAVY = ("pandas", "numpy", "pyarrow", "pdfplumber", "pdfminer", "pytesseract", "pdf2image", "PIL", "openpyxl")
+# generous wall-clock budget for importing the entry points in a fresh interpreter
+IMPORT_BUDGET = 1.5
+
+
 def test_imports():
     import engine, exporters
     from suppliers import registry
+
+
+def test_cold_start_defers_heavy_imports_and_parser_modules():
+    code = (
+        "import sys, time; t = time.perf_counter(); import cli, engine, exporters, jobs, revisions; "
+        "print(time.perf_counter() - t); print(' '.join(sorted(sys.modules)))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    seconds, modules = out.splitlines()
+    loaded = set(modules.split())
+    assert not [m for m in HEAVY if m in loaded]
+    assert not loaded & {"suppliers.ARA", "suppliers.allegion", "suppliers.dormakaba", "suppliers.jk", "suppliers.table"}
+    assert float(seconds) < IMPORT_BUDGET
+
+
+def test_registry_loads_parsers_by_name_on_first_use():
+    from suppliers import get_parser
+    from suppliers.registry import get_supplier_parser, list_suppliers, load_parser
+
+    assert list_suppliers() == ["ARA", "Allegion", "Dormakaba", "JK"]
+    assert load_parser("ara").name == "ara" and load_parser(" JK ").name == "jk"
+    assert get_supplier_parser("Allegion") == load_parser("allegion").extract_items
+    assert get_parser("dormakaba", []).name == "dormakaba"
+    with pytest.raises(ValueError, match="Unknown supplier"):
+        load_parser("acme")
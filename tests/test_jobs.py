@@ -0,0 +1,163 @@
+import io
+import time
+
+from utils.cache import ExtractionCache
+from jobs import DONE, FAILED, JOB_MB_PER_OCR_WORKER, QUEUED, RUNNING, JobQueue, WorkerPool
+
+PAGES = ["Ground Floor\nED01 L9D11S Lever set 2", "ED02 6649RH/30SSS Pull handle 1"]
+
+
+def test_submit_returns_job_id_and_deduplicates(tmp_path, pdf_factory):
+    queue = JobQueue(tmp_path)
+    data = pdf_factory(PAGES)
+    job_id = queue.submit("a.pdf", data, supplier="allegion")
+    assert queue.get(job_id).status == QUEUED
+    # same file and options (OCR worker count doesn't matter) -> same job
+    assert queue.submit("a.pdf", data, supplier="allegion", ocr_workers=4) == job_id
+    assert queue.submit("a.pdf", data, supplier="jk") != job_id
+    assert len(list(queue.uploads.iterdir())) == 2
+
+
+def test_submit_spools_streams_like_bytes(tmp_path, pdf_factory):
+    queue = JobQueue(tmp_path)
+    data = pdf_factory(PAGES)
+    stream = io.BytesIO(data)
+    stream.read()  # an upload that was already read once
+    job_id = queue.submit("a.pdf", stream)
+    assert queue.submit("a.pdf", data) == job_id
+    assert queue._upload_path(job_id).read_bytes() == data
+
+
+def test_worker_runs_job_and_records_progress(tmp_path, pdf_factory):
+    queue = JobQueue(tmp_path)
+    job_id = queue.submit("a.pdf", pdf_factory(PAGES), supplier="allegion")
+    job = queue.claim()
+    assert (job.id, job.status) == (job_id, RUNNING)
+    assert queue.claim() is None
+    queue.run(job)
+    job = queue.get(job_id)
+    assert job.status == DONE and job.finished_ok
+    assert (job.supplier, job.page_count, job.pages_done, job.ocr_pages, job.rows_found) == ("allegion", 2, 2, 0, 2)
+    assert [r.door for r in queue.rows(job_id)] == ["ED01", "ED02"]
+    assert not list(queue.uploads.iterdir())
+
+
+def test_failed_job_is_not_resubmitted_but_can_be_retried(tmp_path):
+    queue = JobQueue(tmp_path)
+    job_id = queue.submit("broken.pdf", b"not a pdf")
+    queue.run(queue.claim())
+    job = queue.get(job_id)
+    assert job.status == FAILED and job.error
+    # a rerun resubmitting the same upload must not queue it again
+    assert queue.submit("broken.pdf", b"not a pdf") == job_id
+    assert queue.get(job_id).status == FAILED and queue.claim() is None
+    assert queue.retry(job_id)
+    job = queue.get(job_id)
+    assert (job.status, job.error) == (QUEUED, None)
+    assert not queue.retry(job_id)
+    queue.run(queue.claim())
+    assert queue.get(job_id).status == FAILED
+
+
+def test_worker_pool_drains_queue_in_background(tmp_path, pdf_factory):
+    queue = JobQueue(tmp_path)
+    ids = [queue.submit(f"{i}.pdf", pdf_factory(PAGES + [f"ID0{i} L9D11S Lever {i}"])) for i in range(3)]
+    pool = WorkerPool(queue, workers=2)
+    try:
+        deadline = time.time() + 30
+        while any(j.active for j in queue.jobs(ids)) and time.time() < deadline:
+            time.sleep(0.05)
+    finally:
+        pool.stop()
+    assert [j.status for j in queue.jobs(ids)] == [DONE] * 3
+    assert [j.rows_found for j in queue.jobs(ids)] == [3, 3, 3]
+
+
+def test_stale_running_jobs_are_requeued_and_old_jobs_purged(tmp_path, pdf_factory):
+    queue = JobQueue(tmp_path)
+    job_id = queue.submit("a.pdf", pdf_factory(PAGES))
+    queue.claim()
+    assert queue.requeue_stale(older_than=3600) == 0
+    assert queue.requeue_stale(older_than=-1) == 1
+    assert queue.get(job_id).status == QUEUED
+    queue.run(queue.claim())
+    assert queue.purge(older_than=-1) == 1
+    assert queue.get(job_id) is None and not list(queue.results.iterdir())
+
+
+def test_jobs_keep_timings_and_optional_profile(tmp_path, pdf_factory):
+    queue = JobQueue(tmp_path)
+    data = pdf_factory(PAGES)
+    plain = queue.submit("a.pdf", data, supplier="allegion")
+    profiled = queue.submit("a.pdf", data, supplier="allegion", profile=True)
+    assert profiled != plain
+    queue.run(queue.claim())
+    queue.run(queue.claim())
+    for job_id in (plain, profiled):
+        timings = queue.timings(job_id)
+        assert timings["stages"]["parse"]["calls"] == 2 and timings["counters"]["lines"] == 3
+    assert queue.profile_report(plain) is None
+    assert "cumulative" in queue.profile_report(profiled)
+    assert queue.purge(older_than=-1) == 2 and not list(queue.results.iterdir())
+
+
+def test_process_pool_extracts_files_in_parallel_and_reports_failures(tmp_path, pdf_factory):
+    queue = JobQueue(tmp_path)
+    ids = [queue.submit(f"{i}.pdf", pdf_factory(PAGES + [f"ID0{i} L9D11S Lever {i}"])) for i in range(3)]
+    ids.insert(1, queue.submit("broken.pdf", b"not a pdf"))
+    pool = WorkerPool(queue, workers=2, processes=True)
+    try:
+        deadline = time.time() + 60
+        while any(j.active for j in queue.jobs(ids)) and time.time() < deadline:
+            time.sleep(0.05)
+    finally:
+        pool.stop()
+    assert not pool.alive()
+    assert [j.status for j in queue.jobs(ids)] == [DONE, FAILED, DONE, DONE]
+    assert [r.door for job_id in ids[2:] for r in queue.rows(job_id)][-1] == "ID02"
+
+
+def test_jobs_count_their_own_cache_hits(tmp_path, pdf_factory):
+    queue = JobQueue(tmp_path / "jobs", cache=ExtractionCache(tmp_path / "cache"))
+    data = pdf_factory(PAGES)
+    first = queue.submit("a.pdf", data, supplier="allegion")
+    queue.run(queue.claim())
+    second = queue.submit("a.pdf", data, supplier="jk")
+    queue.run(queue.claim())
+    counters = [queue.timings(job_id)["counters"] for job_id in (first, second)]
+    assert counters[0]["cache_misses"] > 0 and "cache_hits" not in counters[0]
+    # same PDF, other supplier: the page text comes from the cache
+    assert counters[1]["cache_hits"] > 0
+
+
+def test_memory_budget_holds_back_jobs_while_others_run(tmp_path, pdf_factory):
+    queue = JobQueue(tmp_path, memory_budget_mb=950)
+    first = queue.submit("a.pdf", pdf_factory(PAGES), ocr_workers=2)
+    second = queue.submit("b.pdf", pdf_factory(PAGES[:1]), ocr_workers=2)
+    third = queue.submit("c.pdf", pdf_factory(PAGES[1:]), ocr_workers=4)
+    assert queue.estimated_mb(first, 4) - queue.estimated_mb(first, 2) == 2 * JOB_MB_PER_OCR_WORKER
+    job = queue.claim()
+    assert job.id == first and queue.estimated_mb(first, 2) > 350
+    # OCR pools count too: a second job with 2 OCR workers still fits, a third with 4 doesn't
+    assert queue.claim().id == second
+    assert queue.claim() is None
+    queue.run(job)
+    assert queue.claim().id == third
+
+
+def test_partial_rows_preview_a_running_job(tmp_path, pdf_factory):
+    queue = JobQueue(tmp_path)
+    job_id = queue.submit("a.pdf", pdf_factory(PAGES), supplier="allegion")
+    seen = []
+    record = queue._record
+
+    def record_and_peek(job_id, info, **values):
+        # called after every page, as the app's progress poll would
+        seen.append([r.door for r in queue.partial_rows(job_id, 10)])
+        record(job_id, info, **values)
+
+    queue._record = record_and_peek
+    queue.run(queue.claim())
+    assert seen[:2] == [["ED01"], ["ED01", "ED02"]]
+    assert [r.door for r in queue.partial_rows(job_id, 1)] == ["ED01"]
+    assert queue.partial_rows("missing", 10) == []
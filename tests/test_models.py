@@ -0,0 +1,47 @@
+import pickle
+import sys
+
+from models import ItemRow, RowStore, intern_row
+from suppliers.allegion import AllegionParser
+
+ROWS = [
+    ItemRow("Ground Floor", "ED01", "L9D11S", 2, "Lever set", description="Lever", colour=None),
+    ItemRow("Ground Floor", "ED02", "L9D11S", 1, "Lever set", description="", colour="SSS"),
+    ItemRow("Level 1", "ID11A", "MS2604PT", 4, "Closer"),
+]
+
+
+def test_parsed_and_stored_rows_share_interned_text():
+    a = ItemRow("".join(["Ground", " Floor"]), "ED01", "X1", 1, "P")
+    b = ItemRow("".join(["Ground ", "Floor"]), "ED02", "X1", 1, "P")
+    # the constructor stays cheap: only parsers and RowStore intern
+    assert a.area is not b.area and not hasattr(a, "__dict__")
+    assert intern_row(a).area is intern_row(b).area
+    c = ItemRow("".join(["Level", " 1"]), "ED03", "X1", 1, "P")
+    assert list(RowStore([c]))[0].area is sys.intern("Level 1")
+    rows = AllegionParser().parse(["Ground Floor\nED01 L9D11S Lever 2", "ED02 L9D11S Lever 1"])
+    assert rows[0].code is rows[1].code
+
+
+def test_row_store_round_trips_and_dictionary_encodes():
+    store = RowStore(ROWS)
+    assert len(store) == 3 and list(store) == ROWS and store[2] == ROWS[2] and store == ROWS
+    assert store.categories("area") == ["Ground Floor", "Level 1"]
+    assert store.column("quantity") == [2, 1, 4]
+    restored = pickle.loads(pickle.dumps(store))
+    assert restored == store
+    restored.append(ROWS[0])
+    assert restored.categories("code") == ["L9D11S", "MS2604PT"]
+
+
+def test_row_store_dataframe_and_arrow():
+    store = RowStore(ROWS)
+    df = store.to_dataframe({"Area": "area", "Description": "description", "Colour": "colour", "Quantity": "quantity"})
+    assert list(df.columns) == ["Area", "Description", "Colour", "Quantity"]
+    assert df["Description"].tolist() == ["Lever", "", ""]
+    assert df["Colour"].tolist() == ["", "SSS", ""]
+    assert df["Quantity"].tolist() == [2, 1, 4]
+    table = store.to_arrow()
+    assert table.column("description").to_pylist() == ["Lever", "", None]
+    assert table.column("colour").to_pylist() == [None, "SSS", None]
+    assert table.column("door").to_pylist() == ["ED01", "ED02", "ID11A"]
@@ -0,0 +1,77 @@
+import pytest
+from PIL import Image, ImageDraw
+
+import utils.ocr as ocr
+import utils.ocr_engines as engines
+from utils.ocr_engines import OcrEngine, OcrOptions, close_engines, get_engine, resolve_backend
+from utils.preprocess import binarize, estimate_skew, otsu_threshold, preprocess
+
+
+def _page(angle=0.0):
+    # grey paper, margins, and a few dark "text rows"
+    img = Image.new("L", (1200, 1600), 210)
+    draw = ImageDraw.Draw(img)
+    for n in range(12):
+        top = 300 + n * 60
+        draw.rectangle((250, top, 950, top + 18), fill=30)
+    return img.rotate(angle, fillcolor=210).convert("RGB")
+
+
+def test_preprocess_binarizes_deskews_and_crops():
+    out = preprocess(_page(2.0))
+    hist = out.histogram()
+    assert out.mode == "L" and sum(hist[1:255]) == 0 and hist[0] and hist[255]
+    assert out.width < 900 and out.height < 1000
+    assert abs(estimate_skew(binarize(_page(2.0).convert("L"))) + 2.0) <= 0.5
+    assert 30 <= otsu_threshold(_page().convert("L")) < 210
+
+
+def test_blank_pages_are_not_recognized():
+    assert preprocess(Image.new("RGB", (400, 400), "white")) is None
+
+
+class FakeEngine(OcrEngine):
+    name = "fake"
+    created = 0
+
+    def __init__(self, lang):
+        super().__init__(lang)
+        FakeEngine.created += 1
+        self.calls = []
+
+    def recognize(self, img, psm=None):
+        self.calls.append((img.size, psm))
+        return f"{self.lang} {img.mode}"
+
+    def close(self):
+        self.closed = True
+
+
+def test_engine_is_created_once_per_process_and_gets_psm(monkeypatch):
+    monkeypatch.setitem(engines.BACKENDS, "fake", FakeEngine)
+    monkeypatch.setattr(engines, "_engines", {})
+    options = OcrOptions(backend="fake", psm=6)
+    assert ocr.ocr_page_to_text(_page(), options) == "eng L"
+    assert ocr.ocr_page_to_text(Image.new("RGB", (50, 50), "white"), options) == ""
+    assert ocr.ocr_page_to_text(_page(), OcrOptions(backend="fake", preprocess=False)) == "eng RGB"
+    engine = get_engine(options)
+    assert FakeEngine.created == 1 and [psm for _, psm in engine.calls] == [6, None]
+    assert engine.calls[0][0] < (900, 1000)
+    close_engines()
+    assert engine.closed and not engines._engines
+    with pytest.raises(TypeError):
+        OcrEngine("eng")
+
+
+def test_options_from_env_and_backend_resolution(monkeypatch):
+    monkeypatch.setenv("HDL_OCR_PSM", "4")
+    monkeypatch.setenv("HDL_OCR_PREPROCESS", "0")
+    options = OcrOptions.from_env()
+    assert (options.backend, options.psm, options.preprocess) == ("auto", 4, False)
+    assert options.cache_tag() == "eng/psm4/raw"
+    assert resolve_backend("auto") in ("tesserocr", "pytesseract")
+    assert resolve_backend("pytesseract") == "pytesseract"
+    # the tesserocr import is only tried once per process
+    hits = resolve_backend.cache_info().hits
+    resolve_backend("auto")
+    assert resolve_backend.cache_info().hits == hits + 1
@@ -0,0 +1,54 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+import utils.ocr as ocr
+
+
+def _fake_rasterize(calls):
+    def rasterize(data, first_page, last_page, output_folder, dpi=300):
+        calls.append((first_page, last_page))
+        paths = []
+        for n in range(first_page, last_page + 1):
+            path = os.path.join(output_folder, f"page-{n:04d}.png")
+            Image.new("L", (n, dpi // 100)).save(path)
+            paths.append(path)
+        return paths
+    return rasterize
+
+
+def _fake_ocr(img, options=None):
+    return f"page {img.width} @ {img.height}"
+
+
+def test_ocr_pdf_pages_serial_batches_contiguous_pages(monkeypatch):
+    calls = []
+    monkeypatch.setattr(ocr, "rasterize_to_files", _fake_rasterize(calls))
+    monkeypatch.setattr(ocr, "ocr_page_to_text", _fake_ocr)
+    out = ocr.ocr_pdf_pages(b"doc", [2, 3, 4, 9], workers=1, max_pending=8, dpi=200)
+    assert out == {n: f"page {n} @ 2" for n in (2, 3, 4, 9)}
+    assert calls == [(2, 4), (9, 9)]
+
+
+def test_ocr_pdf_pages_pool_returns_every_page(monkeypatch):
+    monkeypatch.setattr(ocr, "rasterize_to_files", _fake_rasterize([]))
+    monkeypatch.setattr(ocr, "ocr_page_to_text", _fake_ocr)
+    pages = list(range(1, 25))
+    out = ocr.ocr_pdf_pages(b"doc", pages, workers=3, max_pending=4)
+    assert [out[n] for n in pages] == [f"page {n} @ 3" for n in pages]
+
+
+def test_ocr_pdf_pages_leaves_a_given_pool_running(monkeypatch):
+    monkeypatch.setattr(ocr, "rasterize_to_files", _fake_rasterize([]))
+    monkeypatch.setattr(ocr, "ocr_page_to_text", _fake_ocr)
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        for pages in ([1, 2, 3], [7, 8]):
+            out = ocr.ocr_pdf_pages(b"doc", pages, workers=2, pool=pool)
+            assert out == {n: f"page {n} @ 3" for n in pages}
+        assert pool.submit(abs, -1).result() == 1
+
+
+def test_default_ocr_workers_env(monkeypatch):
+    monkeypatch.setenv("HDL_OCR_WORKERS", "3")
+    assert ocr.default_ocr_workers() == 3
@@ -0,0 +1,54 @@
+import json
+import logging
+
+import engine
+from utils.profiling import StageTimings, format_timings, log_timings
+
+PAGES = ["Allegion schedule\nGround Floor\nED01 L9D11S Lever set 2", "ED02 6649RH/30SSS Pull handle 1"]
+
+
+def test_stage_timings_accumulate_and_merge():
+    t = StageTimings()
+    with t.stage("parse"):
+        sum(range(10000))
+    t.add("tesseract", 1.5, 0.25)
+    t.add("tesseract", 0.5)
+    t.count("lines", 3)
+    d = t.to_dict()
+    assert list(d["stages"]) == ["tesseract", "parse"]
+    assert d["stages"]["tesseract"] == {"wall": 2.0, "cpu": 0.25, "calls": 2}
+    assert d["stages"]["parse"]["calls"] == 1 and d["counters"] == {"lines": 3}
+    total = StageTimings()
+    total.merge(d)
+    total.merge(d)
+    assert total.to_dict()["stages"]["tesseract"]["calls"] == 4
+    assert format_timings(d)[0] == "tesseract: 2.00s wall, 0.25s CPU, 2 calls"
+    assert format_timings(d)[-1] == "lines: 3"
+
+
+def test_iter_page_rows_records_each_stage(pdf_factory):
+    info = engine.ExtractionInfo()
+    rows = [r for _, page in engine.iter_page_rows(pdf_factory(PAGES), info=info) for r in page]
+    d = info.timings.to_dict()
+    assert len(rows) == 2
+    assert list(d["stages"]) == ["open", "text_layer", "detect", "parse"]
+    assert d["stages"]["text_layer"]["calls"] == 2 and d["stages"]["parse"]["calls"] == 2
+    assert d["counters"] == {"lines": 4}
+
+
+def test_timings_log_is_json_lines(tmp_path, monkeypatch):
+    path = tmp_path / "timings.log"
+    monkeypatch.setenv("HDL_TIMINGS_LOG", str(path))
+    t = StageTimings()
+    t.add("parse", 0.5)
+    try:
+        log_timings("job", t, job="abc", rows=2)
+        log_timings("export", format="csv")
+    finally:
+        logger = logging.getLogger("hdl.timings")
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+            handler.close()
+    first, second = [json.loads(line) for line in path.read_text().splitlines()]
+    assert first["event"] == "job" and first["rows"] == 2 and first["stages"]["parse"]["wall"] == 0.5
+    assert second == {"event": "export", "time": second["time"], "format": "csv"}
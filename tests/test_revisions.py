@@ -0,0 +1,44 @@
+from document import PdfDocument
+from engine import ExtractionInfo
+from models import ItemRow
+from revisions import compare_revisions, diff_rows
+from utils.cache import ExtractionCache
+
+REV_A = ["Ground Floor\nED01 L9D11S Lever set 2", "ED02 6649RH/30SSS Pull handle 1", "Level 1\nID11A MS2604PT Closer 4"]
+REV_B = [REV_A[0], "ED02 6649RH/30SSS Pull handle 3\nED03 L9D11S Lever set 1", REV_A[2]]
+
+
+def test_fingerprints_match_unchanged_pages(pdf_factory):
+    with PdfDocument(pdf_factory(REV_A)) as a, PdfDocument(pdf_factory(REV_B)) as b:
+        fa, fb = a.fingerprints(), b.fingerprints()
+    assert fa[0] == fb[0] and fa[2] == fb[2]
+    assert fa[1] != fb[1] and len(set(fa)) == 3
+
+
+def test_new_revision_only_extracts_changed_pages(tmp_path, pdf_factory, monkeypatch):
+    cache = ExtractionCache(tmp_path)
+    extracted = []
+    layer_text = PdfDocument.layer_text
+
+    def counting(self, i):
+        if self._layer[i] is None:
+            extracted.append(i)
+        return layer_text(self, i)
+
+    monkeypatch.setattr(PdfDocument, "layer_text", counting)
+    info = ExtractionInfo()
+    rows, diff = compare_revisions(pdf_factory(REV_A), pdf_factory(REV_B), supplier="allegion", cache=cache, info=info)
+    assert extracted == [0, 1, 2, 1]
+    assert info.reused_pages == 2
+    assert [r.door for r in rows] == ["ED01", "ED02", "ED03", "ID11A"]
+    assert [r.door for r in diff.added] == ["ED03"] and not diff.removed
+    assert [(old.quantity, new.quantity) for old, new in diff.changed] == [(1, 3)]
+
+
+def test_diff_rows_pairs_duplicate_keys_in_order():
+    old = [ItemRow("G", "D1", "H1", 3, "Hinge"), ItemRow("G", "D1", "H1", 1, "Hinge"), ItemRow("G", "D2", "C1", 1, "Closer")]
+    new = [ItemRow("G", "D1", "H1", 3, "Hinge"), ItemRow("G", "D3", "C1", 1, "Closer")]
+    diff = diff_rows(old, new)
+    assert [r.door for r in diff.added] == ["D3"]
+    assert [(r.door, r.quantity) for r in diff.removed] == [("D1", 1), ("D2", 1)]
+    assert not diff.changed and diff.summary() == "1 added, 2 removed, 0 changed"
@@ -0,0 +1,63 @@
+import io
+from itertools import islice
+
+import pandas as pd
+
+import engine
+from exporters import export_csv, iter_csv, rows_to_dataframe, write_jsonl
+from suppliers.allegion import AllegionParser
+
+PAGES = ["Ground Floor\nED01 L9D11S Lever set 2", "ED02 6649RH/30SSS Pull handle 1", "Level 1\nID11A MS2604PT Closer 4"]
+
+
+def test_iter_rows_carries_area_across_pages_lazily():
+    consumed = []
+
+    def pages():
+        for p in PAGES:
+            consumed.append(p)
+            yield p
+
+    rows = AllegionParser().iter_rows(pages())
+    first_two = list(islice(rows, 2))
+    assert len(consumed) == 2
+    assert [r.area for r in first_two] == ["Ground Floor", "Ground Floor"]
+    third = next(rows)
+    assert third.area == "Level 1"
+    assert AllegionParser().parse(PAGES) == first_two + [third]
+
+
+def test_iter_page_rows_yields_one_batch_per_page(pdf_factory):
+    data = pdf_factory(PAGES)
+    batches = list(engine.iter_page_rows(data, supplier="allegion"))
+    assert [len(rows) for _, rows in batches] == [1, 1, 1]
+    assert batches[2][1][0].area == "Level 1"
+    assert [r for _, rows in batches for r in rows] == AllegionParser().parse(PAGES)
+
+
+def test_incremental_exporters_match_dataframe_output():
+    rows = AllegionParser().parse(PAGES)
+    for extended in (False, True):
+        expected = rows_to_dataframe(rows, extended=extended).to_csv(index=False)
+        assert export_csv(rows, extended=extended) == expected
+        assert "".join(iter_csv(iter(rows), extended=extended)) == expected
+    buf = io.StringIO()
+    assert write_jsonl(iter(rows), buf) == 3
+    assert pd.read_json(io.StringIO(buf.getvalue()), lines=True)["door"].tolist() == ["ED01", "ED02", "ID11A"]
+
+
+def test_streaming_excel_matches_dataframe_export():
+    import openpyxl
+    from exporters import export_excel
+    from utils.excel import df_to_excel_bytes
+
+    rows = AllegionParser().parse(PAGES)
+    for extended in (False, True):
+        new = openpyxl.load_workbook(io.BytesIO(export_excel(iter(rows), extended=extended)))
+        old = openpyxl.load_workbook(io.BytesIO(df_to_excel_bytes(rows_to_dataframe(rows, extended=extended))))
+        assert new.sheetnames == ["Doors with Hardware"]
+        ws, ref = new.active, old.active
+        assert ws.freeze_panes == "A2"
+        assert list(ws.values) == list(ref.values)
+        for letter, dim in ref.column_dimensions.items():
+            assert ws.column_dimensions[letter].width == dim.width
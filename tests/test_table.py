@@ -0,0 +1,116 @@
+import numpy as np
+
+from benchmarks.synthetic import make_table_pdf
+from document import PdfDocument
+from engine import ExtractionInfo, extract_items_from_pdf, process_pdf
+from suppliers.base import ParseState
+from suppliers.table import TableLayout, find_columns, page_cells
+from utils.cache import ExtractionCache
+
+TITLE = "Allegion hardware schedule - Schlage / LCN"
+HEADER = ["Door No", "Product Code", "Description", "Qty"]
+PAGE_1 = [
+    TITLE, HEADER, "Ground Floor",
+    ["ED101", "TS93 G N AB", "Door closer 2 speed", "1"],
+    ["", "L9D11S", "Lever set satin chrome", "2"],
+    ["ED102", "6649RH/30SSS", "Pull handle 300mm", "2"],
+    "Notes: supply and fix to all doors, fixings by others",
+]
+PAGE_2 = ["Level 2", ["ID201", "HD400/SC", "Hinge 100x75 SSS", "3"], ["ID202", "OC SSS", "Cylinder 5 pin", "1"]]
+EXPECTED = [
+    ("Ground Floor", "ED101", "TS93 G N AB", 1, "Door closer 2 speed"),
+    ("Ground Floor", "ED101", "L9D11S", 2, "Lever set satin chrome"),
+    ("Ground Floor", "ED102", "6649RH/30SSS", 2, "Pull handle 300mm"),
+    ("Level 2", "ID201", "HD400/SC", 3, "Hinge 100x75 SSS"),
+    ("Level 2", "ID202", "OC SSS", 1, "Cylinder 5 pin"),
+]
+
+
+def parse(pdf, layout=None):
+    layout = layout or TableLayout()
+    state = ParseState()
+    with PdfDocument(pdf, words=True) as doc:
+        return [layout.parse_page(doc.words(i), state) for i in range(len(doc))]
+
+
+def fields(rows):
+    return [(r.area, r.door, r.code, r.quantity, r.product) for r in rows]
+
+
+def test_find_columns_bins_word_extents_and_ignores_word_spaces():
+    # three lines of two cells; "Lever set" has a 3pt word space inside its cell
+    x0 = np.array([40, 110, 130, 40, 110, 40, 110], dtype=float)
+    x1 = np.array([70, 127, 150, 70, 160, 68, 150], dtype=float)
+    assert find_columns(x0, x1, 3).tolist() == [[40, 70], [110, 160]]
+
+
+def test_header_row_maps_columns_and_template_carries_to_later_pages():
+    layout = TableLayout()
+    pages = parse(make_table_pdf([PAGE_1, PAGE_2]), layout)
+    assert fields(pages[0] + pages[1]) == EXPECTED
+    assert layout.template.fields == {"door": 0, "code": 1, "description": 2, "qty": 3}
+    assert pages[0][0].description == "Door closer 2 speed"
+
+
+def test_columns_are_inferred_from_cell_contents_without_a_header():
+    pages = parse(make_table_pdf([[TITLE, *PAGE_1[2:], *PAGE_2]]))
+    assert fields(pages[0]) == EXPECTED
+
+
+def test_pages_without_a_table_are_left_to_the_text_parser(pdf_factory):
+    assert parse(pdf_factory(["Ground Floor\nED01 L9D11S Lever set 2"])) == [None]
+    assert TableLayout().parse_page([], ParseState()) is None
+
+
+def test_layout_mode_fixes_rows_the_text_parser_misreads(tmp_path):
+    pdf = make_table_pdf([PAGE_1, PAGE_2])
+    text_rows = extract_items_from_pdf(pdf, supplier="allegion")
+    assert [r.code for r in text_rows][0] != "TS93 G N AB"
+
+    info = ExtractionInfo()
+    cache = ExtractionCache(tmp_path)
+    rows = process_pdf(pdf, supplier="allegion", cache=cache, info=info, layout=True)[1]
+    assert fields(rows) == EXPECTED
+    assert info.timings.to_dict()["counters"]["table_pages"] == 2
+    # cached separately from the text-parsed rows of the same document
+    assert fields(process_pdf(pdf, supplier="allegion", cache=cache, layout=True)[1]) == EXPECTED
+    assert fields(process_pdf(pdf, supplier="allegion", cache=cache)[1]) == fields(text_rows)
+
+
+def test_pages_not_fitting_the_template_fall_back_to_the_text_parser():
+    free_text = ["ED301 L9D11S Lever set satin chrome 2", "ED302 MS2604PT Door closer 1"]
+    layout = TableLayout()
+    pages = parse(make_table_pdf([PAGE_1, free_text]), layout)
+    assert fields(pages[0]) == EXPECTED[:3] and pages[1] is None
+    assert layout.template is not None
+
+    pdf = make_table_pdf([PAGE_1, free_text])
+    rows = extract_items_from_pdf(pdf, supplier="allegion", layout=True)
+    text_rows = extract_items_from_pdf(make_table_pdf([free_text]), supplier="allegion")
+    assert [(r.door, r.code, r.product) for r in rows[3:]] == [(r.door, r.code, r.product) for r in text_rows]
+    assert [(r.door, r.code) for r in rows[3:]] == [("ED301", "L9D11S"), ("ED302", "MS2604PT")]
+
+
+def test_stray_text_in_the_door_column_is_not_an_area():
+    page = [HEADER, "Ground Floor", ["ED101", "L9D11S", "Lever set", "2"], ["See note", "MS2604PT", "Closer", "1"]]
+    rows = parse(make_table_pdf([page]))[0]
+    assert [(r.area, r.door, r.code) for r in rows] == [("Ground Floor", "ED101", "L9D11S")]
+
+
+def test_page_cells_reuses_template_bounds():
+    words = [("ED101", 40, 68, 10, 20), ("L9D11S", 112, 140, 10, 20), ("Lever", 232, 255, 10, 20), ("2", 500, 505, 10, 20)]
+    lines, bounds = page_cells(words, np.array([94.0, 205.5, 416.0]))
+    assert lines == [["ED101", "L9D11S", "Lever", "2"]] and bounds.tolist() == [94.0, 205.5, 416.0]
+
+
+def test_template_carries_over_pages_reused_from_an_earlier_revision(tmp_path):
+    revised = [PAGE_2[0], ["ID201", "HD400/SC", "Hinge 100x75 SSS", "4"], PAGE_2[2]]
+    rev_b = make_table_pdf([PAGE_1, revised])
+    cold = process_pdf(rev_b, supplier="allegion", layout=True)[1]
+
+    cache = ExtractionCache(tmp_path)
+    process_pdf(make_table_pdf([PAGE_1, PAGE_2]), supplier="allegion", cache=cache, layout=True)
+    info = ExtractionInfo()
+    rows = process_pdf(rev_b, supplier="allegion", cache=cache, info=info, layout=True)[1]
+    assert info.reused_pages == 1 and info.timings.to_dict()["counters"]["table_pages"] == 1
+    assert fields(rows) == fields(cold) and fields(rows)[3] == ("Level 2", "ID201", "HD400/SC", 4, "Hinge 100x75 SSS")
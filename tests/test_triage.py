@@ -0,0 +1,39 @@
+from utils import triage
+
+A4 = (595.0, 842.0)
+TEXT = "GROUND FLOOR\nED01 L9D11S Lever set satin chrome 2\nED02 MS2604PT Closer 1"
+
+
+def test_clean_vector_page_skips_ocr():
+    t = triage.triage_page(TEXT, *A4)
+    assert t.decision == triage.SKIP and t.garbage_ratio == 0
+
+
+def test_empty_or_garbage_layer_gets_full_page_ocr():
+    assert triage.triage_page("", *A4).decision == triage.OCR_PAGE
+    garbled = "(cid:12)(cid:40)(cid:7) (cid:3)(cid:9) ED01"
+    t = triage.triage_page(garbled, *A4)
+    assert t.garbage_ratio > 0.8 and t.decision == triage.OCR_PAGE and t.dpi == 300
+
+
+def test_page_covering_scan_with_thin_header_is_ocrd():
+    t = triage.triage_page("Job 1234 Rev B page header", *A4, images=[(0, 0, 595, 842)])
+    assert t.decision == triage.OCR_PAGE
+
+
+def test_stamp_on_vector_drawing_ocrs_only_the_stamp():
+    stamp = (400.0, 700.0, 560.0, 800.0)
+    chars = [(50.0, 60.0)] * 40
+    t = triage.triage_page(TEXT, *A4, images=[stamp, (10, 10, 20, 20)], chars=chars)
+    assert t.decision == triage.OCR_REGIONS and t.regions == [stamp]
+
+
+def test_large_sheets_are_rendered_at_lower_dpi():
+    a0 = (2384.0, 3370.0)
+    assert triage.select_dpi(*A4, 300) == 300
+    assert triage.MIN_OCR_DPI <= triage.select_dpi(*a0, 300) < 300
+    assert triage.triage_page("", *a0).dpi < 300
+    # regions are cropped from a full-page render, so they get the page DPI too
+    stamp = (2000.0, 3000.0, 2300.0, 3300.0)
+    t = triage.triage_page(TEXT * 20, *a0, images=[stamp], chars=[(50.0, 60.0)] * 40)
+    assert t.decision == triage.OCR_REGIONS and t.dpi == triage.select_dpi(*a0, 300) < 300
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "hdl-door-extractor"
+DEFAULT_MAX_MB = 512
+# writes between rescans of the directory (which see other processes' entries)
+RESCAN_EVERY = 64
+
+
+def sha256_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def sha256_source(source: Union[bytes, str, os.PathLike]) -> str:
+    """SHA-256 of PDF bytes, or of a file read in chunks."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return sha256_bytes(source)
+    h = hashlib.sha256()
+    with open(source, "rb") as fp:
+        for chunk in iter(lambda: fp.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ExtractionCache:
+    """
+    Content-addressed on-disk cache for extracted page text and parsed rows.
+
+    Entries are JSON files named by a key derived from the PDF's SHA-256 plus
+    the options that affect the result. Reads bump the file's mtime, and
+    writes evict the least recently used entries once the directory grows
+    past max_bytes.
+
+    The entry count and size are scanned when the cache is opened and then
+    kept as running totals updated by this instance's writes. Other
+    processes may share the directory (CLI and job workers each open it),
+    so the totals are rescanned every RESCAN_EVERY writes, when they pass
+    max_bytes, and for stats(); the cache can overshoot its limit by at
+    most RESCAN_EVERY entries per process.
+    """
+
+    def __init__(self, root: Optional[os.PathLike] = None, max_bytes: Optional[int] = None):
+        self.root = Path(root or os.environ.get("HDL_CACHE_DIR") or DEFAULT_CACHE_DIR)
+        if max_bytes is None:
+            max_bytes = int(os.environ.get("HDL_CACHE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.root.mkdir(parents=True, exist_ok=True)
+        # running (entries, bytes) and the writes made since they were scanned
+        self._writes = 0
+        self._totals = self._scan()
+
+    @staticmethod
+    def key(pdf_hash: str, kind: str, **options: Any) -> str:
+        parts = [kind, pdf_hash] + [f"{k}={options[k]}" for k in sorted(options)]
+        return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                value = json.load(fh)
+            os.utime(path)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        self._write(key, value)
+        self.evict()
+
+    def put_many(self, items: Dict[str, Any]) -> None:
+        """Store several entries, checking the size limit once at the end."""
+        for key, value in items.items():
+            self._write(key, value)
+        if items:
+            self.evict()
+
+    def _write(self, key: str, value: Any) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(value, fh, ensure_ascii=False)
+        size = tmp.stat().st_size
+        try:
+            replaced = path.stat().st_size
+        except OSError:
+            replaced = None
+        os.replace(tmp, path)
+        with self._lock:
+            entries, total = self._totals
+            self._totals = (entries + (replaced is None), total + size - (replaced or 0))
+            self._writes += 1
+
+    def _entries(self) -> List[Tuple[Path, os.stat_result]]:
+        entries = []
+        for path in self.root.glob("*/*.json"):
+            try:
+                entries.append((path, path.stat()))
+            except OSError:
+                continue
+        return entries
+
+    def _scan(self) -> Tuple[int, int]:
+        entries = self._entries()
+        totals = (len(entries), sum(st.st_size for _, st in entries))
+        with self._lock:
+            self._totals, self._writes = totals, 0
+        return totals
+
+    def evict(self) -> None:
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        totals = self._scan() if self._writes >= RESCAN_EVERY else self._totals
+        if totals[1] <= self.max_bytes:
+            return
+        entries = self._entries()
+        count, total = len(entries), sum(st.st_size for _, st in entries)
+        if total > self.max_bytes:
+            for path, st in sorted(entries, key=lambda e: e[1].st_mtime):
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+                count -= 1
+                total -= st.st_size
+                if total <= self.max_bytes:
+                    break
+        with self._lock:
+            self._totals, self._writes = (count, total), 0
+
+    def clear(self) -> None:
+        for path, _ in self._entries():
+            path.unlink(missing_ok=True)
+        with self._lock:
+            self._totals = (0, 0)
+
+    def stats(self) -> Dict[str, int]:
+        entries, total = self._scan()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "bytes": total,
+        }
@@ -1,7 +1,19 @@
 import io
-import pandas as pd
+import re
+import shutil
+import tempfile
+import zipfile
+from typing import IO, TYPE_CHECKING, Any, Iterable, List, Sequence
+from xml.sax.saxutils import escape, quoteattr
 
-def df_to_excel_bytes(df: pd.DataFrame, sheet_name: str = "Doors with Hardware") -> bytes:
+if TYPE_CHECKING:
+    import pandas as pd
+
+MIN_WIDTH = 12
+MAX_WIDTH = 50
+
+def df_to_excel_bytes(df: "pd.DataFrame", sheet_name: str = "Doors with Hardware") -> bytes:
+    import pandas as pd
     output = io.BytesIO()
     with pd.ExcelWriter(output, engine="openpyxl") as writer:
         df.to_excel(writer, index=False, sheet_name=sheet_name)
@@ -11,5 +23,133 @@ def df_to_excel_bytes(df: pd.DataFrame, sheet_name: str = "Doors with Hardware")
         # Auto width (approx)
         for col_cells in ws.columns:
             length = max(len(str(cell.value or "")) for cell in col_cells)
-            ws.column_dimensions[col_cells[0].column_letter].width = min(max(12, length + 2), 50)
+            ws.column_dimensions[col_cells[0].column_letter].width = min(max(MIN_WIDTH, length + 2), MAX_WIDTH)
     return output.getvalue()
+
+# ---------------------------------------------------------------------
+# Streaming writer
+# ---------------------------------------------------------------------
+# openpyxl's write-only mode emits <cols> before the first row, so widths
+# can't be measured while writing. write_xlsx instead spools the sheet's
+# <sheetData> to a temporary file, tracking widths as rows go by, then
+# assembles the package with the header, widths and frozen pane in front.
+# Memory use is constant in the number of rows.
+
+_ILLEGAL_XML = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+_CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>
+<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>
+<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>
+</Types>"""
+
+_ROOT_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>
+</Relationships>"""
+
+_WORKBOOK = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">
+<sheets><sheet name={name} sheetId="1" r:id="rId1"/></sheets>
+</workbook>"""
+
+_WORKBOOK_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>
+<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>
+</Relationships>"""
+
+# style 1 = pandas' header style: bold, thin border, centred
+_STYLES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font><font><b/><sz val="11"/><name val="Calibri"/></font></fonts>
+<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>
+<borders count="2"><border><left/><right/><top/><bottom/><diagonal/></border><border><left style="thin"/><right style="thin"/><top style="thin"/><bottom style="thin"/><diagonal/></border></borders>
+<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>
+<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/><xf numFmtId="0" fontId="1" fillId="0" borderId="1" xfId="0" applyFont="1" applyBorder="1" applyAlignment="1"><alignment horizontal="center" vertical="top"/></xf></cellXfs>
+<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>
+</styleSheet>"""
+
+_SHEET_HEAD = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+<dimension ref="A1:{last}"/>
+<sheetViews><sheetView workbookViewId="0"><pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/><selection pane="bottomLeft" activeCell="A2" sqref="A2"/></sheetView></sheetViews>
+<sheetFormatPr defaultRowHeight="15"/>
+<cols>{cols}</cols>
+<sheetData>"""
+
+_SHEET_TAIL = "</sheetData>\n</worksheet>"
+
+
+def column_letter(index: int) -> str:
+    """0-based column index -> Excel column letters (0 -> A, 26 -> AA)."""
+    letters = ""
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _cell(ref: str, value: Any, style: str = "") -> str:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f'<c r="{ref}"{style}><v>{value}</v></c>'
+    text = escape(_ILLEGAL_XML.sub("", str(value)))
+    space = ' xml:space="preserve"' if text[:1].isspace() or text[-1:].isspace() else ""
+    return f'<c r="{ref}"{style} t="inlineStr"><is><t{space}>{text}</t></is></c>'
+
+
+def write_xlsx(
+    fp: IO[bytes],
+    header: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    sheet_name: str = "Doors with Hardware",
+) -> int:
+    """
+    Write a single-sheet workbook with a frozen, bold header row to the binary
+    file `fp`, consuming `rows` (sequences of cell values) in one pass.
+    Column widths follow the longest value per column, clamped to
+    MIN_WIDTH..MAX_WIDTH. None and "" leave the cell empty. Returns the
+    number of data rows written.
+    """
+    letters = [column_letter(i) for i in range(len(header))]
+    widths = [len(str(h)) for h in header]
+    count = 0
+    with tempfile.TemporaryFile() as spool:
+        out = io.TextIOWrapper(spool, encoding="utf-8", newline="")
+        cells = "".join(_cell(f"{c}1", h, ' s="1"') for c, h in zip(letters, header))
+        out.write(f'<row r="1">{cells}</row>')
+        for count, values in enumerate(rows, start=1):
+            r = count + 1
+            cells: List[str] = []
+            for i, v in enumerate(values):
+                if v is None or v == "":
+                    continue
+                n = len(str(v))
+                if n > widths[i]:
+                    widths[i] = n
+                cells.append(_cell(f"{letters[i]}{r}", v))
+            out.write(f'<row r="{r}">{"".join(cells)}</row>')
+        out.flush()
+        out.detach()
+        spool.seek(0)
+
+        cols = "".join(
+            f'<col min="{i}" max="{i}" width="{min(max(MIN_WIDTH, w + 2), MAX_WIDTH)}" customWidth="1"/>'
+            for i, w in enumerate(widths, start=1)
+        )
+        head = _SHEET_HEAD.format(last=f"{letters[-1]}{count + 1}", cols=cols)
+        with zipfile.ZipFile(fp, "w", zipfile.ZIP_DEFLATED) as z:
+            z.writestr("[Content_Types].xml", _CONTENT_TYPES)
+            z.writestr("_rels/.rels", _ROOT_RELS)
+            z.writestr("xl/workbook.xml", _WORKBOOK.format(name=quoteattr(sheet_name[:31])))
+            z.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+            z.writestr("xl/styles.xml", _STYLES)
+            with z.open("xl/worksheets/sheet1.xml", "w") as sheet:
+                sheet.write(head.encode("utf-8"))
+                shutil.copyfileobj(spool, sheet)
+                sheet.write(_SHEET_TAIL.encode("utf-8"))
+    return count
@@ -1,5 +1,73 @@
-from typing import List
-from pdf2image import convert_from_bytes
+"""
+PDF input handling: where a document's bytes live and how they reach
+pdfplumber and poppler without extra copies.
 
-def bytes_to_images(data: bytes, first_page: int = 1, last_page: int = None) -> List["PIL.Image.Image"]:
-    return convert_from_bytes(data, first_page=first_page, last_page=last_page or first_page, dpi=300)
+A PdfSource is either the PDF bytes or the path of a PDF on disk. Uploads
+are spooled to a file in chunks (spool), hashed on the way; files are
+memory-mapped read-only for pdfplumber (map_file), so the OS page cache
+holds the document once however many readers it has, and poppler is given
+the path (convert_from_path) rather than bytes it would write out again.
+"""
+import hashlib
+import io
+import mmap
+import os
+from pathlib import Path
+from typing import IO, List, Tuple, Union
+
+PdfSource = Union[bytes, str, os.PathLike]
+
+CHUNK = 1 << 20
+
+# pdf2image is imported on first use: only OCR needs it
+
+
+def is_path(source: PdfSource) -> bool:
+    return not isinstance(source, (bytes, bytearray, memoryview))
+
+
+def map_file(path: Union[str, os.PathLike]) -> Union[mmap.mmap, io.BytesIO]:
+    """Read-only memory map of a file (an empty stream for an empty file, which mmap refuses)."""
+    with open(path, "rb") as fp:
+        if os.fstat(fp.fileno()).st_size == 0:
+            return io.BytesIO(b"")
+        return mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def spool(fp: IO[bytes], target: Union[str, os.PathLike]) -> str:
+    """Copy a binary stream to `target` in chunks (from its start when seekable); returns its SHA-256."""
+    if fp.seekable():
+        fp.seek(0)
+    h = hashlib.sha256()
+    with open(target, "wb") as out:
+        for chunk in iter(lambda: fp.read(CHUNK), b""):
+            h.update(chunk)
+            out.write(chunk)
+    return h.hexdigest()
+
+
+def bytes_to_images(data: bytes, first_page: int = 1, last_page: int = None, dpi: int = 300) -> List["PIL.Image.Image"]:
+    from pdf2image import convert_from_bytes
+    return convert_from_bytes(data, first_page=first_page, last_page=last_page or first_page, dpi=dpi)
+
+def rasterize_to_files(source: PdfSource, first_page: int, last_page: int, output_folder: str, dpi: int = 300) -> List[str]:
+    """
+    Render a page range with a single poppler call; returns one image path
+    per page, in page order. Give a path where there is one: bytes are
+    written to a temporary file on every call.
+    """
+    from pdf2image import convert_from_bytes, convert_from_path
+    options = dict(first_page=first_page, last_page=last_page, dpi=dpi, output_folder=output_folder, paths_only=True)
+    if is_path(source):
+        return convert_from_path(str(source), **options)
+    return convert_from_bytes(source, **options)
+
+def page_runs(page_numbers: List[int], max_run: int) -> List[Tuple[int, int]]:
+    """Group sorted page numbers into contiguous (first, last) runs of at most max_run pages."""
+    runs: List[Tuple[int, int]] = []
+    for n in sorted(page_numbers):
+        if runs and n == runs[-1][1] + 1 and n - runs[-1][0] < max_run:
+            runs[-1] = (runs[-1][0], n)
+        else:
+            runs.append((n, n))
+    return runs
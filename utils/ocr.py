@@ -1,5 +1,140 @@
-import pytesseract
-from PIL import Image
+import os
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, wait
+from typing import TYPE_CHECKING, Dict, List, Mapping, Optional, Sequence, Tuple, Union
 
-def ocr_page_to_text(img: Image.Image) -> str:
-    return pytesseract.image_to_string(img)
+from utils.io_helpers import PdfSource, page_runs, rasterize_to_files
+from utils.ocr_engines import OcrOptions, get_engine
+from utils.profiling import StageTimings
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+OCR_DPI = 300
+
+
+def ocr_page_to_text(img: "Image.Image", options: Optional[OcrOptions] = None) -> str:
+    """
+    Recognize one page (or region) image with this process's OCR engine
+    (see utils.ocr_engines), after preprocessing unless options turn it off.
+    Blank images are not sent to the engine.
+    """
+    options = options if options is not None else OcrOptions.from_env()
+    if options.preprocess:
+        from utils.preprocess import preprocess
+        img = preprocess(img)
+        if img is None:
+            return ""
+    return get_engine(options).recognize(img, options.psm)
+
+
+def default_ocr_workers() -> int:
+    """Worker count for the OCR pool: HDL_OCR_WORKERS, else one per CPU."""
+    env = os.environ.get("HDL_OCR_WORKERS", "").strip()
+    if env.isdigit() and int(env) > 0:
+        return int(env)
+    return os.cpu_count() or 1
+
+
+BBox = Tuple[float, float, float, float]
+
+
+def _ocr_image_file(
+    page_number: int, path: str, dpi: int, regions: Sequence[BBox] = (), options: Optional[OcrOptions] = None
+) -> Tuple[int, str]:
+    """OCR a rendered page, or only the given PDF-point boxes of it."""
+    from PIL import Image
+    with Image.open(path) as img:
+        if not regions:
+            text = ocr_page_to_text(img, options)
+        else:
+            scale = dpi / 72
+            crops = [img.crop((int(x0 * scale), int(top * scale), int(x1 * scale), int(bottom * scale)))
+                     for x0, top, x1, bottom in regions]
+            text = "\n".join(ocr_page_to_text(crop, options) for crop in crops)
+    os.remove(path)
+    return page_number, text
+
+
+def _timed_ocr_image_file(*job) -> Tuple[int, str, float, float]:
+    # runs in the OCR worker, so the parent can record time spent in tesseract
+    wall, cpu = time.perf_counter(), time.thread_time()
+    page_number, text = _ocr_image_file(*job)
+    return page_number, text, time.perf_counter() - wall, time.thread_time() - cpu
+
+
+def ocr_pdf_pages(
+    source: PdfSource,
+    page_numbers: Union[List[int], Mapping[int, Tuple[int, Sequence[BBox]]]],
+    workers: int = 1,
+    max_pending: Optional[int] = None,
+    dpi: int = OCR_DPI,
+    timings: Optional[StageTimings] = None,
+    options: Optional[OcrOptions] = None,
+    pool: Optional[Executor] = None,
+) -> Dict[int, str]:
+    """
+    Rasterize and OCR the given 1-based pages of a PDF (bytes or, better, a path).
+    page_numbers is a list of pages (whole page at `dpi`) or a mapping
+    {page_number: (dpi, regions)} where non-empty regions restrict OCR to
+    those PDF-point boxes.
+    Contiguous pages sharing a DPI are rendered together in one poppler call
+    (runs of up to max_pending pages, default 2 per worker) into a scratch
+    folder. With workers > 1 the images are OCR'd on a process pool while
+    the next run renders; rendering waits whenever max_pending pages are in
+    flight, so memory and scratch space stay flat. Returns {page_number: text}.
+    `timings`, when given, receives "rasterize" and "tesseract" stages and
+    an "ocr_pages" count. `options` picks the OCR backend, page segmentation
+    mode and preprocessing (default: OcrOptions.from_env()); each worker
+    keeps one engine for all the pages it is given. Pass a `pool` (see
+    PdfDocument) to keep the workers, and their engines, across calls;
+    otherwise one is started for this call when workers > 1.
+    """
+    timings = timings if timings is not None else StageTimings()
+    options = options if options is not None else OcrOptions.from_env()
+    if not isinstance(page_numbers, Mapping):
+        page_numbers = {n: (dpi, ()) for n in page_numbers}
+    by_dpi: Dict[int, List[int]] = {}
+    for n, (page_dpi, _) in page_numbers.items():
+        by_dpi.setdefault(page_dpi, []).append(n)
+
+    pool_size = workers if pool is not None else min(workers, len(page_numbers))
+    max_pending = max(1, max_pending or pool_size * 2)
+    results: Dict[int, str] = {}
+
+    def collect(done) -> None:
+        for page_number, text, wall, cpu in done:
+            results[page_number] = text
+            timings.add("tesseract", wall, cpu)
+
+    with tempfile.TemporaryDirectory(prefix="hdl-ocr-") as scratch:
+        own_pool = pool is None and pool_size > 1
+        if own_pool:
+            pool = ProcessPoolExecutor(max_workers=pool_size)
+        pending = set()
+        try:
+            runs = [(d, first, last) for d, pages in by_dpi.items() for first, last in page_runs(pages, max_pending)]
+            for run_dpi, first, last in runs:
+                with timings.stage("rasterize"):
+                    paths = rasterize_to_files(source, first, last, scratch, dpi=run_dpi)
+                for page_number, path in zip(range(first, last + 1), paths):
+                    job = (page_number, path, run_dpi, tuple(page_numbers[page_number][1]), options)
+                    if pool is None:
+                        collect([_timed_ocr_image_file(*job)])
+                    else:
+                        pending.add(pool.submit(_timed_ocr_image_file, *job))
+                while len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(fut.result() for fut in done)
+            collect(fut.result() for fut in pending)
+        finally:
+            if own_pool:
+                pool.shutdown(cancel_futures=True)
+            elif pending:
+                # a shared pool stays up: drop this call's work before its scratch folder goes
+                for fut in pending:
+                    fut.cancel()
+                wait(pending)
+    timings.count("ocr_pages", len(results))
+    return results
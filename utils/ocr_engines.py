@@ -0,0 +1,136 @@
+"""
+OCR backends behind one interface.
+
+An OcrEngine recognizes PIL images. get_engine() keeps one engine per
+process and configuration, so a worker loads the language model once and
+reuses it for every page it is given:
+
+    tesserocr    Tesseract's C++ API in-process (optional `tesserocr`
+                 package): no subprocess, no temp file, model loaded once
+    pytesseract  the tesseract CLI per image (always available fallback)
+
+Engines are closed when their process exits (close_engines).
+
+OcrOptions selects the backend, language, page segmentation mode and
+whether pages are preprocessed (utils.preprocess). Defaults come from
+HDL_OCR_BACKEND (auto), HDL_OCR_LANG (eng), HDL_OCR_PSM (Tesseract's own
+default; 4 or 6 suit column-aligned schedules) and HDL_OCR_PREPROCESS (1).
+"""
+from __future__ import annotations
+import os
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from functools import lru_cache
+from multiprocessing import util
+from typing import TYPE_CHECKING, Dict, Optional, Tuple, Type
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+AUTO = "auto"
+
+
+@dataclass(frozen=True)
+class OcrOptions:
+    backend: str = AUTO
+    lang: str = "eng"
+    psm: Optional[int] = None
+    preprocess: bool = True
+
+    @classmethod
+    def from_env(cls) -> "OcrOptions":
+        psm = os.environ.get("HDL_OCR_PSM", "").strip()
+        return cls(
+            backend=os.environ.get("HDL_OCR_BACKEND", "").strip().lower() or AUTO,
+            lang=os.environ.get("HDL_OCR_LANG", "").strip() or "eng",
+            psm=int(psm) if psm.isdigit() else None,
+            preprocess=os.environ.get("HDL_OCR_PREPROCESS", "1").strip() not in ("0", "false", "no"),
+        )
+
+    def cache_tag(self) -> str:
+        """What changes OCR output, for cache keys (the backend is assumed not to)."""
+        return f"{self.lang}/psm{self.psm if self.psm is not None else '-'}/{'pre' if self.preprocess else 'raw'}"
+
+
+class OcrEngine(ABC):
+    """Recognizes text in images; created once per process by get_engine()."""
+
+    name = ""
+
+    def __init__(self, lang: str):
+        self.lang = lang
+
+    @abstractmethod
+    def recognize(self, img: "Image.Image", psm: Optional[int] = None) -> str:
+        ...
+
+    def close(self) -> None:
+        pass
+
+
+class TesserocrEngine(OcrEngine):
+    name = "tesserocr"
+
+    def __init__(self, lang: str):
+        super().__init__(lang)
+        from tesserocr import PSM, PyTessBaseAPI
+        self._default_psm = PSM.AUTO
+        self.api = PyTessBaseAPI(lang=lang)
+
+    def recognize(self, img: "Image.Image", psm: Optional[int] = None) -> str:
+        self.api.SetPageSegMode(self._default_psm if psm is None else psm)
+        self.api.SetImage(img)
+        return self.api.GetUTF8Text()
+
+    def close(self) -> None:
+        self.api.End()
+
+
+class PytesseractEngine(OcrEngine):
+    name = "pytesseract"
+
+    def recognize(self, img: "Image.Image", psm: Optional[int] = None) -> str:
+        import pytesseract
+        return pytesseract.image_to_string(img, lang=self.lang, config=f"--psm {psm}" if psm is not None else "")
+
+
+BACKENDS: Dict[str, Type[OcrEngine]] = {
+    TesserocrEngine.name: TesserocrEngine,
+    PytesseractEngine.name: PytesseractEngine,
+}
+
+_engines: Dict[Tuple[str, str], OcrEngine] = {}
+
+
+@lru_cache(maxsize=None)
+def resolve_backend(backend: str) -> str:
+    """auto -> tesserocr when it is installed, else pytesseract (looked up once per process)."""
+    if backend != AUTO:
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown OCR backend: {backend}. Available: {', '.join(BACKENDS)}")
+        return backend
+    try:
+        import tesserocr  # noqa: F401
+    except ImportError:
+        return PytesseractEngine.name
+    return TesserocrEngine.name
+
+
+def get_engine(options: OcrOptions) -> OcrEngine:
+    """This process's engine for the options' backend and language, created on first use."""
+    key = (resolve_backend(options.backend), options.lang)
+    engine = _engines.get(key)
+    if engine is None:
+        if not _engines:
+            # multiprocessing finalizers also run when a pool worker exits,
+            # where atexit handlers don't
+            util.Finalize(None, close_engines, exitpriority=0)
+        engine = _engines[key] = BACKENDS[key[0]](options.lang)
+    return engine
+
+
+def close_engines() -> None:
+    """Close and forget this process's engines."""
+    while _engines:
+        _, engine = _engines.popitem()
+        engine.close()
@@ -0,0 +1,102 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+# stages in pipeline order, for display; anything else is listed after them
+STAGE_ORDER = ["open", "text_layer", "rasterize", "tesseract", "detect", "parse"]
+
+_log_lock = threading.Lock()
+
+
+class StageTimings:
+    """
+    Wall-clock and CPU seconds per pipeline stage, plus plain counters.
+
+    stage() times a block; add() records a duration measured elsewhere
+    (e.g. OCR run in a worker process). CPU time is the calling thread's
+    (time.thread_time), so concurrent jobs don't bill each other; work done
+    in subprocesses (poppler, tesseract) shows up as wall time only.
+    Thread-safe, and nested stages are each counted in full.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, List[float]] = {}  # name -> [wall, cpu, calls]
+        self.counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - wall, time.thread_time() - cpu)
+
+    def add(self, name: str, wall: float, cpu: float = 0.0, calls: int = 1) -> None:
+        with self._lock:
+            entry = self.stages.setdefault(name, [0.0, 0.0, 0])
+            entry[0] += wall
+            entry[1] += cpu
+            entry[2] += calls
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def merge(self, other: Dict[str, Any]) -> None:
+        """Add the totals of another to_dict() result."""
+        for name, s in other.get("stages", {}).items():
+            self.add(name, s["wall"], s["cpu"], s["calls"])
+        for name, n in other.get("counters", {}).items():
+            self.count(name, n)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            names = [n for n in STAGE_ORDER if n in self.stages] + sorted(set(self.stages) - set(STAGE_ORDER))
+            return {
+                "stages": {
+                    n: {"wall": round(self.stages[n][0], 6), "cpu": round(self.stages[n][1], 6), "calls": self.stages[n][2]}
+                    for n in names
+                },
+                "counters": dict(self.counters),
+            }
+
+
+def format_timings(timings: Dict[str, Any]) -> List[str]:
+    """One line per stage ("parse: 0.42s wall, 0.40s CPU, 12 calls") then the counters."""
+    lines = [
+        f"{name}: {s['wall']:.2f}s wall, {s['cpu']:.2f}s CPU, {s['calls']} call{'s' if s['calls'] != 1 else ''}"
+        for name, s in timings.get("stages", {}).items()
+    ]
+    counters = timings.get("counters", {})
+    if counters:
+        lines.append(", ".join(f"{n}: {v}" for n, v in counters.items()))
+    return lines
+
+
+def timing_logger() -> logging.Logger:
+    """
+    The "hdl.timings" logger; messages are single-line JSON objects. When
+    HDL_TIMINGS_LOG names a file, records are also appended to it.
+    """
+    logger = logging.getLogger("hdl.timings")
+    path = os.environ.get("HDL_TIMINGS_LOG")
+    if path:
+        with _log_lock:
+            if not any(getattr(h, "baseFilename", None) == os.path.abspath(path) for h in logger.handlers):
+                handler = logging.FileHandler(path, encoding="utf-8")
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                logger.addHandler(handler)
+                logger.setLevel(logging.INFO)
+    return logger
+
+
+def log_timings(event: str, timings: Optional[StageTimings] = None, **fields: Any) -> None:
+    record = {"event": event, "time": round(time.time(), 3), **fields}
+    if timings is not None:
+        record.update(timings.to_dict())
+    timing_logger().info(json.dumps(record, ensure_ascii=False))
@@ -0,0 +1,106 @@
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Iterable, List, Sequence, Tuple
+
+BBox = Tuple[float, float, float, float]  # x0, top, x1, bottom in PDF points
+
+# decisions
+SKIP = "skip"
+OCR_PAGE = "ocr_page"
+OCR_REGIONS = "ocr_regions"
+
+MIN_CHARS = 20                # fewer non-space chars than this on a page with images = treat as a scan
+MAX_GARBAGE = 0.3             # share of unmapped/control glyphs that makes the layer unusable
+SCAN_COVERAGE = 0.6           # one image covering this much of the page looks like a scan ...
+SCAN_MAX_WORD_DENSITY = 0.5   # ... unless the text layer has at least this many words per square inch
+MIN_REGION_AREA = 36 * 36     # ignore images smaller than half an inch square
+MAX_REGION_CHARS = 2          # an image region "has no text" if at most this many chars sit on it
+MAX_OCR_PIXELS = 40_000_000   # pixel budget for a full-page render (A3 at 300 dpi is ~35M)
+MIN_OCR_DPI = 150
+
+_CID_RE = re.compile(r"\(cid:\d+\)")
+
+
+@dataclass
+class PageTriage:
+    """Text-layer score for one page and the OCR decision taken for it."""
+    chars: int
+    word_density: float
+    garbage_ratio: float
+    decision: str
+    dpi: int
+    regions: List[BBox] = field(default_factory=list)
+
+
+def garbage_ratio(text: str) -> float:
+    """Share of non-space characters that are unmapped glyphs (cid:N), U+FFFD or control chars."""
+    cid_chars = sum(len(m) for m in _CID_RE.findall(text))
+    rest = _CID_RE.sub("", text)
+    bad = sum(1 for ch in rest if ch == "\ufffd" or (ord(ch) < 32 and ch not in "\t\n\r"))
+    total = cid_chars + sum(1 for ch in rest if not ch.isspace())
+    return (cid_chars + bad) / total if total else 0.0
+
+
+def select_dpi(width: float, height: float, dpi: int) -> int:
+    """Highest DPI up to `dpi` that keeps a full-page render within MAX_OCR_PIXELS."""
+    pixels = (width / 72 * dpi) * (height / 72 * dpi)
+    if pixels <= MAX_OCR_PIXELS:
+        return dpi
+    return max(MIN_OCR_DPI, int(dpi * math.sqrt(MAX_OCR_PIXELS / pixels)))
+
+
+def uncovered_regions(images: Iterable[BBox], chars: Sequence[Tuple[float, float]]) -> List[BBox]:
+    """Image boxes large enough to matter that the text layer left (almost) empty."""
+    regions = []
+    for x0, top, x1, bottom in images:
+        if (x1 - x0) * (bottom - top) < MIN_REGION_AREA:
+            continue
+        inside = sum(1 for cx, cy in chars if x0 <= cx <= x1 and top <= cy <= bottom)
+        if inside <= MAX_REGION_CHARS:
+            regions.append((x0, top, x1, bottom))
+    return regions
+
+
+def triage_page(
+    text: str,
+    width: float,
+    height: float,
+    images: Sequence[BBox] = (),
+    chars: Sequence[Tuple[float, float]] = (),
+    force_ocr: bool = False,
+    dpi: int = 300,
+) -> PageTriage:
+    """
+    Score a page's pdfplumber output and decide how to OCR it:
+    SKIP when the text layer is good, OCR_REGIONS for image areas the layer
+    left empty (stamps, pasted scans on vector drawings), OCR_PAGE when
+    there is no usable layer. The page is rendered whole either way, so its
+    DPI is lowered for large sheets in both cases.
+    """
+    n_chars = sum(1 for ch in text if not ch.isspace())
+    area_in2 = max(width * height / (72 * 72), 1e-6)
+    density = len(text.split()) / area_in2
+    garbage = garbage_ratio(text)
+    page_dpi = select_dpi(width, height, dpi)
+
+    def page_score(decision: str, regions: List[BBox] = None, at: int = page_dpi) -> PageTriage:
+        return PageTriage(n_chars, density, garbage, decision, at, regions or [])
+
+    if force_ocr or n_chars == 0 or garbage >= MAX_GARBAGE:
+        return page_score(OCR_PAGE)
+    if not images:
+        # vector-only page: a render would show nothing the layer lacks
+        return page_score(SKIP, at=0)
+    if n_chars < MIN_CHARS:
+        return page_score(OCR_PAGE)
+
+    page_area = max(width * height, 1e-6)
+    largest = max(((x1 - x0) * (b - t) for x0, t, x1, b in images), default=0.0)
+    if largest / page_area >= SCAN_COVERAGE and density < SCAN_MAX_WORD_DENSITY:
+        return page_score(OCR_PAGE)
+
+    regions = uncovered_regions(images, chars)
+    if regions:
+        return page_score(OCR_REGIONS, regions)
+    return page_score(SKIP, at=0)